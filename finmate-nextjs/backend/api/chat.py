@@ -1,67 +1,151 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, BackgroundTasks, Query, Request, Response
+from fastapi.responses import StreamingResponse, JSONResponse
 from models import ChatRequest, ChatMessage
-from services import llm_service, portfolio_service, chat_service
+from services import llm_service, portfolio_service, chat_service, document_service, document_index
+from services.conversation_memory import memory_store
 from dependencies import get_current_user
-from PyPDF2 import PdfReader
-from io import BytesIO
-from typing import List
+from services.executor import run_blocking
+from services.pagination import Cursor, parse_cursor
+from typing import List, Dict, Tuple, Optional
+from datetime import datetime
+import hashlib
+import json
 import uuid
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+def _conditional_json(request: Request, payload: List[Dict]) -> Response:
+    """JSON response with an ETag; 304 when the client already has this payload"""
+    etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=payload, headers=headers)
+
+def _cursor(before: Optional[str], before_id: Optional[str]) -> Cursor:
+    try:
+        return parse_cursor(before, before_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
 @router.get("/history", response_model=List[dict])
-async def get_history(user_id: str = Depends(get_current_user)):
-    """Get all conversation history"""
-    return chat_service.chat_service.get_conversations(user_id)
+async def get_history(
+    request: Request,
+    limit: int = Query(50, ge=1, le=chat_service.CONVERSATION_PAGE_MAX),
+    before: Optional[str] = Query(None, description="updated_at cursor from the last item of the previous page"),
+    before_id: Optional[str] = Query(None, description="id of the last item of the previous page (tiebreaker for before)"),
+    user_id: str = Depends(get_current_user)
+):
+    """Get conversation history, most recently updated first"""
+    cursor, cursor_id = _cursor(before, before_id)
+    conversations = await run_blocking(chat_service.chat_service.get_conversations, user_id, limit, cursor, cursor_id)
+    return _conditional_json(request, conversations)
+
+@router.get("/tools/stats")
+async def get_tool_stats(user_id: str = Depends(get_current_user)):
+    """Tool-result cache hit/miss counters for the chat agent"""
+    return llm_service.agent_tools.stats()
 
 @router.get("/{conversation_id}/messages", response_model=List[ChatMessage])
-async def get_messages(conversation_id: str, user_id: str = Depends(get_current_user)):
-    """Get messages for a conversation"""
-    messages = chat_service.chat_service.get_messages(conversation_id)
-    return messages
+async def get_messages(
+    conversation_id: str,
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    before: Optional[str] = Query(None, description="created_at cursor from the first item of the current page"),
+    before_id: Optional[str] = Query(None, description="id of the first item of the current page (tiebreaker for before)"),
+    user_id: str = Depends(get_current_user)
+):
+    """Get the latest messages of one of the user's conversations, oldest first"""
+    cursor, cursor_id = _cursor(before, before_id)
+    messages = await run_blocking(chat_service.chat_service.get_messages, conversation_id, user_id, limit, cursor, cursor_id)
+    # The ownership join returns nothing for other users' conversations; tell that apart from an empty one
+    if not messages and not await run_blocking(chat_service.chat_service.owns_conversation, user_id, conversation_id):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return _conditional_json(request, messages)
+
+async def _start_turn(request: ChatRequest, user_id: str) -> Tuple[str, str, List[Dict]]:
+    """
+    Resolve the conversation and build the LLM context and history. History
+    comes from the conversation's in-memory buffer (the DB is only read for a
+    conversation not in memory yet). Nothing is saved until _finish_turn.
+    """
+    # 1. Manage Conversation ID (a new conversation is created with the turn)
+    conversation_id = request.conversation_id
+    if not conversation_id:
+        conversation_id = str(uuid.uuid4())
+        memory = memory_store.get(conversation_id, user_id, load=False)
+    else:
+        memory = await run_blocking(memory_store.get, conversation_id, user_id)
+        if memory is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+    history = memory.window()
+
+    # 2. Build Context
+    context = ""
+    
+    # Add portfolio context
+    if request.portfolio:
+        context += f"Portfolio: {', '.join(request.portfolio)}\n\n"
+    else:
+        portfolio = await run_blocking(portfolio_service.load_portfolio, user_id)
+        if portfolio:
+            context += f"Portfolio: {', '.join(portfolio)}\n\n"
+    
+    # Add news context (remembered, so later turns don't have to resend it)
+    if request.news_context:
+        news_context = "Latest News Analysis:\n"
+        for news in request.news_context:
+            news_context += f"- {news.headline} (Impact: {news.impact}, Reason: {news.impact_reason})\n"
+        memory.context["news"] = news_context + "\n"
+    context += memory.context.get("news", "")
+    
+    # Add document context: the uploaded document's chunks most relevant to this query
+    if request.document_id:
+        found = await run_blocking(document_index.store.search, user_id, request.document_id, request.query)
+        if found:
+            filename, chunks = found
+            context += f"Relevant excerpts from the uploaded document {filename}:\n"
+            for chunk in chunks:
+                context += f"[page {chunk['page']}] {chunk['text']}\n\n"
+    else:
+        if request.document_context:
+            memory.context["document"] = f"Uploaded Document Context:\n{request.document_context}\n\n"
+        context += memory.context.get("document", "")
+
+    return conversation_id, context, history
+
+def _finish_turn(request: ChatRequest, user_id: str, conversation_id: str, asked_at: str, answer: str,
+                 background_tasks: BackgroundTasks):
+    """
+    Remember the turn, then after the response save both messages together
+    (creating the conversation if it is new) and summarize what fell out of
+    the history window.
+    """
+    memory = memory_store.get(conversation_id, user_id, load=False)
+    memory.append("user", request.query)
+    memory.append("assistant", answer)
+
+    messages = [
+        {"role": "user", "content": request.query, "created_at": asked_at},
+        {"role": "assistant", "content": answer, "created_at": datetime.utcnow().isoformat()}
+    ]
+    # A new conversation is created with a title from the query (first 30 chars for now)
+    title = None if request.conversation_id else request.query[:30] + "..."
+    background_tasks.add_task(run_blocking, chat_service.chat_service.save_turn, conversation_id, user_id, messages, title)
+    background_tasks.add_task(memory_store.compact, conversation_id, user_id)
 
 @router.post("", response_model=ChatMessage)
-async def chat(request: ChatRequest, user_id: str = Depends(get_current_user)):
+async def chat(request: ChatRequest, background_tasks: BackgroundTasks, user_id: str = Depends(get_current_user)):
     """Chat with the AI assistant"""
     try:
-        # 1. Manage Conversation ID
-        conversation_id = request.conversation_id
-        if not conversation_id:
-            # Generate title from query (first 30 chars for now)
-            title = request.query[:30] + "..."
-            conversation_id = chat_service.chat_service.create_conversation(user_id, title)
-        
-        # 2. Save User Message
-        chat_service.chat_service.add_message(conversation_id, "user", request.query)
-
-        # 3. Build Context
-        context = ""
-        # ... (Context building logic remains similar, maybe optimized to use DB history if needed)
-        
-        # Add portfolio context
-        if request.portfolio:
-            context += f"Portfolio: {', '.join(request.portfolio)}\n\n"
-        else:
-            portfolio = portfolio_service.load_portfolio(user_id)
-            if portfolio:
-                context += f"Portfolio: {', '.join(portfolio)}\n\n"
-        
-        # Add news context
-        if request.news_context:
-            context += "Latest News Analysis:\n"
-            for news in request.news_context:
-                context += f"- {news.headline} (Impact: {news.impact}, Reason: {news.impact_reason})\n"
-            context += "\n"
-        
-        # Add document context
-        if request.document_context:
-            context += f"Uploaded Document Context:\n{request.document_context}\n\n"
+        asked_at = datetime.utcnow().isoformat()
+        conversation_id, context, history = await _start_turn(request, user_id)
             
-        # 4. Get LLM Response
-        response_text = llm_service.chat_with_data(request.query, context)
+        # 3. Get LLM Response
+        response_text = await run_blocking(llm_service.chat_with_data, request.query, context, history)
         
-        # 5. Save Assistant Message
-        chat_service.chat_service.add_message(conversation_id, "assistant", response_text)
+        # 4. Save the turn after responding
+        _finish_turn(request, user_id, conversation_id, asked_at, response_text, background_tasks)
         
         return ChatMessage(
             id=str(uuid.uuid4()), 
@@ -70,33 +154,72 @@ async def chat(request: ChatRequest, user_id: str = Depends(get_current_user)):
             content=response_text
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, background_tasks: BackgroundTasks, user_id: str = Depends(get_current_user)):
+    """
+    Chat with the AI assistant over Server-Sent Events.
+    Emits `conversation`, then `tool_call`/`tool_result`/`delta` as they happen,
+    and a final `done` with the full answer. The turn is saved after the
+    stream ends.
+    """
+    try:
+        asked_at = datetime.utcnow().isoformat()
+        conversation_id, context, history = await _start_turn(request, user_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
+
+    async def events():
+        yield _sse("conversation", {"conversation_id": conversation_id})
+        async for event in llm_service.chat_with_data_stream(request.query, context, history):
+            if event["type"] == "done":
+                # Persist once, with the complete answer
+                _finish_turn(request, user_id, conversation_id, asked_at, event["content"], background_tasks)
+            yield _sse(event["type"], event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/upload-document")
 async def upload_document(file: UploadFile = File(...), user_id: str = Depends(get_current_user)):
-    """Upload and extract text from a PDF document"""
+    """Upload a PDF document and index it for chat; pass the returned document_id with chat requests"""
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    if file.size is not None and file.size > document_service.DOCUMENT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Document is too large")
+
     try:
-        if not file.filename.endswith('.pdf'):
-            raise HTTPException(status_code=400, detail="Only PDF files are supported")
-        
-        # Read PDF
-        contents = await file.read()
-        pdf_reader = PdfReader(BytesIO(contents))
-        
-        # Extract text
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        
-        # Limit context size
-        limited_text = text[:10000]
-        
-        return {
-            "filename": file.filename,
-            "text": limited_text,
-            "message": f"Successfully extracted {len(text)} characters from {file.filename}"
-        }
-    
+        # The upload is already spooled to a temp file; parse and index it off the event loop
+        result = await run_blocking(document_service.ingest_pdf, user_id, file.filename, file.file)
+    except document_service.DocumentLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process document: {str(e)}")
+    finally:
+        await file.close()
+
+    return {
+        "filename": file.filename,
+        "document_id": result["document_id"],
+        "text": result["text"],
+        "message": f"Successfully indexed {result['pages']} pages ({result['chunks']} chunks) from {file.filename}"
+    }
+
+@router.delete("/documents/{document_id}")
+async def delete_document(document_id: str, user_id: str = Depends(get_current_user)):
+    """Delete an uploaded document and its index"""
+    if not await run_blocking(document_index.store.delete, user_id, document_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"message": "Document deleted"}
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional
 from models import NewsItem
-from services import news_service, llm_service, portfolio_service
+from services import news_service, news_scheduler, news_pipeline, news_index, portfolio_service, rss_service
+from services.feed_registry import registry
 from dependencies import get_current_user
-import uuid
+from services.executor import run_blocking
+from services.pagination import parse_cursor
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,65 +13,83 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/news", tags=["news"])
 
 @router.get("", response_model=List[NewsItem])
-async def get_news():
-    """Get persisted news from database"""
+async def get_news(
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[str] = Query(None, description="created_at cursor from the last item of the previous page"),
+    before_id: Optional[str] = Query(None, description="id of the last item of the previous page (tiebreaker for before)"),
+    ticker: Optional[str] = None
+):
+    """Get pre-analyzed news, newest saved first, falling back to the database"""
     try:
-        return news_service.get_latest_news()
+        cursor, cursor_id = parse_cursor(before, before_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+    try:
+        # First unfiltered page can be served straight from the ingestion store,
+        # in the same (created_at, id) order as the DB pages that follow it
+        if not before and not ticker:
+            cached = news_scheduler.store.latest_saved(limit)
+            if len(cached) >= limit:
+                return cached
+        return await run_blocking(news_service.get_latest_news, limit=limit, before=cursor, ticker=ticker, before_id=cursor_id)
     except Exception as e:
         logger.error(f"Error fetching news: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch news: {str(e)}")
 
+@router.get("/feed", response_model=List[NewsItem])
+async def get_ranked_feed(
+    limit: int = Query(20, ge=1, le=100),
+    user_id: str = Depends(get_current_user)
+):
+    """News ranked for the user's portfolio from the in-memory index, without an LLM call"""
+    try:
+        portfolio = await run_blocking(portfolio_service.load_portfolio, user_id)
+        missing = news_index.index.missing_profiles(portfolio)
+        if missing:
+            profiles = await run_blocking(portfolio_service.load_profiles, missing)
+            # Tickers without a profile row are remembered as such, not looked up again
+            news_index.index.set_profiles({**{t: {} for t in missing}, **profiles})
+        return news_index.index.rank(portfolio, limit)
+    except Exception as e:
+        logger.error(f"Error ranking news for user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to rank news: {str(e)}")
+
 @router.post("/refresh", response_model=List[NewsItem])
 async def refresh_news(user_id: str = Depends(get_current_user)):
-    """Fetch fresh news, analyze, and save to DB"""
+    """
+    Serve pre-analyzed news, ingesting new articles first if the store is
+    stale, with affected tickers, impact and risk assessed for the user's
+    portfolio
+    """
     try:
-        # Get portfolio for analysis context
-        portfolio = portfolio_service.load_portfolio(user_id)
-        
-        # Fetch raw news (DuckDuckGo)
-        raw_news = news_service.fetch_news()
-        
-        analyzed_news = []
-        for item in raw_news:
-            # Analyze with LLM
-            analysis = llm_service.analyze_news(item, portfolio)
-            
-            # Create NewsItem model
-            news_item = NewsItem(
-                id=str(uuid.uuid4()), # Temporary ID, DB assigns real one but we need one for model
-                headline=analysis.get('headline', item['title']),
-                summary=analysis.get('summary', item['summary']),
-                sentiment_score=analysis.get('sentiment_score', 50),
-                category=analysis.get('category', 'General'),
-                affected_tickers=analysis.get('affected_tickers', []),
-                impact=analysis.get('impact', 'neutral'),
-                impact_reason=analysis.get('impact_reason', ''),
-                risk_level=analysis.get('risk_level', 'medium'),
-                link=item['link'],
-                published=item.get('published'),
-                source=item.get('source', 'Unknown'),
-                related_sources=analysis.get('related_sources', [])
-            )
-            
-            # Save to Database (Upsert)
-            news_service.save_analyzed_news(news_item)
-            
-            analyzed_news.append(news_item)
-        
-        # Return what was just processed
-        return analyzed_news
+        # Single-flight: concurrent refreshes join the same ingestion tick
+        items = await news_scheduler.scheduler.refresh()
+
+        # The store is analyzed without a portfolio; overlay the cheap
+        # per-portfolio impact step (cached per article and portfolio)
+        portfolio = await run_blocking(portfolio_service.load_portfolio, user_id)
+        if portfolio:
+            items = await news_pipeline.personalize(items, portfolio)
+        return items
     
     except Exception as e:
         logger.error(f"Error refreshing news: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to refresh news: {str(e)}")
 
+@router.get("/feeds/health")
+async def get_feeds_health():
+    """Schedule, backoff and fetch counters of every registered feed"""
+    health = registry.health()
+    counters = rss_service.feed_stats()
+    for feed in health["feeds"]:
+        feed["fetches"] = counters.get(feed["url"], {})
+    return health
+
 @router.get("/{news_id}", response_model=NewsItem)
 async def get_news_item(news_id: str):
     """Get a specific news item by ID"""
-    # Just fetch list and filter for now as we don't have get_by_id in service yet
-    # Optimization: Add get_by_id to service later
-    news = news_service.get_latest_news()
-    for item in news:
-        if item.id == news_id:
-            return item
-    raise HTTPException(status_code=404, detail="News item not found")
+    item = await run_blocking(news_service.get_news_by_id, news_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="News item not found")
+    return item
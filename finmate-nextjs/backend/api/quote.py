@@ -1,16 +1,28 @@
-from fastapi import APIRouter, HTTPException
-import yfinance as yf
+from fastapi import APIRouter, HTTPException, Query
 import logging
 
-from services.quote_service import get_quote_data
+from services.quote_service import get_quote_data, get_quotes
+from services.executor import run_blocking
 
 router = APIRouter(prefix="/api/quote", tags=["quote"])
 logger = logging.getLogger(__name__)
 
+MAX_TICKERS_PER_REQUEST = 100
+
+@router.get("")
+async def get_quote_batch(tickers: str = Query(..., description="Comma-separated tickers, e.g. AAPL,MSFT,NVDA")):
+    """Get real-time quotes for several tickers in one call"""
+    requested = [t for t in tickers.split(",") if t.strip()]
+    if not requested:
+        raise HTTPException(status_code=400, detail="No tickers provided")
+    if len(requested) > MAX_TICKERS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TICKERS_PER_REQUEST} tickers per request")
+    return await run_blocking(get_quotes, requested)
+
 @router.get("/{ticker}")
 async def get_quote(ticker: str):
     """Get real-time quote for a ticker"""
-    data = get_quote_data(ticker)
+    data = await run_blocking(get_quote_data, ticker)
     if not data:
         raise HTTPException(status_code=404, detail="Price not found")
     return data
@@ -4,6 +4,7 @@ from typing import List
 from models import NewsItem
 from services import reporting_service, portfolio_service
 from dependencies import get_current_user
+from services.executor import run_blocking
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
@@ -11,7 +12,7 @@ router = APIRouter(prefix="/api/reports", tags=["reports"])
 async def generate_report(news_items: List[NewsItem], user_id: str = Depends(get_current_user)):
     """Generate a PDF briefing report"""
     try:
-        portfolio = portfolio_service.load_portfolio(user_id)
+        portfolio = await run_blocking(portfolio_service.load_portfolio, user_id)
         
         # Convert NewsItem models to dicts for reporting service
         # Use model_dump() for Pydantic v2 compatibility
@@ -21,7 +22,7 @@ async def generate_report(news_items: List[NewsItem], user_id: str = Depends(get
         ]
         
         # Generate PDF
-        pdf_bytes = reporting_service.generate_briefing(news_dicts, portfolio)
+        pdf_bytes = await run_blocking(reporting_service.generate_briefing, news_dicts, portfolio)
         
         # Return PDF as response with date-stamped filename
         from datetime import datetime
@@ -0,0 +1,144 @@
+"""
+Benchmark: single-article vs batched LLM news analysis.
+
+Runs the refresh pipeline against a local mock of the OpenAI chat completions
+endpoint that charges ~4 characters per token, answers after a latency that
+grows with the output length, and tallies the tokens it was sent and
+returned. Verification, the analysis cache and Supabase writes are stubbed
+out so only the analyze stage is measured.
+
+Run from the backend directory:
+    python -m benchmarks.bench_batch_analysis
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import AsyncOpenAI
+
+from services import analysis_cache, llm_service, news_dedup, news_pipeline, news_service
+
+PORT = 8766
+ARTICLES = 30
+BATCH_SIZES = (1, 5, 10)
+
+# Simulated model latency: fixed overhead per request + time per output token
+REQUEST_LATENCY = 0.4
+SECONDS_PER_OUTPUT_TOKEN = 0.004
+CHARS_PER_TOKEN = 4
+
+usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+usage_lock = threading.Lock()
+
+def mock_analysis(article_id=None) -> dict:
+    analysis = {
+        "headline": "Mock headline for a market moving story",
+        "summary": "A concise mock summary of the event and why it matters to investors.",
+        "sentiment_score": 6,
+        "category": "Markets",
+        "affected_tickers": ["AAPL"],
+        "impact": "positive",
+        "impact_reason": "Mock reasoning about the effect on the portfolio.",
+        "risk_level": "medium",
+        "related_sources": ["https://example.com/related"]
+    }
+    return analysis if article_id is None else {"id": article_id, **analysis}
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = "".join(m["content"] for m in body["messages"])
+
+        article_ids = re.findall(r'Article id="(\d+)"', prompt)
+        if article_ids:
+            content = json.dumps({"results": [mock_analysis(i) for i in article_ids]})
+        else:
+            content = json.dumps(mock_analysis())
+
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        with usage_lock:
+            usage["requests"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+        time.sleep(REQUEST_LATENCY + completion_tokens * SECONDS_PER_OUTPUT_TOKEN)
+
+        payload = json.dumps({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def install_mocks():
+    llm_service.async_client = AsyncOpenAI(base_url=f"http://127.0.0.1:{PORT}/v1", api_key="mock")
+    llm_service.verify_news = lambda item: "Search Results for Verification:\n1. Mock result (https://example.com/related)\n"
+    # The synthetic headlines are near-duplicates of each other
+    news_dedup.DEDUP_ENABLED = False
+    analysis_cache.get = lambda url, key: None
+    analysis_cache.put = lambda url, key, analysis: None
+    news_service.save_analyzed_news_batch = lambda items: {
+        item.link: {"id": str(uuid.uuid4()), "created_at": datetime.now().isoformat()} for item in items
+    }
+
+def raw_news() -> list:
+    now = datetime.now().isoformat()
+    return [
+        {"title": f"Company {i} beats quarterly estimates on strong demand", "link": f"https://example.com/{uuid.uuid4()}",
+         "summary": "Shares rose after the company reported revenue ahead of analyst expectations and raised guidance.",
+         "published": now, "source": "Mock"}
+        for i in range(ARTICLES)
+    ]
+
+async def run_once(batch_size: int):
+    for key in usage:
+        usage[key] = 0
+    start = time.perf_counter()
+    items = await news_pipeline.run_refresh_pipeline(["AAPL", "MSFT"], raw_news=raw_news(), batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    total_tokens = usage["prompt_tokens"] + usage["completion_tokens"]
+    print(
+        f"K={batch_size:<3} {usage['requests']:3d} requests   "
+        f"prompt {usage['prompt_tokens'] / ARTICLES:7.0f} tok/article   "
+        f"completion {usage['completion_tokens'] / ARTICLES:5.0f} tok/article   "
+        f"total {total_tokens / ARTICLES:7.0f} tok/article   "
+        f"wall {elapsed:6.2f}s ({elapsed / ARTICLES * 1000:6.1f} ms/article, {len(items)} items)"
+    )
+
+def run_benchmark():
+    install_mocks()
+    server = ThreadingHTTPServer(("127.0.0.1", PORT), MockOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        print(f"{ARTICLES} articles, {news_pipeline.ANALYZE_WORKERS} analyze workers")
+        for batch_size in BATCH_SIZES:
+            asyncio.run(run_once(batch_size))
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    run_benchmark()
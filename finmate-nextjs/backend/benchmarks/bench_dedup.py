@@ -0,0 +1,75 @@
+"""
+Benchmark: near-duplicate story clustering on a labeled headline corpus.
+
+Reports pairwise precision/recall of news_dedup.cluster against the labels
+in fixtures/news_dedup_corpus.json for a few similarity thresholds, then the
+clustering time as the batch grows (the corpus padded with unrelated
+synthetic stories).
+
+Run from the backend directory:
+    python -m benchmarks.bench_dedup
+"""
+import json
+import random
+import time
+from itertools import combinations
+from pathlib import Path
+
+from services import news_dedup
+
+CORPUS_PATH = Path(__file__).resolve().parent / "fixtures" / "news_dedup_corpus.json"
+THRESHOLDS = (0.2, 0.25, 0.3, 0.35, 0.4, 0.5)
+BATCH_SIZES = (50, 200, 1000)
+
+def load_corpus() -> list:
+    with open(CORPUS_PATH) as f:
+        return json.load(f)["items"]
+
+def same_story_pairs(labels: list) -> set:
+    return {(i, j) for i, j in combinations(range(len(labels)), 2) if labels[i] == labels[j]}
+
+def predicted_pairs(clusters: list) -> set:
+    return {pair for members in clusters for pair in combinations(sorted(members), 2)}
+
+def evaluate(items: list, threshold: float):
+    truth = same_story_pairs([item["cluster"] for item in items])
+    predicted = predicted_pairs(news_dedup.cluster(items, threshold))
+    true_positives = len(truth & predicted)
+    precision = true_positives / len(predicted) if predicted else 1.0
+    recall = true_positives / len(truth) if truth else 1.0
+    return precision, recall, len(predicted)
+
+def padded(items: list, total: int) -> list:
+    """The corpus plus unrelated synthetic stories, up to `total` items"""
+    rng = random.Random(7)
+    vocabulary = [f"w{n}" for n in range(5000)]
+    padding = [
+        {"cluster": f"synthetic-{n}", "title": " ".join(rng.sample(vocabulary, 10)),
+         "summary": " ".join(rng.sample(vocabulary, 30)), "link": f"https://example.com/{n}"}
+        for n in range(max(0, total - len(items)))
+    ]
+    return items + padding
+
+def run_benchmark():
+    items = load_corpus()
+    stories = len({item["cluster"] for item in items})
+    print(f"{len(items)} items, {stories} stories, {len(same_story_pairs([i['cluster'] for i in items]))} duplicate pairs")
+
+    for threshold in THRESHOLDS:
+        precision, recall, predicted = evaluate(items, threshold)
+        marker = "  <- default" if threshold == news_dedup.SIMILARITY_THRESHOLD else ""
+        print(f"threshold {threshold:.2f}   precision {precision:5.2f}   recall {recall:5.2f}   ({predicted} pairs){marker}")
+
+    for size in BATCH_SIZES:
+        batch = padded(items, size)
+        start = time.perf_counter()
+        collapsed = news_dedup.collapse(batch)
+        elapsed = time.perf_counter() - start
+        precision, recall, _ = evaluate(batch, news_dedup.SIMILARITY_THRESHOLD)
+        print(
+            f"{len(batch):5d} items -> {len(collapsed):5d} stories   {elapsed * 1000:8.1f} ms "
+            f"({elapsed / len(batch) * 1000:.2f} ms/item)   precision {precision:.2f} recall {recall:.2f}"
+        )
+
+if __name__ == "__main__":
+    run_benchmark()
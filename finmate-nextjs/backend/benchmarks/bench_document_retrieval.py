@@ -0,0 +1,96 @@
+"""
+Benchmark: 10k-character truncation vs top-k chunk retrieval for chat.
+
+Generates a 300-page filing-like PDF with reportlab in which every page
+holds one distinctive fact (a named segment's revenue) amid boilerplate,
+ingests it with document_service.ingest_pdf (into a temp directory), then
+asks about facts spread over the whole document. For each approach it
+reports how often the fact reaches the prompt and the document characters
+sent per turn.
+
+Run from the backend directory:
+    python -m benchmarks.bench_document_retrieval
+"""
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from io import BytesIO
+from pathlib import Path
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from services import document_index, document_service
+
+PAGES = 300
+QUESTIONS = 100
+FILLER_LINES = 45
+WORDS = (
+    "revenue operating income net margin fiscal quarter guidance cash flow liquidity "
+    "risk factors competition supply chain regulatory dividend shareholders"
+).split()
+SEGMENTS = [f"{a}{b}" for a in ("Aurora", "Boreal", "Cobalt", "Delta", "Ember", "Fjord", "Granite", "Harbor",
+                                "Indigo", "Juniper", "Kestrel", "Lumen", "Meridian", "Nimbus", "Onyx")
+            for b in ("", " Labs", " Energy", " Health", " Logistics", " Media", " Capital", " Robotics",
+                      " Foods", " Mobility", " Cloud", " Mining", " Retail", " Marine", " Aero", " Bio",
+                      " Grid", " Textiles", " Security", " Water")]
+
+def generate_pdf(rng: random.Random) -> tuple:
+    facts = []
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(PAGES):
+        segment = SEGMENTS[page]
+        revenue = rng.randrange(100, 9000)
+        facts.append((page + 1, segment, revenue))
+        text = pdf.beginText(40, 750)
+        text.setFont("Helvetica", 9)
+        lines = [" ".join(rng.choice(WORDS) for _ in range(14)) for _ in range(FILLER_LINES)]
+        lines.insert(rng.randrange(FILLER_LINES), f"The {segment} segment reported annual revenue of ${revenue} million.")
+        for line in lines:
+            text.textLine(line)
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue(), facts
+
+def run_benchmark():
+    rng = random.Random(11)
+    contents, facts = generate_pdf(rng)
+
+    with tempfile.TemporaryDirectory() as directory:
+        document_index.store = document_index.DocumentStore(Path(directory))
+        upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        upload.write(contents)
+        start = time.perf_counter()
+        user_id = str(uuid.uuid4())
+        result = document_service.ingest_pdf(user_id, "filing.pdf", upload)
+        ingest_ms = (time.perf_counter() - start) * 1000
+        # Read back from disk, as a later chat turn in another process would
+        index = document_index.DocumentStore(Path(directory)).get(user_id, result["document_id"])
+
+        truncated = result["text"]
+        questions = rng.sample(facts, QUESTIONS)
+        hits = {"truncated": 0, "retrieved": 0}
+        retrieved_chars = []
+        latencies = []
+        for page, segment, revenue in questions:
+            query = f"What revenue did the {segment} segment report?"
+            answer = f"${revenue} million"
+            start = time.perf_counter()
+            chunks = index.search(query)
+            latencies.append(time.perf_counter() - start)
+            context = "\n\n".join(chunk["text"] for chunk in chunks)
+            retrieved_chars.append(len(context))
+            hits["truncated"] += answer in truncated and segment in truncated
+            hits["retrieved"] += answer in context
+
+    print(f"{PAGES}-page PDF ingested in {ingest_ms:.0f} ms: {result['chunks']} chunks, top-k {document_index.DOCUMENT_TOP_K}")
+    print(f"truncated  fact in prompt {hits['truncated']:3d}/{QUESTIONS}   {len(truncated):6d} document chars/turn")
+    print(f"retrieved  fact in prompt {hits['retrieved']:3d}/{QUESTIONS}   {statistics.mean(retrieved_chars):6.0f} document chars/turn   "
+          f"search p50 {statistics.median(latencies) * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    run_benchmark()
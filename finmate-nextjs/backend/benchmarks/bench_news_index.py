@@ -0,0 +1,69 @@
+"""
+Benchmark: per-user ranked news from the in-memory index.
+
+Fills a NewsIndex with synthetic articles tagged with tickers from a few
+hundred synthetic companies (spread over sectors and industries), then times
+rank() for random portfolios. No DB or LLM is involved.
+
+Run from the backend directory:
+    python -m benchmarks.bench_news_index
+"""
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from models import NewsItem
+from services.news_index import NewsIndex
+
+ARTICLES = 5000
+TICKERS = 500
+SECTORS = 11
+INDUSTRIES_PER_SECTOR = 6
+PORTFOLIO_SIZE = 10
+QUERIES = 2000
+
+def synthetic_index(rng: random.Random) -> tuple:
+    tickers = [f"T{n:03d}" for n in range(TICKERS)]
+    profiles = {}
+    for ticker in tickers:
+        sector = rng.randrange(SECTORS)
+        profiles[ticker] = {"sector": f"Sector {sector}", "industry": f"Industry {sector}.{rng.randrange(INDUSTRIES_PER_SECTOR)}"}
+
+    now = datetime.now(timezone.utc)
+    articles = [
+        NewsItem(
+            id=str(uuid.uuid4()), headline=f"Story {n}", summary="...", sentiment_score=5, category="Markets",
+            affected_tickers=rng.sample(tickers, rng.randint(0, 3)), impact="neutral", impact_reason="",
+            risk_level="low", link=f"https://example.com/{n}", source="Mock",
+            published=(now - timedelta(minutes=rng.randrange(7 * 24 * 60))).isoformat()
+        )
+        for n in range(ARTICLES)
+    ]
+
+    index = NewsIndex(max_articles=ARTICLES)
+    index.set_profiles(profiles)
+    start = time.perf_counter()
+    index.add(articles)
+    print(f"Indexed {ARTICLES} articles in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return index, tickers
+
+def run_benchmark():
+    rng = random.Random(3)
+    index, tickers = synthetic_index(rng)
+    portfolios = [rng.sample(tickers, PORTFOLIO_SIZE) for _ in range(QUERIES)]
+
+    latencies = []
+    for portfolio in portfolios:
+        start = time.perf_counter()
+        index.rank(portfolio, limit=20)
+        latencies.append(time.perf_counter() - start)
+
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered) * 1e6
+    p99 = ordered[int(len(ordered) * 0.99)] * 1e6
+    print(f"rank() for {PORTFOLIO_SIZE}-ticker portfolios: p50 {p50:.0f} us   p99 {p99:.0f} us   (n={QUERIES})")
+
+if __name__ == "__main__":
+    run_benchmark()
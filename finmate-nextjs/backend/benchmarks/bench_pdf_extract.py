@@ -0,0 +1,99 @@
+"""
+Benchmark: old upload handling vs document_service.ingest_pdf.
+
+Generates a 300-page text-heavy PDF (a stand-in for a 10-K filing) with
+reportlab, spools it to a temp file the way an upload arrives, then
+compares the old path (read the whole file into memory, extract every page
+into one string, truncate) with ingest_pdf, which parses the spooled file
+page by page into the chunk index (in a temp directory) and keeps the
+truncated text on the way. Both parse every page; peak memory is measured
+with tracemalloc.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pdf_extract
+"""
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+from io import BytesIO
+from pathlib import Path
+
+from PyPDF2 import PdfReader
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from services import document_index, document_service
+
+PAGES = 300
+LINES_PER_PAGE = 50
+REPEATS = 3
+WORDS = (
+    "revenue operating income net margin fiscal quarter guidance segment cash flow "
+    "liquidity risk factors competition supply chain regulatory dividend shareholders"
+).split()
+
+def generate_pdf() -> bytes:
+    rng = random.Random(7)
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(PAGES):
+        text = pdf.beginText(40, 750)
+        text.setFont("Helvetica", 9)
+        text.textLine(f"Item {page + 1}. Management's discussion and analysis")
+        for _ in range(LINES_PER_PAGE):
+            text.textLine(" ".join(rng.choice(WORDS) for _ in range(14)))
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+def spooled(contents: bytes):
+    """The upload as Starlette hands it over: a spooled temp file"""
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    upload.write(contents)
+    upload.seek(0)
+    return upload
+
+def old_path(upload) -> str:
+    contents = upload.read()
+    reader = PdfReader(BytesIO(contents))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text()
+    return text[:10000]
+
+def new_path(upload) -> str:
+    return document_service.ingest_pdf(str(uuid.uuid4()), "filing.pdf", upload)["text"]
+
+def measure(name: str, fn, contents: bytes) -> str:
+    times = []
+    for _ in range(REPEATS):
+        upload = spooled(contents)
+        start = time.perf_counter()
+        text = fn(upload)
+        times.append(time.perf_counter() - start)
+        upload.close()
+
+    upload = spooled(contents)
+    tracemalloc.start()
+    fn(upload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    upload.close()
+
+    print(f"{name:<10} best {min(times) * 1000:8.1f} ms   peak {peak / 1024 / 1024:6.2f} MB   {len(text)} chars")
+    return text
+
+def run_benchmark():
+    contents = generate_pdf()
+    print(f"{PAGES}-page PDF, {len(contents) / 1024 / 1024:.2f} MB, budget {document_service.DOCUMENT_CHAR_BUDGET} chars")
+    with tempfile.TemporaryDirectory() as directory:
+        document_index.store = document_index.DocumentStore(Path(directory))
+        old_text = measure("whole", old_path, contents)
+        new_text = measure("ingest", new_path, contents)
+    assert new_text == old_text, "ingest_pdf returned different text"
+
+if __name__ == "__main__":
+    run_benchmark()
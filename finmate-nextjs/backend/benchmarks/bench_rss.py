@@ -0,0 +1,148 @@
+"""
+Harness: RSS polling against a local fixture server.
+
+Serves three fixture feeds: one answering conditional requests by ETag, one
+by Last-Modified, and one ignoring them (always 200, same body), plus a feed
+that never answers in time. Times a cold poll, a repeat poll with nothing
+new, and a poll after one feed gained an entry, with the 200s, 304s and
+parses each cost. The behaviour itself is asserted in
+tests/test_rss_service.py.
+
+Then registers a few hundred per-ticker feeds and shows how many come due
+per scheduler tick over one poll interval.
+
+Run from the backend directory:
+    python -m benchmarks.bench_rss
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services import rss_service
+from services.feed_registry import Feed, FeedRegistry, registry
+
+PORT = 8767
+BASE_URL = f"http://127.0.0.1:{PORT}"
+FEED_TIMEOUT = 1.0
+SLOW_FEED_DELAY = 3.0
+MAX_ITEMS = 5
+TICKER_FEEDS = 300
+TICK_SECONDS = 60
+
+feeds = {}  # path -> list of (guid, title, published)
+requests = {"200": 0, "304": 0}
+requests_lock = threading.Lock()
+
+def add_entry(path: str, guid: str, title: str, minutes_ago: int = 0):
+    published = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    feeds[path].insert(0, (guid, title, published))
+
+def render(path: str) -> bytes:
+    items = "".join(
+        f"<item><guid>{guid}</guid><title>{title}</title><link>{BASE_URL}{path}/{guid}</link>"
+        f"<description>{title} summary.</description><pubDate>{format_datetime(published)}</pubDate></item>"
+        for guid, title, published in feeds[path]
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{path}</title>{items}</channel></rss>'.encode()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(SLOW_FEED_DELAY)
+        body = render(self.path)
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        last_modified = format_datetime(max(p for _, _, p in feeds[self.path]), usegmt=True)
+
+        not_modified = (
+            (self.path == "/etag" and self.headers.get("If-None-Match") == etag)
+            or (self.path == "/last-modified" and self.headers.get("If-Modified-Since") == last_modified)
+        )
+        with requests_lock:
+            requests["304" if not_modified else "200"] += 1
+        if not_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/etag":
+            self.send_header("ETag", etag)
+        if self.path == "/last-modified":
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def setup_fixtures():
+    for path in ("/etag", "/last-modified", "/no-conditional", "/slow"):
+        feeds[path] = []
+        for n in range(8):
+            add_entry(path, f"{path.strip('/')}-{n}", f"Story {n} from {path}", minutes_ago=60 - n)
+    rss_service.FEED_TIMEOUT_SECONDS = FEED_TIMEOUT
+    return [
+        registry.register(Feed(name=name, url=f"{BASE_URL}{path}", max_items=MAX_ITEMS))
+        for name, path in (("ETag feed", "/etag"), ("Last-Modified feed", "/last-modified"),
+                           ("Plain feed", "/no-conditional"), ("Slow feed", "/slow"))
+    ]
+
+def parsed_count() -> int:
+    return sum(counters["parsed"] for counters in rss_service.feed_stats().values())
+
+async def poll(label: str, fixture_feeds: list) -> list:
+    for key in requests:
+        requests[key] = 0
+    parsed_before = parsed_count()
+    start = time.perf_counter()
+    items = await rss_service.fetch_rss_news_async(fixture_feeds)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<22} {elapsed * 1000:7.1f} ms   {len(items):2d} items   "
+        f"200s {requests['200']}   304s {requests['304']}   parsed {parsed_count() - parsed_before}"
+    )
+    return items
+
+async def run(fixture_feeds: list):
+    await poll("cold", fixture_feeds)
+    await poll("nothing new", fixture_feeds)
+    add_entry("/etag", "etag-new", "Breaking story")
+    await poll("one new entry", fixture_feeds)
+
+    slow = next(feed for feed in fixture_feeds if feed.url.endswith("/slow"))
+    print(f"slow feed: {slow.health()['status']}, {slow.consecutive_failures} failures, "
+          f"next poll in {slow.next_due - time.time():.0f}s")
+
+    await rss_service.close_client()
+
+def spread():
+    ticker_registry = FeedRegistry()
+    ticker_registry.ticker_template = {"name": "{ticker}", "url": "https://example.com/rss?s={ticker}", "poll_interval": 1800}
+    ticker_registry.sync_ticker_feeds(f"T{n:03d}" for n in range(TICKER_FEEDS))
+
+    start = time.time()
+    per_tick = [
+        len(ticker_registry.due(now=start + tick * TICK_SECONDS, limit=TICKER_FEEDS))
+        for tick in range(1, 1800 // TICK_SECONDS + 1)
+    ]
+    print(f"{TICKER_FEEDS} ticker feeds, 30 min interval, {TICK_SECONDS}s ticks: "
+          f"max {max(per_tick)} / min {min(per_tick)} feeds per tick, {sum(per_tick)} fetches in total")
+
+def run_harness():
+    fixture_feeds = setup_fixtures()
+    server = ThreadingHTTPServer(("127.0.0.1", PORT), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        asyncio.run(run(fixture_feeds))
+    finally:
+        server.shutdown()
+    spread()
+
+if __name__ == "__main__":
+    run_harness()
@@ -0,0 +1,81 @@
+"""
+Benchmark: per-ticker indicator loop vs the vectorized wide-frame path.
+
+Uses synthetic random-walk OHLC data (6 months of daily bars) so the numbers
+measure computation only, not yfinance latency. Tickers follow mixed trading
+calendars, as a real portfolio does: every 5th trades every day (crypto) and
+the rest trade weekdays minus their market's holidays, so the merged frame
+has gaps in every column. The per-ticker loop computes each ticker over its
+own sessions only and is the reference the vectorized path must match.
+
+Run from the backend directory:
+    python -m benchmarks.bench_technicals
+"""
+import time
+import numpy as np
+import pandas as pd
+
+from services.technicals_service import compute_indicators, summarize
+
+TICKERS = 50
+DAYS = 126
+REPEATS = 20
+
+MARKETS = 3
+HOLIDAYS_PER_MARKET = 4
+
+def synthetic_frames(n_tickers: int, n_days: int):
+    rng = np.random.default_rng(42)
+    # Calendar days covering n_days weekday sessions
+    index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=n_days * 7 // 5 + 7)
+    columns = [f"T{i:03d}" for i in range(n_tickers)]
+    n_rows = len(index)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_rows, n_tickers)), axis=0))
+    spread = np.abs(rng.normal(0, 0.01, (n_rows, n_tickers))) * close
+
+    weekdays = np.asarray(index.dayofweek < 5)
+    holidays = [rng.choice(np.flatnonzero(weekdays), HOLIDAYS_PER_MARKET, replace=False) for _ in range(MARKETS)]
+    trades = np.ones((n_rows, n_tickers), dtype=bool)
+    for i in range(n_tickers):
+        if i % 5:
+            trades[:, i] = weekdays
+            trades[holidays[i % MARKETS], i] = False
+
+    def frame(values):
+        return pd.DataFrame(np.where(trades, values, np.nan), index=index, columns=columns)
+
+    return frame(close), frame(close + spread), frame(close - spread)
+
+def per_ticker_loop(close, high, low):
+    results = {}
+    for ticker in close.columns:
+        c = close[[ticker]].dropna()
+        h, l = high[[ticker]].loc[c.index], low[[ticker]].loc[c.index]
+        results.update(summarize(c, compute_indicators(c, h, l)))
+    return results
+
+def vectorized(close, high, low):
+    return summarize(close, compute_indicators(close, high, low))
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(*args)
+    return (time.perf_counter() - start) / REPEATS
+
+def main():
+    close, high, low = synthetic_frames(TICKERS, DAYS)
+
+    # Both paths must agree before we compare speed
+    reference = per_ticker_loop(close, high, low)
+    assert reference == vectorized(close, high, low)
+    assert all(entry["sma_50"] is not None for entry in reference.values())
+
+    loop_s = timed(per_ticker_loop, close, high, low)
+    vec_s = timed(vectorized, close, high, low)
+    print(f"{TICKERS} tickers x {DAYS} bars, mean of {REPEATS} runs")
+    print(f"per-ticker loop : {loop_s * 1000:8.2f} ms")
+    print(f"vectorized      : {vec_s * 1000:8.2f} ms  ({loop_s / vec_s:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Load test: latency of cheap endpoints while a news refresh is running.
+
+Starts the API under uvicorn with every upstream mocked (RSS, DuckDuckGo,
+OpenAI, Supabase writes, yfinance) using realistic latencies, then measures
+p50/p99 of /health and /api/quote/{ticker} at a steady request rate, first
+idle and then while POST /api/news/refresh is in flight. If the event loop
+were blocked by the refresh, the second run's p99 would approach the
+refresh duration.
+
+Run from the backend directory:
+    python -m benchmarks.load_test
+"""
+import os
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+from datetime import datetime
+
+os.environ["NEWS_SCHEDULER_ENABLED"] = "false"
+
+import httpx
+import uvicorn
+
+import main
+from dependencies import get_current_user
+from services import llm_service, news_dedup, news_service, quote_service, rss_service
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+RATE_PER_SECOND = 20
+DURATION_SECONDS = 5
+
+# Simulated upstream latencies (seconds)
+RSS_LATENCY = 0.3
+SEARCH_LATENCY = 0.8
+LLM_LATENCY = 2.0
+DB_WRITE_LATENCY = 0.1
+QUOTE_LATENCY = 0.3
+RAW_ITEMS = 15
+
+async def fake_rss():
+    await asyncio.sleep(RSS_LATENCY)
+    now = datetime.now().isoformat()
+    return [
+        {"title": f"Story {story_id}", "link": f"https://example.com/{story_id}", "summary": "...",
+         "published": now, "source": "Mock"}
+        for story_id in (uuid.uuid4() for _ in range(RAW_ITEMS))
+    ]
+
+def fake_search(query, max_results=3):
+    time.sleep(SEARCH_LATENCY)  # DDGS is blocking
+    return "Search Results for Verification:\n"
+
+async def fake_analyze(news_item, portfolio, search_context=None):
+    await asyncio.sleep(LLM_LATENCY)
+    return {"headline": news_item["title"], "summary": "Mock", "affected_tickers": []}
+
+def fake_save_batch(news_items):
+    time.sleep(DB_WRITE_LATENCY)
+    return {item.link: {"id": str(uuid.uuid4()), "created_at": datetime.now().isoformat()} for item in news_items}
+
+def fake_download_quotes(tickers):
+    time.sleep(QUOTE_LATENCY)
+    return {t: {"ticker": t, "price": 100.0, "change": 0.0, "change_percent": 0.0, "currency": "USD"} for t in tickers}
+
+def install_mocks():
+    rss_service.fetch_rss_news_async = fake_rss
+    # The synthetic stories would be collapsed as duplicates of each other
+    news_dedup.DEDUP_ENABLED = False
+    llm_service.agent_tools.get("search_web").fn = fake_search
+    llm_service.analyze_news_async = fake_analyze
+    news_service.save_analyzed_news_batch = fake_save_batch
+    news_service.get_latest_news = lambda *args, **kwargs: []
+    quote_service._download_quotes = fake_download_quotes
+    main.app.dependency_overrides[get_current_user] = lambda: "load-test-user"
+
+def start_server() -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+async def sample(client: httpx.AsyncClient, path: str) -> list:
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        await client.get(path)
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    for _ in range(RATE_PER_SECOND * DURATION_SECONDS):
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(1 / RATE_PER_SECOND)
+    await asyncio.gather(*tasks)
+    return latencies
+
+def report(label: str, latencies: list):
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered) * 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+    print(f"{label:<34} p50 {p50:8.1f} ms   p99 {p99:8.1f} ms   (n={len(ordered)})")
+
+async def run():
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60) as client:
+        for path in ("/health", "/api/quote/AAPL"):
+            report(f"{path} idle", await sample(client, path))
+
+        for path in ("/health", "/api/quote/AAPL"):
+            start = time.perf_counter()
+            refresh = asyncio.create_task(client.post("/api/news/refresh", headers={"Authorization": "Bearer x"}))
+            await asyncio.sleep(0.1)
+            report(f"{path} during refresh", await sample(client, path))
+            response = await refresh
+            print(f"{'  refresh':<34} {(time.perf_counter() - start):.2f}s, {len(response.json())} items")
+            # Let the next refresh tick again
+            main.news_scheduler.scheduler.last_tick_at = None
+
+def run_load_test():
+    install_mocks()
+    server = start_server()
+    try:
+        asyncio.run(run())
+    finally:
+        server.should_exit = True
+
+if __name__ == "__main__":
+    run_load_test()
@@ -0,0 +1,17 @@
+-- Migration: Persistent LLM analysis cache
+-- Run this in Supabase SQL Editor
+
+-- One row per (article, portfolio). portfolio_hash is 'global' for
+-- portfolio-independent analyses, else a hash of the sorted tickers.
+CREATE TABLE IF NOT EXISTS news_analysis_cache (
+    url TEXT NOT NULL,
+    portfolio_hash TEXT NOT NULL,
+    analysis JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    PRIMARY KEY (url, portfolio_hash)
+);
+
+ALTER TABLE news_analysis_cache ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role manages analysis cache" ON news_analysis_cache;
+CREATE POLICY "Service role manages analysis cache" ON news_analysis_cache FOR ALL TO service_role USING (true);
@@ -0,0 +1,61 @@
+-- Migration: Single round-trip chat persistence
+-- Run this in Supabase SQL Editor. The trigger is required by
+-- chat_service (it no longer updates updated_at itself); the RPC is used by
+-- chat_service.save_turn unless CHAT_SAVE_RPC=false.
+
+-- Bump conversations.updated_at whenever messages are inserted, once per
+-- statement, so saving a turn doesn't need a separate update.
+CREATE OR REPLACE FUNCTION touch_conversations_on_messages() RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE conversations
+    SET updated_at = timezone('utc'::text, now())
+    WHERE id IN (SELECT DISTINCT conversation_id FROM new_messages);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS messages_touch_conversations ON messages;
+CREATE TRIGGER messages_touch_conversations
+    AFTER INSERT ON messages
+    REFERENCING NEW TABLE AS new_messages
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION touch_conversations_on_messages();
+
+-- Saves a chat turn in one call. With p_title the conversation is created
+-- (its ID must be new); otherwise it must already belong to p_user_id.
+-- p_messages is a JSON array of {"role", "content", "created_at"}.
+CREATE OR REPLACE FUNCTION save_chat_turn(
+    p_conversation_id UUID,
+    p_user_id UUID,
+    p_title TEXT,
+    p_messages JSONB
+) RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_title IS NOT NULL THEN
+        INSERT INTO conversations (id, user_id, title)
+        VALUES (p_conversation_id, p_user_id, p_title);
+    ELSIF NOT EXISTS (
+        SELECT 1 FROM conversations WHERE id = p_conversation_id AND user_id = p_user_id
+    ) THEN
+        RAISE EXCEPTION 'Conversation % not found for user', p_conversation_id
+            USING ERRCODE = 'no_data_found';
+    END IF;
+
+    -- updated_at is bumped by the messages trigger
+    INSERT INTO messages (conversation_id, role, content, created_at)
+    SELECT p_conversation_id, m->>'role', m->>'content',
+           COALESCE((m->>'created_at')::timestamptz, timezone('utc'::text, now()))
+    FROM jsonb_array_elements(p_messages) AS m;
+END;
+$$;
+
+-- Keyset pagination of the conversation list and threads: (updated_at, id)
+-- and (created_at, id) cursors, newest first
+CREATE INDEX IF NOT EXISTS idx_conversations_user_updated_id
+    ON conversations(user_id, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_conv_created_id
+    ON messages(conversation_id, created_at DESC, id DESC);
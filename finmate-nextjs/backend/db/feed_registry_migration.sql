@@ -0,0 +1,18 @@
+-- Migration: Feed registry
+-- Run this in Supabase SQL Editor. Rows are read in addition to
+-- data/feeds.json when NEWS_FEEDS_FROM_DB=true.
+
+CREATE TABLE IF NOT EXISTS news_feeds (
+    url TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    poll_interval INT NOT NULL DEFAULT 600,   -- seconds
+    priority INT NOT NULL DEFAULT 0,          -- higher is fetched first
+    max_items INT NOT NULL DEFAULT 5,         -- fresh entries taken per poll
+    enabled BOOLEAN NOT NULL DEFAULT true,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
+);
+
+ALTER TABLE news_feeds ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role manages feeds" ON news_feeds;
+CREATE POLICY "Service role manages feeds" ON news_feeds FOR ALL TO service_role USING (true);
@@ -71,3 +71,5 @@ create table public.messages (
 create index idx_portfolio_items_ticker on public.portfolio_items(ticker);
 create index idx_news_published on public.news_articles(published_at);
 create index idx_messages_conv_id on public.messages(conversation_id);
+create index idx_news_created_id on public.news_articles(created_at desc, id desc);
+create index idx_news_ticker_assoc_ticker on public.news_ticker_associations(ticker);
@@ -7,3 +7,7 @@ ADD COLUMN IF NOT EXISTS related_sources TEXT[] DEFAULT '{}';
 -- Optional: Update existing rows to have default empty values if needed (the DEFAULT above handles new ones)
 UPDATE news_articles SET impact_reason = '' WHERE impact_reason IS NULL;
 UPDATE news_articles SET related_sources = '{}' WHERE related_sources IS NULL;
+
+-- Indexes for the paginated news feed ((created_at, id) cursor + ticker filter)
+CREATE INDEX IF NOT EXISTS idx_news_created_id ON news_articles(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_news_ticker_assoc_ticker ON news_ticker_associations(ticker);
@@ -1,15 +1,77 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from db.client import supabase
+from services.cache import TTLCache
+import hashlib
+import logging
+import os
+import time
+import jwt
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Local verification: HS256 tokens are checked against the project's JWT secret,
+# asymmetric tokens against the project's JWKS (fetched once, refreshed periodically)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
+JWT_AUDIENCE = os.environ.get("SUPABASE_JWT_AUDIENCE", "authenticated")
+JWKS_REFRESH_SECONDS = int(os.environ.get("SUPABASE_JWKS_REFRESH_SECONDS", "600"))
+
+# Validated tokens, keyed by token hash. Entries never outlive the token's exp.
+TOKEN_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = int(os.environ.get("AUTH_TOKEN_CACHE_TTL_SECONDS", "300"))
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+_jwks_client = None
+if SUPABASE_URL:
+    _jwks_client = jwt.PyJWKClient(
+        f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+        cache_jwk_set=True,
+        lifespan=JWKS_REFRESH_SECONDS
+    )
+
+class UndecidedTokenError(Exception):
+    """Local verification has no key to check this token with"""
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _verify_locally(token: str) -> dict:
     """
-    Validates the JWT token and returns the user_id.
+    Verify signature, expiry and audience without a network call.
+    Raises jwt.InvalidTokenError for bad tokens and UndecidedTokenError when
+    no suitable key is configured or the JWKS can't be reached.
     """
-    token = credentials.credentials
-    
+    alg = jwt.get_unverified_header(token).get("alg")
+
+    if alg == "HS256":
+        if not JWT_SECRET:
+            raise UndecidedTokenError("SUPABASE_JWT_SECRET not configured")
+        key = JWT_SECRET
+    elif alg in ("RS256", "ES256") and _jwks_client:
+        try:
+            key = _jwks_client.get_signing_key_from_jwt(token).key
+        except jwt.PyJWKClientError as e:
+            raise UndecidedTokenError(str(e))
+    else:
+        raise UndecidedTokenError(f"No local key for alg {alg}")
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[alg],
+        audience=JWT_AUDIENCE,
+        options={"require": ["exp", "sub"]}
+    )
+
+def _verify_remotely(token: str) -> str:
+    """Ask Supabase Auth to validate the token (one network round-trip)"""
     if not supabase:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -17,21 +79,45 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         )
 
     try:
-        # Verify token with Supabase
         user_response = supabase.auth.get_user(token)
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        return user_response.user.id
-        
     except Exception as e:
         # If Supabase raises an error (e.g. invalid token)
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Authentication failed: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized(f"Authentication failed: {str(e)}")
+
+    if not user_response or not user_response.user:
+        raise _unauthorized("Invalid authentication credentials")
+
+    return user_response.user.id
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Validates the JWT token and returns the user_id.
+    """
+    token = credentials.credentials
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+
+    user_id = _token_cache.get(token_key)
+    if user_id:
+        return user_id
+
+    try:
+        claims = _verify_locally(token)
+        user_id = claims["sub"]
+        exp = claims["exp"]
+    except UndecidedTokenError as e:
+        logger.debug(f"Local JWT verification undecided, falling back to Supabase: {e}")
+        user_id = _verify_remotely(token)
+        try:
+            exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except jwt.InvalidTokenError:
+            exp = None
+    except jwt.InvalidTokenError as e:
+        raise _unauthorized(f"Authentication failed: {str(e)}")
+
+    ttl = TOKEN_CACHE_TTL_SECONDS
+    if exp:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _token_cache.set(token_key, user_id, ttl=ttl)
+
+    return user_id
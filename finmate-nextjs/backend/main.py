@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import logging
@@ -15,18 +16,37 @@ print(f"DEBUG: .env loaded: {success}")
 print(f"DEBUG: OPENAI_API_KEY present: {'OPENAI_API_KEY' in os.environ}")
 
 from api import portfolio, news, chat, reports, quote
+from services import news_scheduler, news_index, news_writer, executor, rss_service, document_index
 
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background news ingestion so requests are served from pre-analyzed news
+    await news_scheduler.scheduler.start()
+    await news_index.index.start()
+    # Drop uploaded documents past their retention (see document_index)
+    try:
+        await executor.run_blocking(document_index.store.prune)
+    except Exception as e:
+        logger.error(f"Failed to prune documents: {e}")
+    yield
+    await news_scheduler.scheduler.stop()
+    await news_writer.writer.stop()
+    await rss_service.close_client()
+    executor.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
     title="Senhor Finanças API",
     description="AI-Powered Portfolio News Intelligence API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
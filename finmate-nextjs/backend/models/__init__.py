@@ -31,6 +31,7 @@ class NewsItem(BaseModel):
     published: Optional[str] = None
     source: Optional[str] = "Unknown"
     related_sources: List[str] = []
+    created_at: Optional[str] = None  # Pagination cursor for GET /api/news
 
 class ChatMessage(BaseModel):
     id: Optional[str] = None
@@ -45,3 +46,4 @@ class ChatRequest(BaseModel):
     portfolio: Optional[List[str]] = None
     news_context: Optional[List[NewsItem]] = None
     document_context: Optional[str] = None
+    document_id: Optional[str] = None  # From /api/chat/upload-document; relevant chunks are retrieved per turn
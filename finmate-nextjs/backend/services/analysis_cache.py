@@ -0,0 +1,68 @@
+import os
+import hashlib
+import logging
+from typing import Dict, Any, List, Optional
+from db.client import supabase
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Split mode: portfolio-independent analysis (summary, category, sentiment) is
+# cached once per article, and only the cheap impact step runs per portfolio
+SPLIT_MODE = os.environ.get("NEWS_ANALYSIS_SPLIT", "false").lower() == "true"
+
+# Key for analyses that don't depend on a portfolio
+GLOBAL_KEY = "global"
+
+# Hot entries in memory in front of the news_analysis_cache table
+_memory = TTLCache(
+    maxsize=int(os.environ.get("ANALYSIS_CACHE_SIZE", "5000")),
+    ttl=int(os.environ.get("ANALYSIS_CACHE_TTL_SECONDS", str(6 * 3600)))
+)
+
+def portfolio_key(portfolio: List[str]) -> str:
+    """Canonical hash of a portfolio: order and case don't matter"""
+    tickers = sorted({t.strip().upper() for t in portfolio if t and t.strip()})
+    if not tickers:
+        return GLOBAL_KEY
+    return hashlib.sha256(",".join(tickers).encode()).hexdigest()[:32]
+
+def impact_key(portfolio: List[str]) -> str:
+    """
+    Key for impact-only entries (affected tickers, impact, risk), kept apart
+    from full analyses of the same portfolio so neither is served as the other
+    """
+    return f"impact:{portfolio_key(portfolio)}"
+
+def get(url: str, key: str) -> Optional[Dict[str, Any]]:
+    """Cached analysis for (article URL, portfolio key), or None"""
+    cached = _memory.get((url, key))
+    if cached is not None:
+        return cached
+
+    if not supabase:
+        return None
+    try:
+        res = supabase.table("news_analysis_cache").select("analysis") \
+            .eq("url", url).eq("portfolio_hash", key).limit(1).execute()
+        if not res.data:
+            return None
+        analysis = res.data[0]['analysis']
+        _memory.set((url, key), analysis)
+        return analysis
+    except Exception as e:
+        logger.error(f"Failed to read analysis cache for {url}: {e}")
+        return None
+
+def put(url: str, key: str, analysis: Dict[str, Any]):
+    _memory.set((url, key), analysis)
+    if not supabase:
+        return
+    try:
+        supabase.table("news_analysis_cache").upsert({
+            "url": url,
+            "portfolio_hash": key,
+            "analysis": analysis
+        }, on_conflict="url,portfolio_hash").execute()
+    except Exception as e:
+        logger.error(f"Failed to write analysis cache for {url}: {e}")
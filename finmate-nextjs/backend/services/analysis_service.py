@@ -1,7 +1,5 @@
-import yfinance as yf
-import pandas as pd
 import logging
-from datetime import datetime
+from services import technicals_service, fundamentals_cache
 
 logger = logging.getLogger(__name__)
 
@@ -11,8 +9,10 @@ def get_fundamentals(ticker: str) -> dict:
     """
     try:
         ticker = ticker.upper()
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        # Cached .info (stale-while-revalidate), the slowest yfinance endpoint
+        info = fundamentals_cache.get_info(ticker, groups=("valuation", "profile"))
+        if not info:
+            return None
         
         return {
             "ticker": ticker,
@@ -32,38 +32,8 @@ def get_fundamentals(ticker: str) -> dict:
 
 def get_technical_indicators(ticker: str) -> dict:
     """
-    Calculate simple technical indicators (RSI, SMA).
+    Calculate technical indicators (Wilder RSI, SMA, EMA, MACD, Bollinger, ATR)
+    for a single ticker. See technicals_service for the multi-ticker engine.
     """
-    try:
-        ticker = ticker.upper()
-        stock = yf.Ticker(ticker)
-        
-        # Get 6 months of history to ensure enough data for EMA/RSI
-        hist = stock.history(period="6mo")
-        if hist.empty:
-            return None
-            
-        # 1. Close Price Series
-        close = hist['Close']
-        current_price = close.iloc[-1]
-        
-        # 2. SMA 50
-        sma_50 = close.rolling(window=50).mean().iloc[-1]
-        
-        # 3. RSI 14
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi_14 = 100 - (100 / (1 + rs)).iloc[-1]
-        
-        return {
-            "ticker": ticker,
-            "current_price": current_price,
-            "rsi_14": round(rsi_14, 2),
-            "sma_50": round(sma_50, 2),
-            "signal": "Overbought" if rsi_14 > 70 else "Oversold" if rsi_14 < 30 else "Neutral"
-        }
-    except Exception as e:
-        logger.error(f"Error calculating technicals for {ticker}: {e}")
-        return None
+    ticker = ticker.upper()
+    return technicals_service.get_technicals([ticker]).get(ticker)
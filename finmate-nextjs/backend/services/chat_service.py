@@ -1,35 +1,109 @@
 from typing import List, Dict, Optional
+from datetime import datetime
+import os
 import uuid
 import logging
 from db.client import supabase
-from datetime import datetime
+from services.cache import TTLCache
+from services.pagination import keyset_filter
 
 logger = logging.getLogger(__name__)
 
+# Save a turn with the save_chat_turn RPC (see db/chat_persistence_migration.sql,
+# whose trigger also keeps conversations.updated_at current for plain inserts)
+SAVE_RPC = os.environ.get("CHAT_SAVE_RPC", "true").lower() == "true"
+
+# Explicit projections: the sidebar and thread views only need these
+CONVERSATION_COLUMNS = "id, title, updated_at"
+MESSAGE_COLUMNS = "id, conversation_id, role, content, created_at"
+CONVERSATION_PAGE_MAX = 100
+
+# First page of each user's conversation list; dropped when one of their conversations changes
+CONVERSATION_CACHE_USERS = int(os.environ.get("CHAT_CONVERSATION_CACHE_USERS", "1000"))
+CONVERSATION_CACHE_TTL_SECONDS = int(os.environ.get("CHAT_CONVERSATION_CACHE_TTL_SECONDS", "300"))
+
 class ChatService:
-    def get_conversations(self, user_id: str) -> List[Dict]:
-        """Fetch all conversations for a user ordered by last updated"""
+    def __init__(self):
+        self._conversations = TTLCache(maxsize=CONVERSATION_CACHE_USERS, ttl=CONVERSATION_CACHE_TTL_SECONDS)
+
+    def get_conversations(self, user_id: str, limit: int = 50, before: Optional[datetime] = None,
+                          before_id: Optional[uuid.UUID] = None) -> List[Dict]:
+        """
+        Fetch a user's conversations, most recently updated first (by
+        updated_at, then id). `before`/`before_id` are an (updated_at, id)
+        cursor: pass the last item's updated_at and id to get the next page.
+        Conversations touched by the same statement share an updated_at, so
+        the id breaks ties. The first page is served from a per-user cache.
+        """
         if not supabase:
             return []
+        if not before:
+            cached = self._conversations.get(user_id)
+            if cached is not None:
+                return cached[:limit]
         try:
-            res = supabase.table("conversations").select("*").eq("user_id", user_id).order("updated_at", desc=True).execute()
-            return res.data
+            query = supabase.table("conversations").select(CONVERSATION_COLUMNS).eq("user_id", user_id)
+            if before and before_id:
+                query = query.or_(keyset_filter("updated_at", before, before_id))
+            elif before:
+                query = query.lt("updated_at", before.isoformat())
+            # The first page is always read at full size so any smaller limit can be cut from the cache
+            query = query.order("updated_at", desc=True).order("id", desc=True)
+            res = query.limit(limit if before else CONVERSATION_PAGE_MAX).execute()
+            if not before:
+                self._conversations.set(user_id, res.data)
+            return res.data[:limit]
         except Exception as e:
             logger.error(f"Error fetching conversations: {e}")
             return []
 
-    def get_messages(self, conversation_id: str) -> List[Dict]:
-        """Fetch messages for a specific conversation"""
+    def invalidate_conversations(self, user_id: Optional[str]):
+        if user_id:
+            self._conversations.pop(user_id)
+
+    def get_messages(self, conversation_id: str, user_id: Optional[str] = None, limit: int = 100,
+                     before: Optional[datetime] = None, before_id: Optional[uuid.UUID] = None) -> List[Dict]:
+        """
+        Fetch the latest `limit` messages of a conversation, oldest first.
+        `before`/`before_id` are a (created_at, id) cursor (pass the first
+        item's created_at and id to page back). With user_id, only returns messages of a conversation the
+        user owns; the check is an inner join, so it costs no extra query.
+        """
         if not supabase:
             return []
         try:
-            # RLS or simple ID match
-            res = supabase.table("messages").select("*").eq("conversation_id", conversation_id).order("created_at", desc=False).execute()
-            return res.data
+            if user_id:
+                query = supabase.table("messages") \
+                    .select(f"{MESSAGE_COLUMNS}, conversations!inner(user_id)") \
+                    .eq("conversations.user_id", user_id)
+            else:
+                query = supabase.table("messages").select(MESSAGE_COLUMNS)
+            query = query.eq("conversation_id", conversation_id)
+            if before and before_id:
+                query = query.or_(keyset_filter("created_at", before, before_id))
+            elif before:
+                query = query.lt("created_at", before.isoformat())
+            res = query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+            messages = []
+            for row in reversed(res.data):
+                row.pop("conversations", None)
+                messages.append(row)
+            return messages
         except Exception as e:
             logger.error(f"Error fetching messages: {e}")
             return []
 
+    def owns_conversation(self, user_id: str, conversation_id: str) -> bool:
+        """Whether the conversation exists and belongs to the user"""
+        if not supabase:
+            return True
+        try:
+            res = supabase.table("conversations").select("id").eq("id", conversation_id).eq("user_id", user_id).limit(1).execute()
+            return bool(res.data)
+        except Exception as e:
+            logger.error(f"Error checking conversation owner: {e}")
+            return False
+
     def create_conversation(self, user_id: str, title: str = "New Chat") -> Optional[str]:
         """Create a new conversation and return its ID"""
         if not supabase:
@@ -37,6 +111,7 @@ class ChatService:
         try:
             data = {"title": title, "user_id": user_id}
             res = supabase.table("conversations").insert(data).execute()
+            self.invalidate_conversations(user_id)
             if res.data:
                 return res.data[0]['id']
             return None
@@ -44,8 +119,8 @@ class ChatService:
             logger.error(f"Error creating conversation: {e}")
             return None
 
-    def add_message(self, conversation_id: str, role: str, content: str):
-        """Save a message to the conversation"""
+    def add_message(self, conversation_id: str, role: str, content: str, user_id: Optional[str] = None):
+        """Save a message to the conversation (pass user_id to refresh their conversation list)"""
         if not supabase or not conversation_id:
             return
         try:
@@ -54,17 +129,51 @@ class ChatService:
                 "role": role,
                 "content": content
             }
+            # The messages trigger bumps the conversation's updated_at
             supabase.table("messages").insert(data).execute()
-            
-            # Update conversation timestamp
-            supabase.table("conversations").update({"updated_at": datetime.utcnow().isoformat()}).eq("id", conversation_id).execute()
+            self.invalidate_conversations(user_id)
         except Exception as e:
             logger.error(f"Error adding message: {e}")
 
-    def update_title(self, conversation_id: str, new_title: str):
+    def save_turn(self, conversation_id: str, user_id: str, messages: List[Dict], title: Optional[str] = None):
+        """
+        Save a turn's messages ({"role", "content", "created_at"}) together.
+        Pass a title to also create the conversation (for a new one whose ID
+        was generated by the caller); otherwise it must belong to user_id.
+        One round trip with the RPC; without it an ownership check (or the
+        conversation insert) plus a batched insert. updated_at is bumped by
+        the messages trigger.
+        """
+        if not supabase or not conversation_id or not messages:
+            return
+        try:
+            if SAVE_RPC:
+                supabase.rpc("save_chat_turn", {
+                    "p_conversation_id": conversation_id,
+                    "p_user_id": user_id,
+                    "p_title": title,
+                    "p_messages": messages
+                }).execute()
+                self.invalidate_conversations(user_id)
+                return
+
+            if title:
+                # A plain insert, so an existing conversation ID fails instead of being taken over
+                supabase.table("conversations").insert({"id": conversation_id, "user_id": user_id, "title": title}).execute()
+            elif not self.owns_conversation(user_id, conversation_id):
+                logger.error(f"Refusing to save chat turn: conversation {conversation_id} doesn't belong to user {user_id}")
+                return
+            rows = [{"conversation_id": conversation_id, **message} for message in messages]
+            supabase.table("messages").insert(rows).execute()
+            self.invalidate_conversations(user_id)
+        except Exception as e:
+            logger.error(f"Error saving chat turn: {e}")
+
+    def update_title(self, conversation_id: str, new_title: str, user_id: Optional[str] = None):
         if not supabase: return
         try:
             supabase.table("conversations").update({"title": new_title}).eq("id", conversation_id).execute()
+            self.invalidate_conversations(user_id)
         except: pass
 
 chat_service = ChatService()
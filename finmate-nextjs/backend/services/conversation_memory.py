@@ -0,0 +1,145 @@
+import os
+import threading
+import logging
+from collections import deque
+from typing import List, Dict, Optional, Deque, Tuple
+from services import chat_service, llm_service
+from services.cache import TTLCache
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a length estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Turns kept per conversation; older ones only survive through the summary
+MEMORY_MAX_TURNS = int(os.environ.get("CHAT_MEMORY_MAX_TURNS", "50"))
+MEMORY_CONVERSATIONS = int(os.environ.get("CHAT_MEMORY_CONVERSATIONS", "2000"))
+MEMORY_TTL_SECONDS = int(os.environ.get("CHAT_MEMORY_TTL_SECONDS", str(6 * 3600)))
+# Tokens of verbatim history sent with each turn; what doesn't fit is summarized
+HISTORY_TOKEN_BUDGET = int(os.environ.get("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+SUMMARY_MAX_WORDS = 200
+
+def _load_encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(llm_service.MODEL_NAME)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+try:
+    _encoding = _load_encoding()
+except Exception as e:  # e.g. encoding files can't be downloaded
+    logger.warning(f"Tokenizer unavailable, estimating token counts: {e}")
+    _encoding = None
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+Turn = Tuple[str, str, int]  # (role, content, tokens)
+
+class ConversationMemory:
+    """
+    Recent turns of one conversation (a ring buffer) plus a running summary
+    of the turns that no longer fit the token budget. `summarized` counts the
+    oldest buffered turns already folded into the summary.
+    """
+
+    def __init__(self, turns: List[Dict[str, str]] = ()):
+        self.turns: Deque[Turn] = deque(maxlen=MEMORY_MAX_TURNS)
+        self.summary = ""
+        self.summarized = 0
+        self.context: Dict[str, str] = {}  # Last portfolio/news/document context sent by the client
+        self.compacting = False
+        self.lock = threading.Lock()
+        for turn in turns:
+            self.append(turn['role'], turn['content'])
+
+    def append(self, role: str, content: str):
+        with self.lock:
+            if len(self.turns) == self.turns.maxlen:
+                if self.summarized:
+                    self.summarized -= 1
+                else:
+                    logger.warning("Dropping a chat turn that was never summarized")
+            self.turns.append((role, content, count_tokens(content)))
+
+    def _window_start(self, budget: int) -> int:
+        """Index of the oldest turn that still fits the budget, newest first"""
+        used = 0
+        start = len(self.turns)
+        for role, content, tokens in reversed(self.turns):
+            if used + tokens > budget:
+                break
+            used += tokens
+            start -= 1
+        return start
+
+    def window(self, budget: int = HISTORY_TOKEN_BUDGET) -> List[Dict[str, str]]:
+        """Messages to send: the summary (if any) and the newest turns within the budget"""
+        with self.lock:
+            start = self._window_start(budget)
+            messages = [{"role": role, "content": content} for role, content, _ in list(self.turns)[start:]]
+            if self.summary:
+                messages.insert(0, {"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+            return messages
+
+    def overflow(self, budget: int = HISTORY_TOKEN_BUDGET) -> List[Dict[str, str]]:
+        """Turns outside the window that aren't in the summary yet"""
+        with self.lock:
+            start = self._window_start(budget)
+            return [{"role": role, "content": content} for role, content, _ in list(self.turns)[self.summarized:start]]
+
+class ConversationMemoryStore:
+    """
+    Conversation memories by (user ID, conversation ID). A conversation is
+    read from the DB once, when it isn't in memory yet; after that turns are
+    appended as they are saved, so a chat turn doesn't re-read its history.
+    """
+
+    def __init__(self):
+        self._memories = TTLCache(maxsize=MEMORY_CONVERSATIONS, ttl=MEMORY_TTL_SECONDS)
+
+    def get(self, conversation_id: str, user_id: str, load: bool = True) -> Optional[ConversationMemory]:
+        """
+        Blocking on a cold conversation (one DB read); pass load=False for new
+        ones. None if the conversation isn't the user's.
+        """
+        key = (user_id, conversation_id)
+        memory = self._memories.get(key)
+        if memory is None:
+            turns = []
+            if load:
+                # Only the user's own conversations are loaded
+                turns = chat_service.chat_service.get_messages(conversation_id, user_id, MEMORY_MAX_TURNS)
+                if not turns and not chat_service.chat_service.owns_conversation(user_id, conversation_id):
+                    return None
+            memory = ConversationMemory(turns)
+        # Set (again) so active conversations stay cached
+        self._memories.set(key, memory)
+        return memory
+
+    async def compact(self, conversation_id: str, user_id: str, budget: int = HISTORY_TOKEN_BUDGET):
+        """Fold turns that fell out of the window into the summary (cheap model, incremental)"""
+        memory = self._memories.get((user_id, conversation_id))
+        if memory is None or memory.compacting:
+            return
+        overflow = memory.overflow(budget)
+        if not overflow:
+            return
+
+        memory.compacting = True
+        try:
+            summary = await llm_service.summarize_conversation_async(memory.summary, overflow, SUMMARY_MAX_WORDS)
+            if summary is not None:
+                with memory.lock:
+                    memory.summary = summary
+                    memory.summarized = min(len(memory.turns), memory.summarized + len(overflow))
+        finally:
+            memory.compacting = False
+
+memory_store = ConversationMemoryStore()
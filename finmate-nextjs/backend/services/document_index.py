@@ -0,0 +1,203 @@
+import os
+import re
+import json
+import math
+import uuid
+import heapq
+import time
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# One JSON file of chunks per uploaded document: <dir>/<user_id>/<document_id>.json
+DOCUMENTS_DIR = Path(os.environ.get(
+    "DOCUMENTS_DIR", Path(__file__).resolve().parent.parent / "data" / "documents"
+))
+CHUNK_CHARS = int(os.environ.get("DOCUMENT_CHUNK_CHARS", "1200"))
+CHUNK_OVERLAP = 200
+# Chunks added to the chat context per turn
+DOCUMENT_TOP_K = int(os.environ.get("DOCUMENT_TOP_K", "4"))
+DOCUMENT_CACHE_SIZE = int(os.environ.get("DOCUMENT_CACHE_SIZE", "100"))
+# Retention: documents older than this are deleted, and each user keeps only their newest ones
+DOCUMENT_TTL_DAYS = int(os.environ.get("DOCUMENT_TTL_DAYS", "30"))
+DOCUMENT_MAX_PER_USER = int(os.environ.get("DOCUMENT_MAX_PER_USER", "20"))
+
+# Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOP_WORDS = frozenset(
+    "a an the of to in on for and or as at by is its it with from this that be are was were has have "
+    "had will than into their our we they which such other these those any all may not".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOP_WORDS]
+
+def chunk_pages(pages: Iterable[Tuple[int, str]]) -> List[Dict]:
+    """
+    Split page texts into overlapping chunks of about CHUNK_CHARS, cut at
+    whitespace. Chunks don't span pages, so each one can cite its page.
+    """
+    chunks = []
+    for page, text in pages:
+        text = " ".join(text.split())
+        start = 0
+        while start < len(text):
+            end = min(start + CHUNK_CHARS, len(text))
+            if end < len(text):
+                cut = text.rfind(" ", start + CHUNK_CHARS // 2, end)
+                end = cut if cut > 0 else end
+            chunks.append({"page": page, "text": text[start:end]})
+            if end >= len(text):
+                break
+            start = max(end - CHUNK_OVERLAP, start + 1)
+            # Start the overlap on a word boundary
+            space = text.find(" ", start, end)
+            start = space + 1 if space != -1 else start
+    return chunks
+
+class DocumentIndex:
+    """BM25 index over the chunks of one document (postings: term -> [(chunk, tf)])"""
+
+    def __init__(self, document_id: str, filename: str, chunks: List[Dict]):
+        self.document_id = document_id
+        self.filename = filename
+        self.chunks = chunks
+        self._lengths: List[int] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        for i, chunk in enumerate(chunks):
+            terms = Counter(tokenize(chunk["text"]))
+            self._lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings.setdefault(term, []).append((i, tf))
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    def search(self, query: str, k: int = DOCUMENT_TOP_K) -> List[Dict]:
+        """Top-k chunks for the query by BM25, best first"""
+        n = len(self.chunks)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for i, tf in posting:
+                norm = 1 - BM25_B + BM25_B * self._lengths[i] / self._avg_length
+                scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        best = heapq.nlargest(k, scores, key=scores.get)
+        return [self.chunks[i] for i in best]
+
+    def to_dict(self) -> Dict:
+        return {"document_id": self.document_id, "filename": self.filename, "chunks": self.chunks}
+
+class DocumentStore:
+    """
+    Uploaded documents by user and ID. Only chunks are written to disk; the
+    BM25 postings are rebuilt when a document is loaded, and recently used
+    indexes stay in memory. Files expire after DOCUMENT_TTL_DAYS and each
+    user keeps at most DOCUMENT_MAX_PER_USER documents (oldest dropped first).
+    """
+
+    def __init__(self, directory: Path = DOCUMENTS_DIR):
+        self.directory = directory
+        self._indexes = TTLCache(maxsize=DOCUMENT_CACHE_SIZE, ttl=3600)
+        self.ttl = DOCUMENT_TTL_DAYS * 86400
+        self.max_per_user = DOCUMENT_MAX_PER_USER
+
+    def _path(self, user_id: str, document_id: str) -> Optional[Path]:
+        try:
+            # Both parts end up in the path, so only accept UUIDs
+            return self.directory / str(uuid.UUID(user_id)) / f"{uuid.UUID(document_id)}.json"
+        except (ValueError, TypeError):
+            return None
+
+    def add(self, user_id: str, filename: str, pages: Iterable[Tuple[int, str]]) -> DocumentIndex:
+        """Chunk, index and save a document; blocking"""
+        index = DocumentIndex(str(uuid.uuid4()), filename, chunk_pages(pages))
+        path = self._path(user_id, index.document_id)
+        if path is None:
+            raise ValueError(f"Invalid user ID: {user_id}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index.to_dict()))
+        os.replace(tmp, path)
+        self._indexes.set((user_id, index.document_id), index)
+        logger.info(f"Indexed document {filename}: {len(index.chunks)} chunks")
+        self._prune_user(path.parent)
+        return index
+
+    def get(self, user_id: str, document_id: str) -> Optional[DocumentIndex]:
+        """A user's document index, loading it from disk if needed; blocking"""
+        index = self._indexes.get((user_id, document_id))
+        if index is not None:
+            return index
+        path = self._path(user_id, document_id)
+        if path is None or not path.exists() or self._expired(path):
+            return None
+        try:
+            data = json.loads(path.read_text())
+            index = DocumentIndex(data["document_id"], data["filename"], data["chunks"])
+            self._indexes.set((user_id, document_id), index)
+            return index
+        except Exception as e:
+            logger.error(f"Error loading document {document_id}: {e}")
+            return None
+
+    def delete(self, user_id: str, document_id: str) -> bool:
+        """Delete a user's document; False if it didn't exist. Blocking"""
+        self._indexes.pop((user_id, document_id))
+        path = self._path(user_id, document_id)
+        if path is None:
+            return False
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def prune(self) -> int:
+        """Apply the retention rules to every user's documents; returns the number deleted. Blocking"""
+        if not self.directory.exists():
+            return 0
+        return sum(self._prune_user(user_dir) for user_dir in self.directory.iterdir() if user_dir.is_dir())
+
+    def _expired(self, path: Path, now: Optional[float] = None) -> bool:
+        try:
+            return (now or time.time()) - path.stat().st_mtime > self.ttl
+        except FileNotFoundError:
+            return True
+
+    def _prune_user(self, user_dir: Path) -> int:
+        """Delete a user's expired documents and those beyond the per-user cap"""
+        now = time.time()
+        try:
+            files = sorted(user_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        except FileNotFoundError:
+            return 0
+        removed = 0
+        for i, path in enumerate(files):
+            if i < self.max_per_user and not self._expired(path, now):
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            self._indexes.pop((user_dir.name, path.stem))
+            removed += 1
+        if removed:
+            logger.info(f"Pruned {removed} documents of user {user_dir.name}")
+        return removed
+
+    def search(self, user_id: str, document_id: str, query: str, k: int = DOCUMENT_TOP_K) -> Optional[Tuple[str, List[Dict]]]:
+        """(filename, top-k chunks) for the query, or None if the document isn't found"""
+        index = self.get(user_id, document_id)
+        if index is None:
+            return None
+        return index.filename, index.search(query, k)
+
+store = DocumentStore()
@@ -0,0 +1,75 @@
+import os
+import logging
+import itertools
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Tuple
+from PyPDF2 import PdfReader
+from services import document_index
+
+logger = logging.getLogger(__name__)
+
+# Upload limits; anything larger is rejected before text extraction
+DOCUMENT_MAX_BYTES = int(os.environ.get("DOCUMENT_MAX_MB", "25")) * 1024 * 1024
+DOCUMENT_MAX_PAGES = int(os.environ.get("DOCUMENT_MAX_PAGES", "1000"))
+# Characters of text kept for the chat context
+DOCUMENT_CHAR_BUDGET = int(os.environ.get("DOCUMENT_CHAR_BUDGET", "10000"))
+
+class DocumentLimitError(ValueError):
+    """The document is over the size or page limit"""
+
+def file_size(fileobj: BinaryIO) -> int:
+    position = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(position)
+    return size
+
+def open_pdf(fileobj: BinaryIO, max_pages: int = DOCUMENT_MAX_PAGES) -> PdfReader:
+    """Reader over a PDF file object, after checking the size and page limits"""
+    if file_size(fileobj) > DOCUMENT_MAX_BYTES:
+        raise DocumentLimitError(f"Document is larger than {DOCUMENT_MAX_BYTES // (1024 * 1024)} MB")
+
+    fileobj.seek(0)
+    reader = PdfReader(fileobj)
+    pages = len(reader.pages)
+    if pages > max_pages:
+        raise DocumentLimitError(f"Document has {pages} pages, the limit is {max_pages}")
+    return reader
+
+def iter_pages(reader: PdfReader) -> Iterator[Tuple[int, str]]:
+    """(page number, text) pairs; each page is only parsed when it is reached"""
+    for number, page in enumerate(reader.pages, start=1):
+        yield number, page.extract_text() or ""
+
+def budgeted_text(pages: Iterable[Tuple[int, str]], char_budget: int = DOCUMENT_CHAR_BUDGET) -> str:
+    """
+    The first char_budget characters of a page stream. Stops pulling pages
+    once the budget is reached, so later pages are never parsed.
+    """
+    parts = []
+    length = 0
+    for _, text in pages:
+        parts.append(text)
+        length += len(text)
+        if length >= char_budget:
+            break
+    return "".join(parts)[:char_budget]
+
+def ingest_pdf(user_id: str, filename: str, fileobj: BinaryIO) -> Dict[str, Any]:
+    """
+    Chunk and index every page of an uploaded PDF for retrieval in chat
+    (see document_index). Also returns the first DOCUMENT_CHAR_BUDGET
+    characters for clients that still send the text as document_context.
+    Each page is parsed once: the preview reads the first pages of the
+    stream and the index consumes them from the tee buffer before parsing
+    the rest. Blocking; run it with run_blocking.
+    """
+    reader = open_pdf(fileobj)
+    preview_pages, index_pages = itertools.tee(iter_pages(reader))
+    text = budgeted_text(preview_pages)
+    index = document_index.store.add(user_id, filename, index_pages)
+    return {
+        "document_id": index.document_id,
+        "text": text,
+        "pages": len(reader.pages),
+        "chunks": len(index.chunks)
+    }
@@ -0,0 +1,22 @@
+import os
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Shared pool for the blocking clients without an async API (Supabase, yfinance,
+# DDGS, feedparser, reportlab, PyPDF2). Sized for I/O-bound work, and named so
+# the threads are easy to spot in stack dumps and profilers.
+IO_POOL_SIZE = int(os.environ.get("IO_THREAD_POOL_SIZE", "32"))
+io_pool = ThreadPoolExecutor(max_workers=IO_POOL_SIZE, thread_name_prefix="finmate-io")
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking call on the I/O pool without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_pool, functools.partial(fn, *args, **kwargs))
+
+def shutdown():
+    io_pool.shutdown(wait=False, cancel_futures=True)
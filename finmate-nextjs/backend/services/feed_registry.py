@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import random
+import zlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+from db.client import supabase
+
+logger = logging.getLogger(__name__)
+
+FEEDS_CONFIG_PATH = Path(os.environ.get(
+    "NEWS_FEEDS_CONFIG", Path(__file__).resolve().parent.parent / "data" / "feeds.json"
+))
+# Also read feeds from the news_feeds table (see db/feed_registry_migration.sql)
+FEEDS_FROM_DB = os.environ.get("NEWS_FEEDS_FROM_DB", "false").lower() == "true"
+# Feeds fetched per scheduler tick at most; the rest stay due for the next one
+MAX_FEEDS_PER_TICK = int(os.environ.get("NEWS_MAX_FEEDS_PER_TICK", "50"))
+MAX_BACKOFF_SECONDS = int(os.environ.get("NEWS_FEED_MAX_BACKOFF_SECONDS", str(6 * 3600)))
+
+DEFAULT_POLL_INTERVAL = 600
+DEFAULT_MAX_ITEMS = 5
+
+@dataclass
+class Feed:
+    """A polled RSS source with its schedule and health"""
+    name: str
+    url: str
+    poll_interval: int = DEFAULT_POLL_INTERVAL
+    priority: int = 0  # Higher is fetched first when more feeds are due than a tick takes
+    max_items: int = DEFAULT_MAX_ITEMS
+    ticker: Optional[str] = None  # Set for per-ticker feeds
+    next_due: float = 0.0
+    consecutive_failures: int = 0
+    successes: int = 0
+    failures: int = 0
+    last_success_at: Optional[float] = None
+    last_error: Optional[str] = None
+    last_latency: Optional[float] = None
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "url": self.url,
+            "ticker": self.ticker,
+            "priority": self.priority,
+            "poll_interval": self.poll_interval,
+            "status": "ok" if self.consecutive_failures == 0 else "backing_off",
+            "next_due_in": max(0.0, round(self.next_due - time.time(), 1)),
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_success_at": self.last_success_at,
+            "last_error": self.last_error,
+            "last_latency": self.last_latency,
+        }
+
+def _feed_from_config(config: Dict[str, Any], **overrides) -> Feed:
+    return Feed(
+        name=config["name"],
+        url=config["url"],
+        poll_interval=int(config.get("poll_interval") or DEFAULT_POLL_INTERVAL),
+        priority=int(config.get("priority") or 0),
+        max_items=int(config.get("max_items") or DEFAULT_MAX_ITEMS),
+        **overrides
+    )
+
+class FeedRegistry:
+    """
+    All RSS sources by URL, loaded from data/feeds.json (and optionally the
+    news_feeds table), plus one generated feed per held ticker.
+
+    The scheduler asks for the feeds that are due instead of polling everything
+    on every tick. A failing feed backs off exponentially, and per-ticker feeds
+    start at staggered offsets so hundreds of them don't come due together.
+    """
+
+    def __init__(self):
+        self._feeds: Dict[str, Feed] = {}
+        self.ticker_template: Optional[Dict[str, Any]] = None
+
+    def load(self, path: Path = FEEDS_CONFIG_PATH):
+        try:
+            with open(path) as f:
+                config = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load feed config {path}: {e}")
+            config = {}
+
+        configs = list(config.get("feeds", []))
+        self.ticker_template = config.get("ticker_feeds")
+        if FEEDS_FROM_DB:
+            configs.extend(self._load_db_feeds())
+
+        for feed_config in configs:
+            if feed_config.get("enabled", True):
+                self.register(_feed_from_config(feed_config))
+        logger.info(f"Feed registry loaded {len(self._feeds)} feeds")
+
+    def _load_db_feeds(self) -> List[Dict[str, Any]]:
+        if not supabase:
+            return []
+        try:
+            res = supabase.table("news_feeds").select("name, url, poll_interval, priority, max_items, enabled").execute()
+            return res.data or []
+        except Exception as e:
+            logger.error(f"Failed to load feeds from DB: {e}")
+            return []
+
+    def register(self, feed: Feed, stagger: bool = False) -> Feed:
+        existing = self._feeds.get(feed.url)
+        if existing:
+            # Keep schedule and health, take the new settings
+            feed.next_due = existing.next_due
+            for name in ("consecutive_failures", "successes", "failures", "last_success_at", "last_error", "last_latency"):
+                setattr(feed, name, getattr(existing, name))
+        elif stagger:
+            # Deterministic offset within the poll interval
+            feed.next_due = time.time() + zlib.crc32(feed.url.encode()) % max(1, feed.poll_interval)
+        self._feeds[feed.url] = feed
+        return feed
+
+    def sync_ticker_feeds(self, tickers: Iterable[str]):
+        """Make the per-ticker feeds match the tickers currently held"""
+        if not self.ticker_template:
+            return
+        wanted = {t.upper() for t in tickers if t}
+        for url, feed in list(self._feeds.items()):
+            if feed.ticker and feed.ticker not in wanted:
+                del self._feeds[url]
+        for ticker in wanted:
+            url = self.ticker_template["url"].format(ticker=ticker)
+            if url not in self._feeds:
+                name = self.ticker_template.get("name", "{ticker}").format(ticker=ticker)
+                self.register(_feed_from_config({**self.ticker_template, "name": name, "url": url}, ticker=ticker), stagger=True)
+
+    def feeds(self) -> List[Feed]:
+        return list(self._feeds.values())
+
+    def due(self, now: Optional[float] = None, limit: int = MAX_FEEDS_PER_TICK) -> List[Feed]:
+        """
+        Feeds to fetch now, highest priority and most overdue first. Picked
+        feeds are rescheduled right away so an overlapping tick can't take
+        them again.
+        """
+        now = now or time.time()
+        due = sorted(
+            (feed for feed in self._feeds.values() if feed.next_due <= now),
+            key=lambda feed: (-feed.priority, feed.next_due)
+        )[:limit]
+        for feed in due:
+            feed.next_due = now + feed.poll_interval
+        return due
+
+    def record_success(self, feed: Feed, latency: float):
+        feed.successes += 1
+        feed.consecutive_failures = 0
+        feed.last_success_at = time.time()
+        feed.last_latency = round(latency, 3)
+
+    def record_failure(self, feed: Feed, error: str, latency: float):
+        feed.failures += 1
+        feed.consecutive_failures += 1
+        feed.last_error = error
+        feed.last_latency = round(latency, 3)
+        backoff = min(MAX_BACKOFF_SECONDS, feed.poll_interval * 2 ** feed.consecutive_failures)
+        feed.next_due = time.time() + backoff * random.uniform(0.9, 1.1)
+
+    def health(self) -> Dict[str, Any]:
+        feeds = [feed.health() for feed in sorted(self._feeds.values(), key=lambda f: (-f.priority, f.name))]
+        return {
+            "total": len(feeds),
+            "ok": sum(1 for f in feeds if f["status"] == "ok"),
+            "backing_off": sum(1 for f in feeds if f["status"] == "backing_off"),
+            "due": sum(1 for f in feeds if f["next_due_in"] == 0),
+            "feeds": feeds,
+        }
+
+registry = FeedRegistry()
+registry.load()
@@ -0,0 +1,103 @@
+import os
+import time
+import threading
+import yfinance as yf
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Optional
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# yfinance .info fields grouped by how quickly they go stale
+FIELD_GROUPS = {
+    "valuation": (
+        "marketCap", "trailingPE", "forwardPE", "dividendYield",
+        "fiftyTwoWeekHigh", "fiftyTwoWeekLow",
+    ),
+    "profile": (
+        "longName", "sector", "industry", "longBusinessSummary", "currency", "website",
+    ),
+}
+GROUP_TTLS = {
+    "valuation": int(os.environ.get("FUNDAMENTALS_VALUATION_TTL_SECONDS", str(6 * 3600))),
+    "profile": int(os.environ.get("FUNDAMENTALS_PROFILE_TTL_SECONDS", str(7 * 86400))),
+}
+# Past this age stale data isn't served any more, the caller waits for upstream
+MAX_STALE_SECONDS = int(os.environ.get("FUNDAMENTALS_MAX_STALE_SECONDS", str(30 * 86400)))
+
+# ticker -> {"info": {...}, "fetched_at": {group: timestamp}}
+_entries = TTLCache(maxsize=5000, ttl=MAX_STALE_SECONDS)
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+_revalidate_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fundamentals-revalidate")
+
+def _fetch(ticker: str) -> Optional[Dict[str, Any]]:
+    """The slow call: yfinance .info, trimmed to the fields we use"""
+    try:
+        info = yf.Ticker(ticker).info or {}
+    except Exception as e:
+        logger.error(f"Failed to fetch info for {ticker}: {e}")
+        return None
+    fields = [f for group in FIELD_GROUPS.values() for f in group]
+    # Only fields yfinance actually returned, so callers' .get() defaults still apply
+    trimmed = {f: info[f] for f in fields if info.get(f) is not None}
+    if not trimmed:
+        # Unknown ticker or an empty response: nothing worth caching
+        logger.warning(f"No info returned for {ticker}")
+        return None
+    now = time.time()
+    entry = {"info": trimmed, "fetched_at": {g: now for g in FIELD_GROUPS}}
+    _entries.set(ticker, entry)
+    return entry
+
+def _revalidate(ticker: str):
+    try:
+        _fetch(ticker)
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(ticker)
+
+def _schedule_revalidation(ticker: str):
+    """Refresh in the background, at most once at a time per ticker"""
+    with _revalidating_lock:
+        if ticker in _revalidating:
+            return
+        _revalidating.add(ticker)
+    _revalidate_pool.submit(_revalidate, ticker)
+
+def seed(ticker: str, group: str, info: Dict[str, Any], fetched_at: float):
+    """Prime one field group from another source (e.g. company_profiles) if it's newer"""
+    ticker = ticker.upper()
+    entry = _entries.get(ticker) or {"info": {}, "fetched_at": {}}
+    if entry["fetched_at"].get(group, 0) >= fetched_at:
+        return
+    # The group's fields are replaced, not merged, so a field dropped upstream goes too
+    kept = {f: v for f, v in entry["info"].items() if f not in FIELD_GROUPS[group]}
+    info_update = {f: info[f] for f in FIELD_GROUPS[group] if info.get(f) is not None}
+    _entries.set(ticker, {
+        "info": {**kept, **info_update},
+        "fetched_at": {**entry["fetched_at"], group: fetched_at}
+    })
+
+def get_info(ticker: str, groups: Iterable[str] = ("valuation", "profile")) -> Optional[Dict[str, Any]]:
+    """
+    Stale-while-revalidate access to a ticker's .info fields.
+
+    Each field group has its own TTL. Fresh groups are returned as is, stale
+    ones are returned immediately while a background refresh runs. Only a
+    ticker with a requested group never fetched waits for upstream.
+    """
+    ticker = ticker.upper()
+    entry = _entries.get(ticker)
+    if entry is None or any(g not in entry["fetched_at"] for g in groups):
+        entry = _fetch(ticker)
+        return entry["info"] if entry else None
+
+    now = time.time()
+    if any(now - entry["fetched_at"][g] > GROUP_TTLS[g] for g in groups):
+        _schedule_revalidation(ticker)
+    return entry["info"]
+
+def stats() -> Dict[str, int]:
+    return {**_entries.stats(), "revalidating": len(_revalidating)}
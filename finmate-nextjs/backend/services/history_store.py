@@ -0,0 +1,197 @@
+import os
+import re
+import time
+import threading
+import yfinance as yf
+import numpy as np
+import pandas as pd
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# One append-only file of float64 rows per ticker, read back through np.memmap.
+# Prices are split/dividend adjusted; a ticker whose past bars change (a new
+# split or dividend) is re-backfilled, see sync().
+HISTORY_DIR = Path(__file__).resolve().parent.parent / "data" / "history"
+COLUMNS = ("date", "open", "high", "low", "close", "volume")  # date = days since epoch
+ROW_WIDTH = len(COLUMNS)
+ROW_BYTES = ROW_WIDTH * 8
+
+BACKFILL_PERIOD = os.environ.get("HISTORY_BACKFILL_PERIOD", "1y")
+# Don't ask upstream for a delta more often than this per ticker
+SYNC_INTERVAL_SECONDS = int(os.environ.get("HISTORY_SYNC_INTERVAL_SECONDS", "60"))
+
+_write_lock = threading.Lock()
+_last_sync: Dict[str, float] = {}
+
+def _path(ticker: str) -> Path:
+    return HISTORY_DIR / f"{re.sub(r'[^A-Za-z0-9]', '_', ticker)}.bin"
+
+def read_bars(ticker: str) -> np.ndarray:
+    """
+    All stored bars for a ticker as a read-only (n, 6) memmap, oldest first.
+    Slicing the result doesn't copy. Columns follow COLUMNS.
+    """
+    path = _path(ticker.upper())
+    if not path.exists() or path.stat().st_size < ROW_BYTES:
+        return np.empty((0, ROW_WIDTH))
+    rows = path.stat().st_size // ROW_BYTES
+    return np.memmap(path, dtype=np.float64, mode="r", shape=(rows, ROW_WIDTH))
+
+def get_bars(ticker: str, lookback: Optional[int] = None) -> np.ndarray:
+    """Zero-copy view of the most recent `lookback` bars (all when None)"""
+    bars = read_bars(ticker)
+    return bars if lookback is None else bars[-lookback:]
+
+def _frame_to_rows(frame: pd.DataFrame) -> np.ndarray:
+    frame = frame.dropna(subset=["Close"])
+    index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+    days = index.values.astype("datetime64[D]").astype(np.int64).astype(np.float64)
+    values = frame[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype=np.float64)
+    return np.column_stack([days, values])
+
+def _append(ticker: str, rows: np.ndarray):
+    """
+    Write new bars. A bar dated like the last stored one replaces it in place
+    (the current session's bar keeps changing until the close); older bars are
+    ignored. The file is never truncated, so live memmaps stay valid.
+    """
+    if rows.size == 0:
+        return
+    path = _path(ticker)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    stored = read_bars(ticker)
+    last_date = stored[-1, 0] if len(stored) else None
+
+    with open(path, "r+b" if path.exists() else "wb") as f:
+        if last_date is not None:
+            same_day = rows[rows[:, 0] == last_date]
+            if len(same_day):
+                f.seek((len(stored) - 1) * ROW_BYTES)
+                f.write(same_day[-1].tobytes())
+            rows = rows[rows[:, 0] > last_date]
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(rows).tobytes())
+
+def _rewrite(ticker: str, rows: np.ndarray):
+    """
+    Replace a ticker's whole history. The new file is swapped in, so memmaps
+    of the old one stay valid until they are dropped.
+    """
+    if rows.size == 0:
+        return
+    path = _path(ticker)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(np.ascontiguousarray(rows).tobytes())
+    os.replace(tmp, path)
+
+def _adjustment_changed(stored: np.ndarray, rows: np.ndarray) -> bool:
+    """
+    Whether the delta disagrees with the stored bar it overlaps on (the last
+    completed session). Adjusted history only rewrites past bars after a
+    split or dividend, so a mismatch means the stored series is stale.
+    """
+    if len(stored) < 2 or rows.size == 0:
+        return False
+    check = stored[-2]
+    overlap = rows[rows[:, 0] == check[0]]
+    if not len(overlap):
+        return False
+    # Compare OHLC only; volume is revised by data vendors after the fact
+    return not np.allclose(overlap[-1, 1:5], check[1:5], rtol=1e-4)
+
+def _download(tickers: List[str], start: Optional[str] = None) -> Dict[str, np.ndarray]:
+    kwargs = {"start": start} if start else {"period": BACKFILL_PERIOD}
+    data = yf.download(
+        tickers,
+        interval="1d",
+        group_by="ticker",
+        auto_adjust=True,
+        progress=False,
+        threads=True,
+        **kwargs
+    )
+    rows = {}
+    for ticker in tickers:
+        try:
+            frame = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+            rows[ticker] = _frame_to_rows(frame)
+        except KeyError:
+            logger.warning(f"No history returned for {ticker}")
+    return rows
+
+def sync(tickers: List[str]):
+    """
+    Bring stored history up to date. Cold tickers are backfilled; warm ones
+    only fetch bars from their last completed stored session on, grouped so
+    tickers sharing a start date go out in one request. If that overlapping
+    bar no longer matches (a split or dividend re-adjusted the past), the
+    ticker is backfilled again.
+    """
+    now = time.time()
+    groups: Dict[Optional[str], List[str]] = {}
+    for ticker in dict.fromkeys(t.upper() for t in tickers):
+        if now - _last_sync.get(ticker, 0) < SYNC_INTERVAL_SECONDS:
+            continue
+        bars = read_bars(ticker)
+        start = None
+        if len(bars):
+            # One bar of overlap before the last one, which may still be a live session
+            start = str(np.datetime64(int(bars[max(len(bars) - 2, 0), 0]), "D"))
+        groups.setdefault(start, []).append(ticker)
+
+    stale = []
+    for start, group in groups.items():
+        try:
+            fetched = _download(group, start)
+        except Exception as e:
+            logger.error(f"History sync failed for {group}: {e}")
+            continue
+        with _write_lock:
+            for ticker, rows in fetched.items():
+                if start and _adjustment_changed(read_bars(ticker), rows):
+                    stale.append(ticker)
+                elif start:
+                    _append(ticker, rows)
+                else:
+                    _rewrite(ticker, rows)
+        for ticker in group:
+            _last_sync[ticker] = now
+
+    if stale:
+        logger.info(f"Adjusted prices changed (split/dividend), re-backfilling {stale}")
+        try:
+            fetched = _download(stale)
+        except Exception as e:
+            logger.error(f"History re-backfill failed for {stale}: {e}")
+            for ticker in stale:
+                _last_sync.pop(ticker, None)
+            return
+        with _write_lock:
+            for ticker, rows in fetched.items():
+                _rewrite(ticker, rows)
+
+def get_frames(tickers: List[str], lookback: int = 126) -> Dict[str, pd.DataFrame]:
+    """
+    Sync, then return wide frames (index=date, columns=tickers) for close,
+    high and low over the last `lookback` bars.
+    """
+    sync(tickers)
+    columns = {"close": {}, "high": {}, "low": {}}
+    for ticker in dict.fromkeys(t.upper() for t in tickers):
+        bars = get_bars(ticker, lookback)
+        if not len(bars):
+            continue
+        index = pd.to_datetime(bars[:, 0].astype("int64"), unit="D")
+        for name in columns:
+            columns[name][ticker] = pd.Series(bars[:, COLUMNS.index(name)], index=index)
+
+    return {
+        name: pd.DataFrame(series).sort_index() if series else pd.DataFrame()
+        for name, series in columns.items()
+    }
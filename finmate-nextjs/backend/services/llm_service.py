@@ -1,16 +1,32 @@
 import os
 import json
+import asyncio
 import logging
-from typing import List, Dict, Any
-from langfuse.openai import OpenAI
+from typing import List, Dict, Any, Optional, AsyncIterator
+from langfuse.openai import OpenAI, AsyncOpenAI
 from duckduckgo_search import DDGS
+from services.executor import run_blocking
+from services.tool_registry import Tool, ToolRegistry, ToolError
 
 logger = logging.getLogger(__name__)
 
 # Configure OpenAI
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+async_client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
 MODEL_NAME = "gpt-4o" 
+# Cheaper model for the portfolio-specific impact step (see analysis_cache.SPLIT_MODE)
+IMPACT_MODEL_NAME = os.environ.get("IMPACT_MODEL_NAME", "gpt-4o-mini")
+# Cheap model for incremental chat history summaries (see conversation_memory)
+SUMMARY_MODEL_NAME = os.environ.get("SUMMARY_MODEL_NAME", "gpt-4o-mini")
+
+# impact_reason of the fallback analysis, so callers can avoid caching it
+ANALYSIS_FAILED_REASON = "AI analysis failed."
+IMPACT_FIELDS = ("affected_tickers", "impact", "impact_reason", "risk_level")
+ANALYSIS_FIELDS = (
+    "headline", "summary", "sentiment_score", "category", "affected_tickers",
+    "impact", "impact_reason", "risk_level", "related_sources"
+)
 
 def search_web(query: str, max_results: int = 3) -> str:
     """Perform a web search to verify news or get context"""
@@ -37,20 +53,15 @@ def search_web(query: str, max_results: int = 3) -> str:
         return formatted_results
     except Exception as e:
         logger.warning(f"Web search failed: {e}")
-        return "Web search verification unavailable due to technical error."
+        raise ToolError("Web search verification unavailable due to technical error.")
 
-def analyze_news(news_item: Dict, portfolio: List[str]) -> Dict[str, Any]:
-    """
-    Analyzes a news item against the user's portfolio using OpenAI.
-    Performs a real-time web search to cross-reference and verify the news.
-    """
-    logger.info(f"Analyzing news: {news_item.get('title')}")
+def verify_news(news_item: Dict) -> str:
+    """Cross-reference a news item by searching the web for its title"""
+    # Through the tool registry so repeated titles hit the search cache
+    return agent_tools.call("search_web", {"query": news_item.get('title', ''), "max_results": 3})
 
-    # 1. Cross-Reference / Verify with Web Search
-    # Search for the specific title to find other sources
-    search_context = search_web(news_item.get('title', ''), max_results=3)
-
-    prompt = f"""
+def _build_analysis_prompt(news_item: Dict, portfolio: List[str], search_context: str) -> str:
+    return f"""
     You are a financial analyst. Analyze the following news article and determine its impact on the user's portfolio.
     
     Portfolio Tickers: {', '.join(portfolio)}
@@ -82,9 +93,186 @@ def analyze_news(news_item: Dict, portfolio: List[str]) -> Dict[str, Any]:
     }}
     """
 
+def _analysis_request(prompt: str) -> Dict[str, Any]:
+    return {
+        "model": MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": "You are a helpful financial analyst. Responds in valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        "response_format": {"type": "json_object"},
+        "temperature": 0.2
+    }
+
+def _fallback_analysis(news_item: Dict, portfolio: List[str]) -> Dict[str, Any]:
+    found_tickers = []
+    text_content = (news_item.get('title', '') + " " + news_item.get('summary', '')).upper()
+    for ticker in portfolio:
+        if ticker.upper() in text_content: found_tickers.append(ticker)
+    
+    return {
+        "headline": news_item.get('title'),
+        "summary": f"AI Analysis Unavailable. Content: {news_item.get('summary')[:100]}...",
+        "sentiment_score": 5, "category": "General", "affected_tickers": found_tickers,
+        "impact": "neutral", "impact_reason": ANALYSIS_FAILED_REASON, "risk_level": "low", 
+        "related_sources": []
+    }
+
+def analyze_news(news_item: Dict, portfolio: List[str], search_context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Analyzes a news item against the user's portfolio using OpenAI.
+    Performs a real-time web search to cross-reference and verify the news,
+    unless the caller already ran the verification step (search_context).
+    """
+    logger.info(f"Analyzing news: {news_item.get('title')}")
+
+    # 1. Cross-Reference / Verify with Web Search
+    # Search for the specific title to find other sources
+    if search_context is None:
+        search_context = verify_news(news_item)
+
     try:
         response = client.chat.completions.create(
-            model=MODEL_NAME,
+            **_analysis_request(_build_analysis_prompt(news_item, portfolio, search_context))
+        )
+        content = response.choices[0].message.content
+        return json.loads(content)
+        
+    except Exception as e:
+        logger.error(f"LLM Analysis failed: {e}")
+        return _fallback_analysis(news_item, portfolio)
+
+async def analyze_news_async(news_item: Dict, portfolio: List[str], search_context: Optional[str] = None) -> Dict[str, Any]:
+    """Same as analyze_news, on the async OpenAI client so no thread waits on the LLM"""
+    logger.info(f"Analyzing news: {news_item.get('title')}")
+
+    if search_context is None:
+        search_context = await run_blocking(verify_news, news_item)
+
+    try:
+        response = await async_client.chat.completions.create(
+            **_analysis_request(_build_analysis_prompt(news_item, portfolio, search_context))
+        )
+        content = response.choices[0].message.content
+        return json.loads(content)
+
+    except Exception as e:
+        logger.error(f"LLM Analysis failed: {e}")
+        return _fallback_analysis(news_item, portfolio)
+
+def _build_batch_prompt(news_items: List[Dict], portfolio: List[str], search_contexts: List[str]) -> str:
+    articles = ""
+    for i, (news_item, search_context) in enumerate(zip(news_items, search_contexts)):
+        articles += f"""
+    --- Article id="{i}" ---
+    Title: {news_item.get('title')}
+    Summary: {news_item.get('summary')}
+    Source: {news_item.get('source')}
+    Link: {news_item.get('link')}
+    {search_context}
+    """
+
+    return f"""
+    You are a financial analyst. Analyze each of the following news articles and determine its impact on the user's portfolio.
+    
+    Portfolio Tickers: {', '.join(portfolio)}
+    {articles}
+    CRITICAL INSTRUCTION:
+    - Analyze every article independently, using only its own 'Search Results' to verify it and find 'related_sources'.
+    - If the search results show an article is old news, note that (though we try to fetch fresh).
+    - Infer impact on portfolio tickers even if not explicitly named.
+    
+    Return a JSON object {{"results": [...]}} with exactly one entry per article, each with this schema:
+    {{
+        "id": "the article id",
+        "headline": "Short, punchy headline",
+        "summary": "Concise summary of the event (incorporating verification details if useful)",
+        "sentiment_score": 0-10 (integer, 0=catastrophic, 5=neutral, 10=euphoric),
+        "category": "Markets | Macro | Equities | Energy | Tech",
+        "affected_tickers": ["TICKER1", "TICKER2"],
+        "impact": "positive | neutral | negative",
+        "impact_reason": "Explanation of why it impacts the portfolio or specific tickers",
+        "risk_level": "low | medium | high",
+        "related_sources": ["url1", "url2"] (URLs found in search results that corroborate the story)
+    }}
+    """
+
+def _validate_analysis(entry: Any) -> Optional[Dict[str, Any]]:
+    """Return the analysis without its id if it has the expected shape, else None"""
+    if not isinstance(entry, dict):
+        return None
+    if not all(field in entry for field in ANALYSIS_FIELDS):
+        return None
+    if not isinstance(entry['affected_tickers'], list) or not isinstance(entry['related_sources'], list):
+        return None
+    if entry['impact'] not in ("positive", "neutral", "negative"):
+        return None
+    try:
+        entry['sentiment_score'] = int(entry['sentiment_score'])
+    except (TypeError, ValueError):
+        return None
+    return {field: entry[field] for field in ANALYSIS_FIELDS}
+
+async def analyze_news_batch_async(news_items: List[Dict], portfolio: List[str], search_contexts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Analyze several articles in one request (one shared preamble, one round-trip).
+    Each returned entry is validated on its own; only the articles whose entry
+    is missing or malformed are re-analyzed one by one.
+    """
+    if len(news_items) == 1:
+        return [await analyze_news_async(news_items[0], portfolio, search_contexts[0])]
+
+    logger.info(f"Batch analyzing {len(news_items)} news items")
+    results: List[Optional[Dict[str, Any]]] = [None] * len(news_items)
+    try:
+        response = await async_client.chat.completions.create(
+            **_analysis_request(_build_batch_prompt(news_items, portfolio, search_contexts))
+        )
+        content = json.loads(response.choices[0].message.content)
+        for entry in content.get("results", []):
+            try:
+                index = int(entry.get("id"))
+            except (AttributeError, TypeError, ValueError):
+                continue
+            if 0 <= index < len(results):
+                results[index] = _validate_analysis(entry)
+    except Exception as e:
+        logger.error(f"LLM batch analysis failed: {e}")
+
+    failed = [i for i, result in enumerate(results) if result is None]
+    if failed:
+        logger.warning(f"Batch analysis fell back to single requests for {len(failed)}/{len(news_items)} items")
+        retried = await asyncio.gather(*(
+            analyze_news_async(news_items[i], portfolio, search_contexts[i]) for i in failed
+        ))
+        for i, result in zip(failed, retried):
+            results[i] = result
+    return results
+
+async def assess_impact_async(news: Dict, portfolio: List[str]) -> Dict[str, Any]:
+    """
+    Portfolio-specific step of split analysis: given an already analyzed
+    article (headline + summary), only decide how it affects these tickers.
+    """
+    prompt = f"""
+    Portfolio Tickers: {', '.join(portfolio)}
+
+    News:
+    Headline: {news.get('headline')}
+    Summary: {news.get('summary')}
+
+    Decide how this news affects the portfolio. Infer impact on portfolio tickers even if not explicitly named.
+    Return a JSON object:
+    {{
+        "affected_tickers": ["TICKER1"] (portfolio tickers affected, may be empty),
+        "impact": "positive | neutral | negative",
+        "impact_reason": "One or two sentences on why",
+        "risk_level": "low | medium | high"
+    }}
+    """
+    try:
+        response = await async_client.chat.completions.create(
+            model=IMPACT_MODEL_NAME,
             messages=[
                 {"role": "system", "content": "You are a helpful financial analyst. Responds in valid JSON."},
                 {"role": "user", "content": prompt}
@@ -92,127 +280,164 @@ def analyze_news(news_item: Dict, portfolio: List[str]) -> Dict[str, Any]:
             response_format={"type": "json_object"},
             temperature=0.2
         )
-        content = response.choices[0].message.content
-        return json.loads(content)
-        
+        impact = json.loads(response.choices[0].message.content)
+        return {k: impact[k] for k in IMPACT_FIELDS if k in impact}
     except Exception as e:
-        logger.error(f"LLM Analysis failed: {e}")
-        # Fallback
-        found_tickers = []
-        text_content = (news_item.get('title', '') + " " + news_item.get('summary', '')).upper()
-        for ticker in portfolio:
-            if ticker.upper() in text_content: found_tickers.append(ticker)
-        
-        return {
-            "headline": news_item.get('title'),
-            "summary": f"AI Analysis Unavailable. Content: {news_item.get('summary')[:100]}...",
-            "sentiment_score": 5, "category": "General", "affected_tickers": found_tickers,
-            "impact": "neutral", "impact_reason": "AI analysis failed.", "risk_level": "low", 
-            "related_sources": []
-        }
+        logger.error(f"LLM impact assessment failed: {e}")
+        return {"affected_tickers": [], "impact": "neutral", "impact_reason": ANALYSIS_FAILED_REASON, "risk_level": "low"}
+
+async def summarize_conversation_async(summary: str, turns: List[Dict[str, str]], max_words: int = 200) -> Optional[str]:
+    """
+    Fold older chat turns into the running summary of a conversation.
+    Returns None on failure so the caller keeps the turns for another try.
+    """
+    transcript = "\n".join(f"{turn['role'].upper()}: {turn['content']}" for turn in turns)
+    prompt = f"""
+    Current summary of the conversation so far:
+    {summary or "(none)"}
+
+    Newer messages:
+    {transcript}
+
+    Rewrite the summary to also cover the newer messages, in at most {max_words} words.
+    Keep tickers, figures, the user's stated goals and preferences, and conclusions already reached.
+    Return only the summary.
+    """
+    try:
+        response = await async_client.chat.completions.create(
+            model=SUMMARY_MODEL_NAME,
+            messages=[
+                {"role": "system", "content": "You maintain concise summaries of financial assistant conversations."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.error(f"Conversation summary failed: {e}")
+        return None
 
 from services.quote_service import get_quote_data
 from services.analysis_service import get_fundamentals, get_technical_indicators
-
-# ... existing imports ...
-
-TOOLS_SCHEMA = [
-    {
-        "type": "function",
-        "function": {
-            "name": "search_web",
-            "description": "Search the internet for current news, events, or verify facts. Use this for questions about 'latest', 'recent', 'today', or specific news verification.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The search query (e.g. 'Tesla earnings report Q3 2024')"
-                    }
-                },
-                "required": ["query"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_stock_price",
-            "description": "Get the current live stock price for a ticker symbol.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "ticker": {
-                        "type": "string",
-                        "description": "The stock ticker symbol (e.g. AAPL, TSLA)"
-                    }
-                },
-                "required": ["ticker"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_fundamentals",
-            "description": "Get fundamental data (P/E ratio, Market Cap, Dividend Yield, High/Low) for a company.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "ticker": {
-                        "type": "string",
-                        "description": "The stock ticker symbol (e.g. MSFT)"
-                    }
-                },
-                "required": ["ticker"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_technical_indicators",
-            "description": "Get technical indicators (RSI, 50-day SMA, Overbought/Oversold signal) for a stock.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "ticker": {
-                        "type": "string",
-                        "description": "The stock ticker symbol (e.g. BTC-USD)"
-                    }
-                },
-                "required": ["ticker"]
-            }
-        }
-    }
-]
+from services.technicals_service import get_technicals
 
 def get_stock_price_tool(ticker: str) -> str:
     """Tool wrapper for stock price"""
     data = get_quote_data(ticker)
     if data:
         return json.dumps(data)
-    return f"Could not find price for {ticker}"
+    raise ToolError(f"Could not find price for {ticker}")
 
 def get_fundamentals_tool(ticker: str) -> str:
     """Tool wrapper for fundamentals"""
     data = get_fundamentals(ticker)
     if data:
         return json.dumps(data)
-    return f"Could not find fundamentals for {ticker}"
+    raise ToolError(f"Could not find fundamentals for {ticker}")
 
 def get_technicals_tool(ticker: str) -> str:
     """Tool wrapper for technicals"""
     data = get_technical_indicators(ticker)
     if data:
         return json.dumps(data)
-    return f"Could not calculate technicals for {ticker}"
+    raise ToolError(f"Could not calculate technicals for {ticker}")
 
-def chat_with_data(query: str, context: str, history: List[Dict] = []) -> str:
-    """
-    Agentic Chat Loop with Tool execution.
-    """
-    
+def get_portfolio_technicals_tool(tickers: List[str]) -> str:
+    """Tool wrapper for multi-ticker technicals"""
+    data = get_technicals(tickers)
+    if data:
+        return json.dumps(data)
+    raise ToolError(f"Could not calculate technicals for {', '.join(tickers)}")
+
+def _ticker_params(example: str) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": {
+            "ticker": {
+                "type": "string",
+                "description": f"The stock ticker symbol (e.g. {example})"
+            }
+        },
+        "required": ["ticker"]
+    }
+
+agent_tools = ToolRegistry()
+
+agent_tools.register(Tool(
+    name="search_web",
+    description="Search the internet for current news, events, or verify facts. Use this for questions about 'latest', 'recent', 'today', or specific news verification.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "The search query (e.g. 'Tesla earnings report Q3 2024')"
+            }
+        },
+        "required": ["query"]
+    },
+    fn=search_web,
+    max_concurrency=4,  # DuckDuckGo rate-limits aggressive clients; matches the news verify workers
+    timeout=15,
+    cache_ttl=5 * 60
+))
+agent_tools.register(Tool(
+    name="get_stock_price",
+    description="Get the current live stock price for a ticker symbol.",
+    parameters=_ticker_params("AAPL, TSLA"),
+    fn=get_stock_price_tool,
+    max_concurrency=8,
+    timeout=10,
+    cache_ttl=10
+))
+agent_tools.register(Tool(
+    name="get_fundamentals",
+    description="Get fundamental data (P/E ratio, Market Cap, Dividend Yield, High/Low) for a company.",
+    parameters=_ticker_params("MSFT"),
+    fn=get_fundamentals_tool,
+    max_concurrency=4,
+    timeout=20,
+    cache_ttl=24 * 3600
+))
+agent_tools.register(Tool(
+    name="get_technical_indicators",
+    description="Get technical indicators (RSI, 50-day SMA, Overbought/Oversold signal) for a stock.",
+    parameters=_ticker_params("BTC-USD"),
+    fn=get_technicals_tool,
+    max_concurrency=4,
+    timeout=20,
+    cache_ttl=5 * 60
+))
+agent_tools.register(Tool(
+    name="get_portfolio_technicals",
+    description="Get technical indicators (RSI, SMA, EMA, MACD, Bollinger Bands, ATR) for several tickers at once. Prefer this over repeated get_technical_indicators calls.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "tickers": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "The stock ticker symbols (e.g. ['AAPL', 'MSFT', 'NVDA'])"
+            }
+        },
+        "required": ["tickers"]
+    },
+    fn=get_portfolio_technicals_tool,
+    max_concurrency=2,
+    timeout=30,
+    cache_ttl=5 * 60
+))
+
+TOOLS_SCHEMA = agent_tools.schemas()
+
+def _parse_tool_args(arguments: str) -> Dict[str, Any]:
+    try:
+        return json.loads(arguments or "{}")
+    except json.JSONDecodeError:
+        logger.warning(f"Model sent invalid tool arguments: {arguments}")
+        return {}
+
+def _build_chat_messages(query: str, context: str, history: List[Dict]) -> List[Dict]:
     # System Prompt
     system_prompt = f"""You are Senhor Finanças, an expert financial AI assistant.
     
@@ -225,6 +450,7 @@ def chat_with_data(query: str, context: str, history: List[Dict] = []) -> str:
        - 'get_stock_price' (live price)
        - 'get_fundamentals' (valuation, market cap)
        - 'get_technical_indicators' (RSI, trends)
+       - 'get_portfolio_technicals' (RSI, MACD, Bollinger, ATR for several tickers at once)
     2. USE TOOLS FREQUENTLY. 
        - If asked "Is Tesla overvalued?", call 'get_fundamentals'.
        - If asked "Should I buy Bitcoin now?", call 'get_technical_indicators' to check RSI.
@@ -235,11 +461,18 @@ def chat_with_data(query: str, context: str, history: List[Dict] = []) -> str:
     
     messages = [{"role": "system", "content": system_prompt}]
     
-    # Add history (simple format for now, limited to last few)
-    # history comes in as [{"role": "user", "content": ...}]
-    messages.extend(history[-6:]) 
+    # history comes in as [{"role": "user", "content": ...}], already trimmed
+    # to the token budget by conversation_memory
+    messages.extend(history)
     
     messages.append({"role": "user", "content": query})
+    return messages
+
+def chat_with_data(query: str, context: str, history: List[Dict] = []) -> str:
+    """
+    Agentic Chat Loop with Tool execution.
+    """
+    messages = _build_chat_messages(query, context, history)
     
     # Tool execution loop (limit 3 turns)
     for _ in range(3):
@@ -257,24 +490,12 @@ def chat_with_data(query: str, context: str, history: List[Dict] = []) -> str:
             
             # Check for tool calls
             if message.tool_calls:
-                for tool_call in message.tool_calls:
-                    fn_name = tool_call.function.name
-                    args = json.loads(tool_call.function.arguments)
-                    
-                    logger.info(f"Agent calling tool: {fn_name} with {args}")
-                    
-                    result_content = ""
-                    if fn_name == "search_web":
-                        result_content = search_web(args["query"])
-                    elif fn_name == "get_stock_price":
-                        result_content = get_stock_price_tool(args["ticker"])
-                    elif fn_name == "get_fundamentals":
-                        result_content = get_fundamentals_tool(args["ticker"])
-                    elif fn_name == "get_technical_indicators":
-                        result_content = get_technicals_tool(args["ticker"])
-                    else:
-                        result_content = "Unknown tool"
-                        
+                # Run this turn's tools concurrently, results keep the call order
+                results = agent_tools.execute_many([
+                    (tool_call.function.name, _parse_tool_args(tool_call.function.arguments))
+                    for tool_call in message.tool_calls
+                ])
+                for tool_call, result_content in zip(message.tool_calls, results):
                     # Feed tool result back
                     messages.append({
                         "role": "tool",
@@ -290,4 +511,86 @@ def chat_with_data(query: str, context: str, history: List[Dict] = []) -> str:
             logger.error(f"Agent Loop Error: {e}")
             return f"I encountered a technical issue: {str(e)}"
             
-    return messages[-1].content or "I'm thinking..."
+    return "I'm thinking..."
+
+async def chat_with_data_stream(query: str, context: str, history: List[Dict] = []) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of the agentic chat loop.
+
+    Yields events as they happen:
+      {"type": "delta", "content": str}           token delta of the answer
+      {"type": "tool_call", "name": str, "arguments": dict}
+      {"type": "tool_result", "name": str}
+      {"type": "error", "message": str}
+      {"type": "done", "content": str}            full final answer, always last
+    """
+    messages = _build_chat_messages(query, context, history)
+    answer = ""
+
+    # Tool execution loop (limit 3 turns)
+    for _ in range(3):
+        try:
+            stream = await async_client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                tools=TOOLS_SCHEMA,
+                tool_choice="auto",
+                temperature=0.3,
+                stream=True
+            )
+
+            content_parts = []
+            tool_calls: Dict[int, Dict[str, str]] = {}
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield {"type": "delta", "content": delta.content}
+                # Tool calls arrive in fragments, reassemble them by index
+                for fragment in delta.tool_calls or []:
+                    call = tool_calls.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+                    if fragment.id:
+                        call["id"] = fragment.id
+                    if fragment.function and fragment.function.name:
+                        call["name"] += fragment.function.name
+                    if fragment.function and fragment.function.arguments:
+                        call["arguments"] += fragment.function.arguments
+
+            answer = "".join(content_parts)
+            if not tool_calls:
+                # No tool calls, we have the final answer
+                yield {"type": "done", "content": answer}
+                return
+
+            calls = [tool_calls[i] for i in sorted(tool_calls)]
+            messages.append({
+                "role": "assistant",
+                "content": answer or None,
+                "tool_calls": [
+                    {"id": c["id"], "type": "function", "function": {"name": c["name"], "arguments": c["arguments"]}}
+                    for c in calls
+                ]
+            })
+
+            parsed = [(call["name"], _parse_tool_args(call["arguments"])) for call in calls]
+            for name, args in parsed:
+                yield {"type": "tool_call", "name": name, "arguments": args}
+
+            results = await agent_tools.execute_many_async(parsed)
+            for call, result_content in zip(calls, results):
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": call["id"],
+                    "content": result_content
+                })
+                yield {"type": "tool_result", "name": call["name"]}
+
+        except Exception as e:
+            logger.error(f"Agent Loop Error: {e}")
+            answer = f"I encountered a technical issue: {str(e)}"
+            yield {"type": "error", "message": str(e)}
+            break
+
+    yield {"type": "done", "content": answer or "I'm thinking..."}
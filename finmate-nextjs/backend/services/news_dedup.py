@@ -0,0 +1,112 @@
+import os
+import re
+import html
+import random
+import zlib
+import logging
+from typing import List, Dict, Any, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The feeds often carry the same story under slightly different headlines.
+# Items are compared as sets of word shingles (stop words dropped, words cut
+# to a short prefix so "rises"/"rising" match) over title + summary: MinHash
+# + LSH banding finds candidate pairs cheaply, exact Jaccard confirms them.
+DEDUP_ENABLED = os.environ.get("NEWS_DEDUP_ENABLED", "true").lower() == "true"
+# Tuned on benchmarks/fixtures/news_dedup_corpus.json (see benchmarks/bench_dedup.py)
+SIMILARITY_THRESHOLD = float(os.environ.get("NEWS_DEDUP_THRESHOLD", "0.3"))
+PREFIX_LENGTH = 5
+STOP_WORDS = frozenset(
+    "a an the of to in on for and or as at by is its it with from after over this that be are "
+    "was were has have had will said says than into their up out but not".split()
+)
+NUM_PERMUTATIONS = 64
+BANDS = 32  # rows per band = NUM_PERMUTATIONS / BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+def _normalize(text: str) -> str:
+    text = html.unescape(re.sub(r"<[^>]+>", " ", text or ""))
+    return " ".join(re.sub(r"[^a-z0-9$%]+", " ", text.lower()).split())
+
+def shingles(item: Dict[str, Any]) -> Set[str]:
+    """Word shingles of the normalized title and summary"""
+    words = _normalize(f"{item.get('title', '')} {item.get('summary', '')}").split()
+    return {w[:PREFIX_LENGTH] for w in words if w not in STOP_WORDS}
+
+def minhash(shingle_set: Set[str]) -> Tuple[int, ...]:
+    hashes = [zlib.crc32(s.encode()) for s in shingle_set] or [0]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def cluster(items: List[Dict[str, Any]], threshold: float = SIMILARITY_THRESHOLD) -> List[List[int]]:
+    """
+    Group items reporting the same story. Returns clusters of indexes into
+    `items`, each in input order, ordered by their first member.
+    """
+    shingle_sets = [shingles(item) for item in items]
+    rows = NUM_PERMUTATIONS // BANDS
+
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    for i, shingle_set in enumerate(shingle_sets):
+        signature = minhash(shingle_set)
+        for band in range(BANDS):
+            buckets.setdefault((band, signature[band * rows:(band + 1) * rows]), []).append(i)
+
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pair = (members[x], members[y])
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if jaccard(shingle_sets[pair[0]], shingle_sets[pair[1]]) >= threshold:
+                    root_a, root_b = find(pair[0]), find(pair[1])
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(items)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+def collapse(raw_news: List[Dict[str, Any]], threshold: float = SIMILARITY_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Keep one item per story. The first item of each cluster (the newest, given
+    publication order) is kept and carries the other copies' links in
+    `duplicate_links`, which end up in the analyzed item's related_sources.
+    """
+    if not DEDUP_ENABLED or len(raw_news) < 2:
+        return raw_news
+
+    collapsed = []
+    for members in cluster(raw_news, threshold):
+        representative = raw_news[members[0]]
+        duplicates = [raw_news[i]['link'] for i in members[1:] if raw_news[i].get('link')]
+        if duplicates:
+            representative = {**representative, 'duplicate_links': duplicates}
+        collapsed.append(representative)
+
+    if len(collapsed) < len(raw_news):
+        logger.info(f"Collapsed {len(raw_news)} news items into {len(collapsed)} stories")
+    return collapsed
@@ -0,0 +1,198 @@
+import os
+import math
+import heapq
+import bisect
+import asyncio
+import threading
+import logging
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Set, Tuple, Iterable
+from models import NewsItem
+from services import news_service, portfolio_service
+from services.executor import run_blocking
+from services.pagination import parse_cursor
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAX_ARTICLES = int(os.environ.get("NEWS_INDEX_MAX_ARTICLES", "5000"))
+INDEX_BUILD_PAGE_SIZE = 500
+# Relevance halves every this many hours
+RECENCY_HALF_LIFE_HOURS = float(os.environ.get("NEWS_RANK_HALF_LIFE_HOURS", "24"))
+# Only the newest articles of each posting are scored. With recency decay an
+# older sector-wide match can't outrank the newest ones, and this keeps a
+# query's cost independent of how many articles a big sector has.
+RANK_CANDIDATES_PER_KEY = int(os.environ.get("NEWS_RANK_CANDIDATES_PER_KEY", "50"))
+
+# Weight of each kind of match between an article and a portfolio
+MATCH_WEIGHTS = {"ticker": 3.0, "industry": 1.5, "sector": 1.0}
+
+Key = Tuple[str, str]  # (kind, value), e.g. ("ticker", "NVDA") or ("sector", "Technology")
+
+def _timestamp(item: NewsItem) -> float:
+    value = item.published or item.created_at
+    if not value:
+        return 0.0
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+    except ValueError:
+        return 0.0
+
+class NewsIndex:
+    """
+    In-memory inverted index from ticker / sector / industry to article IDs.
+
+    Articles are keyed by their tickers (news_ticker_associations) and by the
+    sector and industry of those tickers (company_profiles). Ranking a
+    portfolio only touches the newest entries of the postings of its own
+    tickers, sectors and industries, so it costs no DB or LLM call. Saved
+    articles are added as they come out of the pipeline.
+    """
+
+    def __init__(self, max_articles: int = INDEX_MAX_ARTICLES):
+        self.max_articles = max_articles
+        self._lock = threading.Lock()
+        self._articles: Dict[str, NewsItem] = {}
+        self._timestamps: Dict[str, float] = {}
+        self._keys: Dict[str, Set[Key]] = {}
+        # Postings are (timestamp, id) lists kept sorted, newest last
+        self._postings: Dict[Key, List[Tuple[float, str]]] = {}
+        self._profiles: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._newest: Optional[List[str]] = None  # IDs by recency, rebuilt after changes
+        self._build_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Build in the background so startup isn't held up by the DB"""
+        if self._build_task is None:
+            self._build_task = asyncio.create_task(run_blocking(self.build))
+
+    def build(self):
+        """Load company profiles and the most recent articles"""
+        self.set_profiles(portfolio_service.load_profiles())
+        before = before_id = None
+        loaded = 0
+        while loaded < self.max_articles:
+            page = news_service.get_latest_news(limit=INDEX_BUILD_PAGE_SIZE, before=before, before_id=before_id)
+            self.add(page)
+            loaded += len(page)
+            if len(page) < INDEX_BUILD_PAGE_SIZE or not page[-1].created_at:
+                break
+            before, before_id = parse_cursor(page[-1].created_at, page[-1].id)
+        logger.info(f"News index built: {len(self)} articles, {len(self._profiles)} profiles")
+
+    def _profile_keys(self, ticker: str) -> Set[Key]:
+        sector, industry = self._profiles.get(ticker, (None, None))
+        keys = set()
+        if sector and sector != "Unknown":
+            keys.add(("sector", sector))
+        if industry and industry != "Unknown":
+            keys.add(("industry", industry))
+        return keys
+
+    def _article_keys(self, item: NewsItem) -> Set[Key]:
+        keys = set()
+        for ticker in item.affected_tickers or []:
+            ticker = ticker.upper()
+            keys.add(("ticker", ticker))
+            keys |= self._profile_keys(ticker)
+        return keys
+
+    def _unindex_keys(self, news_id: str, keys: Set[Key]):
+        entry = (self._timestamps.get(news_id), news_id)
+        for key in keys:
+            posting = self._postings.get(key)
+            if posting:
+                i = bisect.bisect_left(posting, entry)
+                if i < len(posting) and posting[i] == entry:
+                    del posting[i]
+                if not posting:
+                    del self._postings[key]
+
+    def _unindex(self, news_id: str):
+        self._unindex_keys(news_id, self._keys.pop(news_id, set()))
+        self._articles.pop(news_id, None)
+        self._timestamps.pop(news_id, None)
+
+    def _index(self, news_id: str, keys: Set[Key]):
+        self._keys[news_id] = keys
+        entry = (self._timestamps[news_id], news_id)
+        for key in keys:
+            bisect.insort(self._postings.setdefault(key, []), entry)
+
+    def add(self, items: Iterable[NewsItem]):
+        """Index (or re-index) saved articles, evicting the oldest past max_articles"""
+        with self._lock:
+            for item in items:
+                if not item.id:
+                    continue
+                self._unindex(item.id)
+                self._articles[item.id] = item
+                self._timestamps[item.id] = _timestamp(item)
+                self._index(item.id, self._article_keys(item))
+
+            overflow = len(self._articles) - self.max_articles
+            if overflow > 0:
+                for news_id in heapq.nsmallest(overflow, self._timestamps, key=self._timestamps.get):
+                    self._unindex(news_id)
+            self._newest = None
+
+    def set_profiles(self, profiles: Dict[str, Dict]):
+        """Learn tickers' sector/industry and re-key the articles that mention them"""
+        with self._lock:
+            changed = []
+            for ticker, profile in profiles.items():
+                ticker = ticker.upper()
+                value = (profile.get("sector"), profile.get("industry"))
+                if self._profiles.get(ticker) != value:
+                    self._profiles[ticker] = value
+                    changed.append(ticker)
+            for ticker in changed:
+                for _, news_id in list(self._postings.get(("ticker", ticker), ())):
+                    self._unindex_keys(news_id, self._keys.get(news_id, set()))
+                    self._index(news_id, self._article_keys(self._articles[news_id]))
+
+    def missing_profiles(self, tickers: Iterable[str]) -> List[str]:
+        return [t.upper() for t in tickers if t.upper() not in self._profiles]
+
+    def rank(self, portfolio: List[str], limit: int = 20, now: Optional[float] = None) -> List[NewsItem]:
+        """
+        Articles for a portfolio, best first: matches on held tickers, then
+        their industries and sectors, weighted by recency. Remaining slots are
+        filled with the newest articles.
+        """
+        now = now or datetime.now(timezone.utc).timestamp()
+        tickers = {t.upper() for t in portfolio}
+        query_keys = {("ticker", t) for t in tickers}
+        for ticker in tickers:
+            query_keys |= self._profile_keys(ticker)
+
+        with self._lock:
+            weights: Dict[str, float] = {}
+            for key in query_keys:
+                weight = MATCH_WEIGHTS[key[0]]
+                for _, news_id in self._postings.get(key, ())[-RANK_CANDIDATES_PER_KEY:]:
+                    weights[news_id] = weights.get(news_id, 0.0) + weight
+
+            # weight * 0.5 ** (age / half-life), compared in log space
+            decay = math.log(2) / (RECENCY_HALF_LIFE_HOURS * 3600)
+            timestamps = self._timestamps
+
+            def score(news_id: str) -> float:
+                return math.log(weights[news_id]) - decay * max(0.0, now - timestamps[news_id])
+
+            ranked = heapq.nlargest(limit, weights, key=score)
+            if len(ranked) < limit:
+                if self._newest is None:
+                    self._newest = sorted(self._timestamps, key=self._timestamps.get, reverse=True)
+                taken = set(ranked)
+                for news_id in self._newest:
+                    if len(ranked) >= limit:
+                        break
+                    if news_id not in taken:
+                        ranked.append(news_id)
+            return [self._articles[news_id] for news_id in ranked]
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+index = NewsIndex()
@@ -0,0 +1,266 @@
+import asyncio
+import os
+import time
+import logging
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Callable, Set
+from models import NewsItem
+from services import news_service, llm_service, analysis_cache, news_dedup, news_writer
+from services.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Workers per stage. Verify (DuckDuckGo) and analyze (OpenAI) are network bound;
+# persist is one bulk write per refresh (see news_writer).
+VERIFY_WORKERS = int(os.environ.get("NEWS_VERIFY_WORKERS", "4"))
+ANALYZE_WORKERS = int(os.environ.get("NEWS_ANALYZE_WORKERS", "4"))
+# Articles packed into one analysis request (1 = one request per article)
+ANALYSIS_BATCH_SIZE = int(os.environ.get("NEWS_ANALYSIS_BATCH_SIZE", "1"))
+
+class StageTimer:
+    """Accumulates wall time spent in each pipeline stage"""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def record(self, stage: str, seconds: float):
+        self.totals[stage] += seconds
+        self.counts[stage] += 1
+
+    def log_summary(self, elapsed: float, item_count: int):
+        parts = []
+        for stage, total in self.totals.items():
+            count = self.counts[stage]
+            parts.append(f"{stage}: {total:.2f}s total / {total / count:.2f}s avg over {count}")
+        logger.info(f"News pipeline processed {item_count} items in {elapsed:.2f}s ({'; '.join(parts)})")
+
+async def _run_stage(timer: StageTimer, stage: str, fn: Callable, *args):
+    """Run a stage (coroutine function or blocking call on the I/O pool) and record its duration"""
+    start = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await run_blocking(fn, *args)
+    finally:
+        timer.record(stage, time.perf_counter() - start)
+
+class AnalysisBatcher:
+    """
+    Groups verified items into batched analysis requests of up to `size`
+    articles. A batch goes out as soon as it is full, or once every item still
+    expected has either arrived or dropped out, so nothing waits on an item
+    that will never come. Each item must call exactly one of analyze() or skip().
+    """
+
+    def __init__(
+        self,
+        portfolio: List[str],
+        size: int,
+        expected: int,
+        limits: Dict[str, asyncio.Semaphore],
+        timer: StageTimer
+    ):
+        self.portfolio = portfolio
+        self.size = size
+        self.remaining = expected
+        self.limits = limits
+        self.timer = timer
+        self.pending: List[tuple] = []
+        # Strong references to the flush tasks, the loop only keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def analyze(self, raw_item: Dict[str, Any], search_context: str) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((raw_item, search_context, future))
+        self.remaining -= 1
+        self._maybe_flush()
+        return await future
+
+    def skip(self):
+        """The item won't be analyzed (cache hit or an earlier stage failed)"""
+        self.remaining -= 1
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        while len(self.pending) >= self.size or (self.pending and self.remaining <= 0):
+            batch, self.pending = self.pending[:self.size], self.pending[self.size:]
+            task = asyncio.create_task(self._flush(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: List[tuple]):
+        raw_items = [raw for raw, _, _ in batch]
+        contexts = [ctx for _, ctx, _ in batch]
+        try:
+            async with self.limits["analyze"]:
+                results = await _run_stage(
+                    self.timer, "analyze", llm_service.analyze_news_batch_async,
+                    raw_items, self.portfolio, contexts
+                )
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+def _is_cacheable(analysis: Dict[str, Any]) -> bool:
+    return analysis.get('impact_reason') != llm_service.ANALYSIS_FAILED_REASON
+
+async def _full_analysis(
+    raw_item: Dict[str, Any],
+    portfolio: List[str],
+    limits: Dict[str, asyncio.Semaphore],
+    timer: StageTimer,
+    batcher: Optional[AnalysisBatcher] = None
+) -> Dict[str, Any]:
+    """verify -> analyze, skipped entirely when the analysis is cached"""
+    url = raw_item['link']
+    key = analysis_cache.portfolio_key(portfolio)
+
+    queued = False
+    try:
+        analysis = await _run_stage(timer, "cache", analysis_cache.get, url, key)
+        if analysis is not None:
+            return analysis
+
+        async with limits["verify"]:
+            search_context = await _run_stage(timer, "verify", llm_service.verify_news, raw_item)
+
+        if batcher:
+            queued = True
+            analysis = await batcher.analyze(raw_item, search_context)
+        else:
+            async with limits["analyze"]:
+                analysis = await _run_stage(timer, "analyze", llm_service.analyze_news_async, raw_item, portfolio, search_context)
+    finally:
+        if batcher and not queued:
+            batcher.skip()
+
+    if _is_cacheable(analysis):
+        await _run_stage(timer, "cache", analysis_cache.put, url, key, analysis)
+    return analysis
+
+async def _impact(
+    news: Dict[str, Any],
+    portfolio: List[str],
+    limits: Dict[str, asyncio.Semaphore],
+    timer: StageTimer
+) -> Dict[str, Any]:
+    """Portfolio-specific impact step (split mode and personalize), cached per (article, portfolio)"""
+    url = news['link']
+    key = analysis_cache.impact_key(portfolio)
+
+    impact = await _run_stage(timer, "cache", analysis_cache.get, url, key)
+    if impact is not None:
+        return impact
+
+    async with limits["analyze"]:
+        impact = await _run_stage(timer, "impact", llm_service.assess_impact_async, news, portfolio)
+
+    if _is_cacheable(impact):
+        await _run_stage(timer, "cache", analysis_cache.put, url, key, impact)
+    return impact
+
+async def _process_item(
+    raw_item: Dict[str, Any],
+    portfolio: List[str],
+    limits: Dict[str, asyncio.Semaphore],
+    timer: StageTimer,
+    batcher: Optional[AnalysisBatcher] = None
+) -> Optional[NewsItem]:
+    """Push a single raw item through verify -> analyze (persisting is done in bulk)"""
+    try:
+        if analysis_cache.SPLIT_MODE and portfolio:
+            # Shared analysis once per article, then the cheap per-portfolio step
+            analysis = await _full_analysis(raw_item, [], limits, timer, batcher)
+            impact = await _impact({**analysis, 'link': raw_item['link']}, portfolio, limits, timer)
+            analysis = {**analysis, **impact}
+        else:
+            analysis = await _full_analysis(raw_item, portfolio, limits, timer, batcher)
+
+        return news_service.build_news_item(raw_item, analysis)
+    except Exception as e:
+        logger.error(f"News pipeline failed for {raw_item.get('link')}: {e}")
+        return None
+
+async def personalize(
+    items: List[NewsItem],
+    portfolio: List[str],
+    analyze_workers: int = ANALYZE_WORKERS
+) -> List[NewsItem]:
+    """
+    Overlay portfolio-specific impact on already analyzed (shared) items.
+    Cost scales with articles this portfolio hasn't seen yet, not with users.
+    """
+    timer = StageTimer()
+    start = time.perf_counter()
+    limits = {"analyze": asyncio.Semaphore(max(1, analyze_workers))}
+
+    async def one(item: NewsItem) -> NewsItem:
+        try:
+            news = {"link": item.link, "headline": item.headline, "summary": item.summary}
+            impact = await _impact(news, portfolio, limits, timer)
+            return item.model_copy(update={k: v for k, v in impact.items() if k in llm_service.IMPACT_FIELDS})
+        except Exception as e:
+            logger.error(f"Personalizing {item.link} failed: {e}")
+            return item
+
+    personalized = list(await asyncio.gather(*(one(item) for item in items)))
+    timer.log_summary(time.perf_counter() - start, len(personalized))
+    return personalized
+
+async def run_refresh_pipeline(
+    portfolio: List[str],
+    raw_news: Optional[List[Dict[str, Any]]] = None,
+    verify_workers: int = VERIFY_WORKERS,
+    analyze_workers: int = ANALYZE_WORKERS,
+    batch_size: int = ANALYSIS_BATCH_SIZE
+) -> List[NewsItem]:
+    """
+    Fetch, deduplicate, verify, analyze and persist news with bounded concurrency.
+
+    Every item runs through the stages independently, so while one item is
+    being analyzed the next ones are already verifying. Each stage has its own
+    worker limit. Results are returned in publication order (newest first, as
+    delivered by the fetch stage), skipping items that failed.
+
+    All analyzed items are then saved in bulk, or handed to the write-behind
+    queue with NEWS_WRITE_BEHIND so the caller doesn't wait on the DB. Items
+    that couldn't be saved are still returned, with their temporary id.
+
+    With batch_size > 1, verified items are analyzed batch_size at a time in
+    a single LLM request each.
+    """
+    timer = StageTimer()
+    start = time.perf_counter()
+
+    if raw_news is None:
+        raw_news = await _run_stage(timer, "fetch", news_service.fetch_news_async)
+
+    # Copies of one story from several feeds are analyzed once
+    raw_news = await _run_stage(timer, "dedup", news_dedup.collapse, raw_news)
+
+    limits = {
+        "verify": asyncio.Semaphore(max(1, verify_workers)),
+        "analyze": asyncio.Semaphore(max(1, analyze_workers)),
+    }
+
+    batcher = None
+    if batch_size > 1:
+        analysis_portfolio = [] if analysis_cache.SPLIT_MODE and portfolio else portfolio
+        batcher = AnalysisBatcher(analysis_portfolio, batch_size, len(raw_news), limits, timer)
+
+    results = await asyncio.gather(*(
+        _process_item(item, portfolio, limits, timer, batcher) for item in raw_news
+    ))
+
+    analyzed_news = [item for item in results if item is not None]
+    if news_writer.WRITE_BEHIND:
+        news_writer.writer.enqueue(analyzed_news)
+    elif analyzed_news:
+        await _run_stage(timer, "persist", news_writer.persist, analyzed_news)
+
+    timer.log_summary(time.perf_counter() - start, len(analyzed_news))
+    return analyzed_news
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Set
+from models import NewsItem
+from services import news_service, news_pipeline, portfolio_service
+from services.feed_registry import registry
+from services.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_ENABLED = os.environ.get("NEWS_SCHEDULER_ENABLED", "true").lower() == "true"
+POLL_INTERVAL_SECONDS = int(os.environ.get("NEWS_POLL_INTERVAL_SECONDS", "600"))
+# The loop wakes this often and fetches whichever feeds are due (see feed_registry)
+TICK_SECONDS = int(os.environ.get("NEWS_SCHEDULER_TICK_SECONDS", "60"))
+# How often the per-ticker feeds are re-synced with the tickers users hold
+TICKER_FEEDS_SYNC_SECONDS = int(os.environ.get("NEWS_TICKER_FEEDS_SYNC_SECONDS", "900"))
+STORE_MAX_ITEMS = int(os.environ.get("NEWS_STORE_MAX_ITEMS", "200"))
+SEEN_MAX_URLS = 5000
+
+class NewsStore:
+    """In-memory store of pre-analyzed news, keyed by article URL"""
+
+    def __init__(self, max_items: int = STORE_MAX_ITEMS):
+        self.max_items = max_items
+        self._items: Dict[str, NewsItem] = {}
+
+    def add(self, items: List[NewsItem]):
+        for item in items:
+            self._items[item.link] = item
+        if len(self._items) > self.max_items:
+            # Drop the oldest publications first
+            for item in self._sorted()[self.max_items:]:
+                self._items.pop(item.link, None)
+
+    def latest(self, limit: int = 20) -> List[NewsItem]:
+        return self._sorted()[:limit]
+
+    def latest_saved(self, limit: int = 20) -> List[NewsItem]:
+        """Newest saved items in DB feed order (created_at, then id), so DB cursors continue from them"""
+        saved = [item for item in self._items.values() if item.created_at]
+        return sorted(saved, key=lambda x: (x.created_at, x.id), reverse=True)[:limit]
+
+    def _sorted(self) -> List[NewsItem]:
+        return sorted(self._items.values(), key=lambda x: x.published or "", reverse=True)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+class NewsIngestionScheduler:
+    """
+    Polls the RSS feeds in the background and analyzes only unseen articles.
+    Each tick only fetches the feeds that are due, so polls of many feeds are
+    spread over time according to their own intervals.
+
+    Ticks are single-flight: a tick requested while another one is running
+    joins it instead of starting a second one, and URLs that are already being
+    analyzed are never claimed twice. Background analysis runs without a
+    portfolio, so the stored items are shared by every user; /refresh
+    overlays each user's portfolio impact (news_pipeline.personalize).
+    """
+
+    def __init__(self, store: NewsStore, interval: int = POLL_INTERVAL_SECONDS, tick_seconds: int = TICK_SECONDS):
+        self.store = store
+        self.interval = interval
+        self.tick_seconds = tick_seconds
+        self.last_tick_at: Optional[float] = None
+        self.ticker_feeds_synced_at: Optional[float] = None
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._inflight: Set[str] = set()
+        self._current_tick: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Warm the store from the DB and start the polling loop"""
+        try:
+            cached = await run_blocking(news_service.get_latest_news)
+            self.store.add(cached)
+            self._mark_seen([item.link for item in cached])
+        except Exception as e:
+            logger.error(f"Failed to warm news store: {e}")
+
+        if SCHEDULER_ENABLED and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+            logger.info(f"News scheduler started (tick every {self.tick_seconds}s, {len(registry.feeds())} feeds)")
+
+    async def stop(self):
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self._sync_ticker_feeds()
+                await self.tick()
+            except Exception as e:
+                logger.error(f"News scheduler tick failed: {e}")
+            await asyncio.sleep(self.tick_seconds)
+
+    async def _sync_ticker_feeds(self):
+        """Register a feed per held ticker, dropping feeds for tickers nobody holds"""
+        now = time.time()
+        if self.ticker_feeds_synced_at and now - self.ticker_feeds_synced_at < TICKER_FEEDS_SYNC_SECONDS:
+            return
+        tickers = await run_blocking(portfolio_service.load_all_tickers)
+        # An empty result is more likely a DB hiccup than nobody holding anything
+        if tickers:
+            registry.sync_ticker_feeds(tickers)
+        self.ticker_feeds_synced_at = now
+
+    def tick(self) -> "asyncio.Future":
+        """Start a tick, or join the one already running"""
+        if self._current_tick is None or self._current_tick.done():
+            self._current_tick = asyncio.create_task(self._tick())
+        # Shield so a cancelled caller (e.g. a dropped request) doesn't kill the tick
+        return asyncio.shield(self._current_tick)
+
+    async def refresh(self) -> List[NewsItem]:
+        """Serve the store, ticking first only when it is empty or stale"""
+        stale = self.last_tick_at is None or time.time() - self.last_tick_at > self.interval
+        if stale or len(self.store) == 0:
+            await self.tick()
+        return self.store.latest()
+
+    async def _tick(self) -> int:
+        raw_news = await news_service.fetch_news_async()
+        claimed = self._claim(raw_news)
+
+        try:
+            if claimed:
+                logger.info(f"News scheduler analyzing {len(claimed)} new articles")
+                analyzed = await news_pipeline.run_refresh_pipeline([], raw_news=claimed)
+                self.store.add(analyzed)
+                # Feed copies collapsed into an analyzed story count as seen too
+                self._mark_seen([url for item in analyzed for url in (item.link, *item.related_sources)])
+            self.last_tick_at = time.time()
+            return len(claimed)
+        finally:
+            for item in claimed:
+                self._inflight.discard(item['link'])
+
+    def _claim(self, raw_news: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Reserve unseen URLs for this tick so nobody else analyzes them"""
+        claimed = []
+        for item in raw_news:
+            url = item.get('link')
+            if not url or url in self._seen or url in self._inflight or url in self.store:
+                continue
+            self._inflight.add(url)
+            claimed.append(item)
+        return claimed
+
+    def _mark_seen(self, urls: List[str]):
+        for url in urls:
+            self._seen[url] = None
+            self._seen.move_to_end(url)
+        while len(self._seen) > SEEN_MAX_URLS:
+            self._seen.popitem(last=False)
+
+store = NewsStore()
+scheduler = NewsIngestionScheduler(store)
@@ -2,10 +2,13 @@ from duckduckgo_search import DDGS
 from openai import OpenAI
 import os
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import uuid
+from datetime import datetime
 from db.client import supabase
 from models import NewsItem
+from services.cache import TTLCache
+from services.pagination import keyset_filter
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,17 @@ PROCESSED_NEWS = [
 
 from services import rss_service
 
+# Analyzed articles by ID, filled by the feed and refresh paths so detail views rarely hit the DB
+NEWS_CACHE_SIZE = int(os.environ.get("NEWS_CACHE_SIZE", "1000"))
+NEWS_CACHE_TTL_SECONDS = int(os.environ.get("NEWS_CACHE_TTL_SECONDS", "3600"))
+_news_cache = TTLCache(maxsize=NEWS_CACHE_SIZE, ttl=NEWS_CACHE_TTL_SECONDS)
+
+def cache_news_items(items: List[NewsItem]):
+    """Remember analyzed items so get_news_by_id can serve them without a query"""
+    for item in items:
+        if item.id:
+            _news_cache.set(item.id, item)
+
 def fetch_news() -> List[Dict[str, Any]]:
     """Fetch raw financial news from RSS Feeds"""
     try:
@@ -38,83 +52,201 @@ def fetch_news() -> List[Dict[str, Any]]:
         logger.error(f"Error fetching news: {e}")
         return []
 
-def save_analyzed_news(news_item: NewsItem):
-    """Save an analyzed news item to the database"""
+async def fetch_news_async() -> List[Dict[str, Any]]:
+    """Fetch raw financial news from RSS Feeds without blocking the event loop"""
+    try:
+        return await rss_service.fetch_rss_news_async()
+    except Exception as e:
+        logger.error(f"Error fetching news: {e}")
+        return []
+
+def build_news_item(raw_item: Dict[str, Any], analysis: Dict[str, Any]) -> NewsItem:
+    """Combine a raw RSS item and its LLM analysis into a NewsItem"""
+    return NewsItem(
+        id=str(uuid.uuid4()), # Temporary ID, DB assigns real one but we need one for model
+        headline=analysis.get('headline', raw_item['title']),
+        summary=analysis.get('summary', raw_item['summary']),
+        sentiment_score=analysis.get('sentiment_score', 50),
+        category=analysis.get('category', 'General'),
+        affected_tickers=analysis.get('affected_tickers', []),
+        impact=analysis.get('impact', 'neutral'),
+        impact_reason=analysis.get('impact_reason', ''),
+        risk_level=analysis.get('risk_level', 'medium'),
+        link=raw_item['link'],
+        published=raw_item.get('published'),
+        source=raw_item.get('source', 'Unknown'),
+        # Links of the same story from other feeds (see news_dedup.collapse)
+        related_sources=list(dict.fromkeys((analysis.get('related_sources') or []) + raw_item.get('duplicate_links', [])))
+    )
+
+def _article_row(news_item: NewsItem) -> Dict[str, Any]:
+    # No id: on a url conflict the existing row keeps its id
+    return {
+        "url": news_item.link,
+        "headline": news_item.headline,
+        "summary": news_item.summary,
+        "source": news_item.source,
+        "published_at": news_item.published, 
+        "sentiment_score": news_item.sentiment_score,
+        "risk_level": news_item.risk_level,
+        "impact_level": news_item.impact,
+        "impact_reason": news_item.impact_reason,
+        "related_sources": news_item.related_sources
+    }
+
+def save_analyzed_news_batch(news_items: List[NewsItem]) -> Dict[str, Dict[str, Any]]:
+    """
+    Save many analyzed items in two round-trips: one upsert for the articles
+    (returning their ids) and one for all their ticker associations.
+    Returns {"id", "created_at"} per article URL; URLs that failed are missing.
+    """
     if not supabase:
         logger.warning("Supabase unavailable, cannot save news.")
-        return
+        return {}
+
+    # A statement can't upsert the same url twice, keep the last version
+    by_url = {item.link: item for item in news_items if item.link}
+    if not by_url:
+        return {}
 
     try:
-        # 1. Insert/Upsert Article
-        article_data = {
-            "url": news_item.link,
-            "headline": news_item.headline,
-            "summary": news_item.summary,
-            "source": news_item.source,
-            "published_at": news_item.published, 
-            "sentiment_score": news_item.sentiment_score,
-            "risk_level": news_item.risk_level,
-            "impact_level": news_item.impact,
-            # NEW FIELDS
-            "impact_reason": news_item.impact_reason,
-            "related_sources": news_item.related_sources
-        }
-        
-        # upsert, match on url
-        res = supabase.table("news_articles").upsert(article_data, on_conflict="url").execute()
-        
-        if not res.data:
-            # Fallback for some DB configs that don't return data on upsert unless asked
-            # But Supabase usually does. If not, we query ID by URL
-            res = supabase.table("news_articles").select("id").eq("url", news_item.link).execute()
-            
-        article_id = res.data[0]['id']
-        
-        # 2. Associations (Tickers)
-        for ticker in news_item.affected_tickers:
-            try:
-                supabase.table("news_ticker_associations").upsert({
-                    "news_id": article_id,
-                    "ticker": ticker
-                }).execute()
-            except Exception as e:
-                logger.error(f"Failed to link ticker {ticker}: {e}")
-                
+        res = supabase.table("news_articles") \
+            .upsert([_article_row(item) for item in by_url.values()], on_conflict="url") \
+            .execute()
+        saved = {row['url']: {"id": row['id'], "created_at": row.get('created_at')} for row in res.data or []}
+
+        missing = [url for url in by_url if url not in saved]
+        if missing:
+            # Some DB configs don't return rows on upsert
+            res = supabase.table("news_articles").select("id, url, created_at").in_("url", missing).execute()
+            saved.update({row['url']: {"id": row['id'], "created_at": row.get('created_at')} for row in res.data})
     except Exception as e:
-        logger.error(f"Failed to save analyzed news to DB: {e}")
+        logger.error(f"Failed to save {len(by_url)} analyzed news items to DB: {e}")
+        return {}
+
+    associations = {
+        (saved[url]['id'], ticker.upper())
+        for url, item in by_url.items() if url in saved
+        for ticker in item.affected_tickers or []
+    }
+    if associations:
+        try:
+            supabase.table("news_ticker_associations").upsert(
+                [{"news_id": news_id, "ticker": ticker} for news_id, ticker in associations],
+                on_conflict="news_id,ticker",
+                ignore_duplicates=True
+            ).execute()
+        except Exception as e:
+            logger.error(f"Failed to link tickers for {len(saved)} news items: {e}")
+
+    return saved
 
-def get_latest_news() -> List[NewsItem]:
-    """Fetch cached analyzed news from DB"""
+def save_analyzed_news(news_item: NewsItem) -> Optional[Dict[str, Any]]:
+    """Save an analyzed news item to the database, returning its id and created_at"""
+    return save_analyzed_news_batch([news_item]).get(news_item.link)
+
+# Explicit projection so the feed doesn't drag unused columns over the wire
+NEWS_COLUMNS = (
+    "id, url, headline, summary, source, published_at, sentiment_score, "
+    "risk_level, impact_level, impact_reason, related_sources, created_at"
+)
+
+def _row_to_news_item(row: Dict[str, Any], tickers: List[str]) -> NewsItem:
+    return NewsItem(
+        id=row['id'],
+        headline=row['headline'],
+        summary=row['summary'] or "",
+        sentiment_score=row['sentiment_score'] or 50,
+        category="General", 
+        affected_tickers=tickers,
+        impact=row['impact_level'] or "neutral",
+        impact_reason=row.get('impact_reason', "") or "Analysis pending...", 
+        risk_level=row['risk_level'] or "medium",
+        link=row['url'],
+        published=row['published_at'],
+        source=row['source'] or "Unknown",
+        related_sources=row.get('related_sources', []) or [],
+        created_at=row.get('created_at')
+    )
+
+def _load_tickers(news_ids: List[str]) -> Dict[str, List[str]]:
+    """Fetch ticker associations for many articles in a single query"""
+    tickers_by_id: Dict[str, List[str]] = {news_id: [] for news_id in news_ids}
+    if not news_ids:
+        return tickers_by_id
+    res = supabase.table("news_ticker_associations").select("news_id, ticker").in_("news_id", news_ids).execute()
+    for row in res.data:
+        tickers_by_id.setdefault(row['news_id'], []).append(row['ticker'])
+    return tickers_by_id
+
+def get_latest_news(limit: int = 20, before: Optional[datetime] = None, ticker: Optional[str] = None,
+                    before_id: Optional[uuid.UUID] = None) -> List[NewsItem]:
+    """
+    Fetch cached analyzed news from DB, newest first (by created_at, then id).
+
+    Ticker associations are embedded in the article select, so a page costs one
+    round-trip. `before`/`before_id` are a (created_at, id) cursor, parsed with
+    pagination.parse_cursor: pass the last item's created_at and id to get the
+    next page. Articles saved
+    together can share a created_at, so the id breaks ties; without it a page
+    boundary falling among them would skip the rest. `ticker` restricts the
+    feed to articles linked to that ticker.
+    """
     if not supabase:
         return []
         
     try:
-        # Fetch latest 20 articles
-        res = supabase.table("news_articles").select("*").order("created_at", desc=True).limit(20).execute()
-        
-        items = []
-        for row in res.data:
-            # Fetch tickers
-            ticker_res = supabase.table("news_ticker_associations").select("ticker").eq("news_id", row['id']).execute()
-            tickers = [t['ticker'] for t in ticker_res.data]
-            
-            item = NewsItem(
-                id=row['id'],
-                headline=row['headline'],
-                summary=row['summary'] or "",
-                sentiment_score=row['sentiment_score'] or 50,
-                category="General", 
-                affected_tickers=tickers,
-                impact=row['impact_level'] or "neutral",
-                impact_reason=row.get('impact_reason', "") or "Analysis pending...", 
-                risk_level=row['risk_level'] or "medium",
-                link=row['url'],
-                published=row['published_at'],
-                source=row['source'] or "Unknown",
-                related_sources=row.get('related_sources', []) or []
-            )
-            items.append(item)
+        if ticker:
+            # Inner join filters the articles, but the embedded rows then only
+            # hold the matched ticker, so full ticker lists come from one extra query
+            query = supabase.table("news_articles") \
+                .select(f"{NEWS_COLUMNS}, news_ticker_associations!inner(ticker)") \
+                .eq("news_ticker_associations.ticker", ticker.upper())
+        else:
+            query = supabase.table("news_articles").select(f"{NEWS_COLUMNS}, news_ticker_associations(ticker)")
+
+        if before and before_id:
+            query = query.or_(keyset_filter("created_at", before, before_id))
+        elif before:
+            query = query.lt("created_at", before.isoformat())
+
+        res = query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+
+        if ticker:
+            tickers_by_id = _load_tickers([row['id'] for row in res.data])
+        else:
+            tickers_by_id = {
+                row['id']: [t['ticker'] for t in row.get('news_ticker_associations') or []]
+                for row in res.data
+            }
+
+        items = [_row_to_news_item(row, tickers_by_id.get(row['id'], [])) for row in res.data]
+        cache_news_items(items)
         return items
     except Exception as e:
         logger.error(f"Failed to fetch news from DB: {e}")
         return []
+
+def get_news_by_id(news_id: str) -> Optional[NewsItem]:
+    """Fetch a single analyzed article, from cache or with one DB round-trip"""
+    cached = _news_cache.get(news_id)
+    if cached is not None:
+        return cached
+
+    if not supabase:
+        return None
+
+    try:
+        res = supabase.table("news_articles") \
+            .select(f"{NEWS_COLUMNS}, news_ticker_associations(ticker)") \
+            .eq("id", news_id).limit(1).execute()
+        if not res.data:
+            return None
+
+        row = res.data[0]
+        item = _row_to_news_item(row, [t['ticker'] for t in row.get('news_ticker_associations') or []])
+        cache_news_items([item])
+        return item
+    except Exception as e:
+        logger.error(f"Failed to fetch news item {news_id}: {e}")
+        return None
@@ -0,0 +1,122 @@
+import os
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Set
+from models import NewsItem
+from services import news_service, news_index
+from services.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Refresh responses don't wait on the DB: analyzed items are queued and
+# flushed in bulk in the background
+WRITE_BEHIND = os.environ.get("NEWS_WRITE_BEHIND", "false").lower() == "true"
+WRITE_BATCH_SIZE = int(os.environ.get("NEWS_WRITE_BATCH_SIZE", "100"))
+WRITE_FLUSH_SECONDS = float(os.environ.get("NEWS_WRITE_FLUSH_SECONDS", "2"))
+WRITE_MAX_ATTEMPTS = 3
+
+def _apply(items: List[NewsItem], saved: Dict[str, Dict[str, Any]]) -> List[NewsItem]:
+    """Give saved items their DB id (in place) and make them visible by id"""
+    applied = []
+    for item in items:
+        row = saved.get(item.link)
+        if row:
+            item.id = row['id']
+            item.created_at = row.get('created_at')
+            applied.append(item)
+    news_service.cache_news_items(applied)
+    news_index.index.add(applied)
+    return applied
+
+async def persist(items: List[NewsItem]) -> List[NewsItem]:
+    """Save items now, in chunks of WRITE_BATCH_SIZE; returns the ones that were saved"""
+    applied = []
+    for start in range(0, len(items), WRITE_BATCH_SIZE):
+        chunk = items[start:start + WRITE_BATCH_SIZE]
+        saved = await run_blocking(news_service.save_analyzed_news_batch, chunk)
+        applied.extend(_apply(chunk, saved))
+    return applied
+
+class NewsWriter:
+    """
+    Write-behind queue for analyzed news.
+
+    Queued items keep their temporary id until their batch is flushed, and
+    are cached under it meanwhile so detail lookups still work. A batch is
+    flushed when it is full or every WRITE_FLUSH_SECONDS; items whose save
+    failed are retried up to WRITE_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, batch_size: int = WRITE_BATCH_SIZE, flush_seconds: float = WRITE_FLUSH_SECONDS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: List[NewsItem] = []
+        self._attempts: Dict[str, int] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        # Size-triggered flushes in flight, held so they can't be garbage collected mid-run
+        self._tasks: Set[asyncio.Task] = set()
+
+    def enqueue(self, items: List[NewsItem]):
+        news_service.cache_news_items(items)
+        self._queue.extend(items)
+        if self._loop_task is None:
+            self._flush_lock = asyncio.Lock()
+            self._loop_task = asyncio.create_task(self._run())
+        if len(self._queue) >= self.batch_size:
+            task = asyncio.create_task(self.flush())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"News write-behind flush failed: {e}")
+
+    async def flush(self):
+        """Save everything queued so far; failed items go back in the queue"""
+        async with self._flush_lock:
+            pending, self._queue = self._queue, []
+            failed = []
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                saved = await run_blocking(news_service.save_analyzed_news_batch, batch)
+                _apply(batch, saved)
+                for item in batch:
+                    if item.link in saved:
+                        self._attempts.pop(item.link, None)
+                    else:
+                        failed.append(item)
+            self._requeue(failed)
+
+    def _requeue(self, failed: List[NewsItem]):
+        for item in failed:
+            attempts = self._attempts.get(item.link, 0) + 1
+            if attempts >= WRITE_MAX_ATTEMPTS:
+                logger.error(f"Dropping news item after {attempts} failed saves: {item.link}")
+                self._attempts.pop(item.link, None)
+                continue
+            self._attempts[item.link] = attempts
+            self._queue.append(item)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    async def stop(self):
+        """Flush what's queued, then stop the flush loop"""
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"News write-behind final flush failed, {len(self._queue)} items lost: {e}")
+
+writer = NewsWriter()
@@ -0,0 +1,23 @@
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+Cursor = Tuple[Optional[datetime], Optional[uuid.UUID]]
+
+def parse_cursor(before: Optional[str], before_id: Optional[str] = None) -> Cursor:
+    """
+    Parse a keyset cursor (timestamp of the last item seen, and its id as a
+    tiebreaker). Raises ValueError for anything that isn't an ISO timestamp or a
+    UUID, so the values can go into a PostgREST filter string as is.
+    """
+    if before_id and not before:
+        raise ValueError("before_id requires before")
+    return (
+        datetime.fromisoformat(before) if before else None,
+        uuid.UUID(before_id) if before_id else None
+    )
+
+def keyset_filter(column: str, before: datetime, before_id: uuid.UUID) -> str:
+    """PostgREST or= filter for rows strictly after (before, before_id) in (column, id) descending order"""
+    ts = before.isoformat()
+    return f'{column}.lt."{ts}",and({column}.eq."{ts}",id.lt.{before_id})'
@@ -8,15 +8,22 @@ logger = logging.getLogger(__name__)
 # Constants (Kept for fallback logic if needed, but primary is DB)
 DEFAULT_PORTFOLIO_NAME = "My Portfolio"
 
+import os
 import logging
-import yfinance as yf
-from typing import List, Dict, Any, Tuple
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Tuple, Optional
 from db.client import supabase
+from services import fundamentals_cache
+from services.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_PORTFOLIO_NAME = "My Portfolio"
 
+# Tickers per user, dropped on add/remove so only other writers can make it stale
+PORTFOLIO_CACHE_TTL_SECONDS = int(os.environ.get("PORTFOLIO_CACHE_TTL_SECONDS", "300"))
+_portfolio_cache = TTLCache(maxsize=10000, ttl=PORTFOLIO_CACHE_TTL_SECONDS)
+
 def get_user_portfolio_id(user_id: str) -> str:
     """Get the ID of the portfolio for a specific user. Auto-creates if missing."""
     if not supabase:
@@ -41,15 +48,39 @@ def load_portfolio(user_id: str) -> List[str]:
         logger.error("Supabase not available")
         return []
         
+    cached = _portfolio_cache.get(user_id)
+    if cached is not None:
+        return list(cached)
+
     try:
         pid = get_user_portfolio_id(user_id)
         res = supabase.table("portfolio_items").select("ticker").eq("portfolio_id", pid).execute()
         # Ensure only strings are returned
-        return [str(item['ticker']) for item in res.data if item.get('ticker')]
+        tickers = [str(item['ticker']) for item in res.data if item.get('ticker')]
+        _portfolio_cache.set(user_id, tickers)
+        return list(tickers)
     except Exception as e:
         logger.error(f"Failed to load portfolio for user {user_id}: {e}")
         return []
 
+def load_all_tickers(page_size: int = 1000) -> List[str]:
+    """Distinct tickers held across every user's portfolio"""
+    if not supabase:
+        return []
+
+    tickers = set()
+    try:
+        start = 0
+        while True:
+            res = supabase.table("portfolio_items").select("ticker").range(start, start + page_size - 1).execute()
+            tickers.update(str(item['ticker']).upper() for item in res.data if item.get('ticker'))
+            if len(res.data) < page_size:
+                break
+            start += page_size
+    except Exception as e:
+        logger.error(f"Failed to load portfolio tickers: {e}")
+    return sorted(tickers)
+
 def save_portfolio(tickers: List[str]):
     """Deprecated: DB updates happen individually via add/remove"""
     pass 
@@ -81,21 +112,62 @@ def load_profiles(filter_tickers: List[str] = None) -> Dict[str, Any]:
         logger.error(f"Failed to load profiles: {e}")
         return {}
 
+# Profiles barely change; reuse the company_profiles row while it's younger than this
+PROFILE_MAX_AGE_SECONDS = int(os.environ.get("PROFILE_MAX_AGE_SECONDS", str(7 * 86400)))
+
+def _load_fresh_profile(ticker: str) -> Optional[Dict[str, Any]]:
+    """Return the cached company_profiles row if it's still fresh"""
+    if not supabase:
+        return None
+    try:
+        res = supabase.table("company_profiles").select("*").eq("ticker", ticker).execute()
+        if not res.data or not res.data[0].get('last_updated'):
+            return None
+        row = res.data[0]
+        last_updated = datetime.fromisoformat(row['last_updated'].replace("Z", "+00:00"))
+        if (datetime.now(timezone.utc) - last_updated).total_seconds() > PROFILE_MAX_AGE_SECONDS:
+            return None
+
+        # Let the fundamentals cache reuse this row too
+        fundamentals_cache.seed(ticker, "profile", {
+            "longName": row['name'],
+            "sector": row['sector'],
+            "industry": row['industry'],
+            "longBusinessSummary": row['summary'],
+            "currency": row['currency'],
+            "website": row['website']
+        }, last_updated.timestamp())
+        return row
+    except Exception as e:
+        logger.error(f"Failed to read cached profile for {ticker}: {e}")
+        return None
+
 def fetch_company_profile(ticker: str) -> Dict[str, Any]:
-    """Fetch company details using yfinance and cache to DB"""
+    """Fetch company details, from company_profiles when fresh, else yfinance (cached to DB)"""
+    ticker = ticker.upper()
+    cached = _load_fresh_profile(ticker)
+    if cached:
+        return {
+            "name": cached['name'],
+            "sector": cached['sector'],
+            "industry": cached['industry'],
+            "summary": cached['summary'],
+            "currency": cached['currency'],
+            "website": cached['website']
+        }
+
     try:
         logger.info(f"Fetching profile for {ticker}...")
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = fundamentals_cache.get_info(ticker, groups=("profile",)) or {}
         
         # Extract relevant fields
         profile = {
-            "name": info.get("longName", ticker),
-            "sector": info.get("sector", "Unknown"),
-            "industry": info.get("industry", "Unknown"),
-            "summary": info.get("longBusinessSummary", "No summary available."),
-            "currency": info.get("currency", "USD"),
-            "website": info.get("website", "")
+            "name": info.get("longName") or ticker,
+            "sector": info.get("sector") or "Unknown",
+            "industry": info.get("industry") or "Unknown",
+            "summary": info.get("longBusinessSummary") or "No summary available.",
+            "currency": info.get("currency") or "USD",
+            "website": info.get("website") or ""
         }
         
         # Cache to DB if available
@@ -103,7 +175,8 @@ def fetch_company_profile(ticker: str) -> Dict[str, Any]:
             try:
                 db_row = {
                     "ticker": ticker,
-                    **profile
+                    **profile,
+                    "last_updated": datetime.now(timezone.utc).isoformat()
                 }
                 supabase.table("company_profiles").upsert(db_row).execute()
             except Exception as db_e:
@@ -146,6 +219,7 @@ def add_ticker(ticker: str, user_id: str) -> Tuple[List[str], Dict[str, Any]]:
     except Exception as e:
         logger.error(f"Error adding ticker {ticker}: {e}")
         profile = {}
+    _portfolio_cache.pop(user_id)
         
     # Return updated list AND the profile
     return load_portfolio(user_id), profile
@@ -161,5 +235,6 @@ def remove_ticker(ticker: str, user_id: str) -> List[str]:
         supabase.table("portfolio_items").delete().eq("portfolio_id", pid).eq("ticker", ticker).execute()
     except Exception as e:
         logger.error(f"Error removing ticker {ticker}: {e}")
+    _portfolio_cache.pop(user_id)
         
     return load_portfolio(user_id)
@@ -1,70 +1,182 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 import yfinance as yf
+import pandas as pd
 import logging
+from typing import Dict, List, Optional
+from services.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-def get_quote_data(ticker: str) -> dict:
-    """
-    Get real-time quote for a ticker.
-    Returns dict with price, change, change_percent, currency.
-    Returns None if failed.
-    """
+# Process-wide quote cache. A few seconds is enough to collapse every
+# dashboard polling the same ticker into a single upstream fetch.
+QUOTE_CACHE_TTL_SECONDS = float(os.environ.get("QUOTE_CACHE_TTL_SECONDS", "5"))
+QUOTE_FETCH_TIMEOUT_SECONDS = float(os.environ.get("QUOTE_FETCH_TIMEOUT_SECONDS", "15"))
+_quote_cache = TTLCache(maxsize=5000, ttl=QUOTE_CACHE_TTL_SECONDS)
+# Currency never changes for a listing, keep it for a day
+_currency_cache = TTLCache(maxsize=5000, ttl=86400)
+# Currency lookups missing from the cache run in parallel (one metadata request each)
+_currency_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="quote-currency")
+
+# Request coalescing: tickers currently being fetched -> event set when done
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+def _fetch_currency(ticker: str, stock: Optional[yf.Ticker] = None) -> Optional[str]:
+    """Currency from the listing metadata; None (and nothing cached) when the lookup fails"""
+    try:
+        currency = (stock or yf.Ticker(ticker)).fast_info.get('currency')
+    except Exception as e:
+        logger.warning(f"Failed to fetch currency for {ticker}: {e}")
+        return None
+    if currency:
+        _currency_cache.set(ticker, currency)
+    return currency
+
+def _get_currency(ticker: str, stock: Optional[yf.Ticker] = None) -> str:
+    return _currency_cache.get(ticker) or _fetch_currency(ticker, stock) or 'USD'
+
+def _get_currencies(tickers: List[str]) -> Dict[str, str]:
+    """Currencies for many tickers, fetching the uncached ones concurrently"""
+    currencies = {ticker: _currency_cache.get(ticker) for ticker in tickers}
+    missing = [ticker for ticker, currency in currencies.items() if not currency]
+    if missing:
+        try:
+            for ticker, currency in zip(missing, _currency_pool.map(_fetch_currency, missing, timeout=QUOTE_FETCH_TIMEOUT_SECONDS)):
+                currencies[ticker] = currency
+        except FuturesTimeout:
+            logger.warning(f"Currency lookup timed out for some of {missing}")
+    return {ticker: currency or 'USD' for ticker, currency in currencies.items()}
+
+def _fetch_single_quote(ticker: str) -> Optional[dict]:
+    """Slow path for tickers the bulk download couldn't price"""
     try:
-        ticker = ticker.upper()
         # Ensure yfinance doesn't print to stdout
         stock = yf.Ticker(ticker)
-        
-        # Helper to get value from fast_info safely
-        def get_fast_val(key_attr, key_dict=None):
-            val = None
-            try:
-                val = getattr(stock.fast_info, key_attr, None)
-            except:
-                pass
-            if val is None and key_dict:
-                val = stock.fast_info.get(key_dict)
-            return val
-
-        # 1. Get Price
-        price = get_fast_val('last_price', 'last_price')
-        
-        # Fallback to regular info
-        if not price:
+        fast_info = stock.fast_info
+
+        price = fast_info.get('last_price')
+        prev_close = fast_info.get('previous_close')
+
+        # Fallback to regular info (slow), fetched at most once
+        if not price or not prev_close:
             try:
                 info = stock.info
-                price = info.get('currentPrice') or info.get('regularMarketPrice')
-            except: 
+                price = price or info.get('currentPrice') or info.get('regularMarketPrice')
+                prev_close = prev_close or info.get('regularMarketPreviousClose') or info.get('previousClose')
+            except:
                 pass
 
         if not price:
-             return None
-
-        change = 0.0
-        change_percent = 0.0
-        
-        # 2. Get Previous Close
-        prev_close = get_fast_val('previous_close', 'previous_close')
-        if not prev_close:
-             prev_close = get_fast_val('previousClose', 'previousClose')
-        
-        if not prev_close:
-             try:
-                info = stock.info
-                prev_close = info.get('regularMarketPreviousClose') or info.get('previousClose')
-             except:
-                pass
+            return None
 
-        if prev_close:
-            change = price - prev_close
-            change_percent = (change / prev_close) * 100
-
-        return {
-            "ticker": ticker,
-            "price": price,
-            "change": change,
-            "change_percent": change_percent,
-            "currency": stock.fast_info.get('currency', 'USD')
-        }
+        return _build_quote(ticker, price, prev_close, _get_currency(ticker, stock))
     except Exception as e:
         logger.error(f"Error fetching quote for {ticker}: {e}")
         return None
+
+def _build_quote(ticker: str, price: float, prev_close: Optional[float], currency: str) -> dict:
+    change = 0.0
+    change_percent = 0.0
+    if prev_close:
+        change = price - prev_close
+        change_percent = (change / prev_close) * 100
+
+    return {
+        "ticker": ticker,
+        "price": float(price),
+        "change": float(change),
+        "change_percent": float(change_percent),
+        "currency": currency
+    }
+
+def _download_quotes(tickers: List[str]) -> Dict[str, dict]:
+    """Price many tickers with one bulk yfinance download of recent daily bars"""
+    quotes = {}
+    prices = {}
+    try:
+        data = yf.download(
+            tickers,
+            period="5d",
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            progress=False,
+            threads=True
+        )
+        for ticker in tickers:
+            try:
+                frame = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+                closes = frame['Close'].dropna()
+                if closes.empty:
+                    continue
+                prev_close = closes.iloc[-2] if len(closes) > 1 else None
+                prices[ticker] = (closes.iloc[-1], prev_close)
+            except KeyError:
+                continue
+    except Exception as e:
+        logger.error(f"Bulk quote download failed for {tickers}: {e}")
+
+    # The bulk download carries no currency; look up the uncached ones together
+    currencies = _get_currencies(list(prices))
+    for ticker, (price, prev_close) in prices.items():
+        quotes[ticker] = _build_quote(ticker, price, prev_close, currencies[ticker])
+
+    for ticker in tickers:
+        if ticker not in quotes:
+            quote = _fetch_single_quote(ticker)
+            if quote:
+                quotes[ticker] = quote
+    return quotes
+
+def get_quotes(tickers: List[str]) -> Dict[str, dict]:
+    """
+    Get quotes for many tickers, keyed by ticker.
+    Cached quotes are served directly, tickers already being fetched by another
+    request are awaited, and the rest go upstream in a single bulk download.
+    Tickers that couldn't be priced are left out.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    results = {}
+    to_fetch = []
+    to_wait = []
+
+    with _inflight_lock:
+        for ticker in tickers:
+            cached = _quote_cache.get(ticker)
+            if cached:
+                results[ticker] = cached
+            elif ticker in _inflight:
+                to_wait.append((ticker, _inflight[ticker]))
+            else:
+                _inflight[ticker] = threading.Event()
+                to_fetch.append(ticker)
+
+    if to_fetch:
+        try:
+            fetched = _download_quotes(to_fetch)
+            for ticker, quote in fetched.items():
+                _quote_cache.set(ticker, quote)
+            results.update(fetched)
+        finally:
+            with _inflight_lock:
+                for ticker in to_fetch:
+                    _inflight.pop(ticker).set()
+
+    for ticker, done in to_wait:
+        done.wait(timeout=QUOTE_FETCH_TIMEOUT_SECONDS)
+        cached = _quote_cache.get(ticker)
+        if cached:
+            results[ticker] = cached
+
+    return results
+
+def get_quote_data(ticker: str) -> dict:
+    """
+    Get real-time quote for a ticker.
+    Returns dict with price, change, change_percent, currency.
+    Returns None if failed.
+    """
+    ticker = ticker.upper()
+    return get_quotes([ticker]).get(ticker)
@@ -1,20 +1,19 @@
+import asyncio
+import hashlib
 import feedparser
+import httpx
 import logging
-from typing import List, Dict, Any
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import time
+from services.executor import run_blocking
+from services.feed_registry import Feed, registry
 
 logger = logging.getLogger(__name__)
 
-# Selected High-Quality/Fast Financial RSS Feeds
-RSS_FEEDS = {
-    # Yahoo Latest Market News (often faster than generic 'rssindex')
-    "Yahoo Finance": "https://finance.yahoo.com/news/rssindex", 
-    # CNBC Market News (Breaking)
-    "CNBC Markets": "https://search.cnbc.com/rs/search/combinedcms/view.xml?partnerId=wrss01&id=10000664",
-    # Investing.com Latest
-    "Investing.com": "https://www.investing.com/rss/news.rss"
-}
+# Feeds, their poll intervals and per-feed item caps live in the registry (data/feeds.json)
 
 def parse_date_safely(entry):
     """Attempt to parse published date from RSS entry, return datetime obj"""
@@ -25,43 +24,182 @@ def parse_date_safely(entry):
         pass
     return datetime.now()
 
+FEED_TIMEOUT_SECONDS = 10
+# Parsed entries kept per feed, and GUIDs remembered per feed
+FEED_CACHE_MAX_ENTRIES = 50
+SEEN_GUIDS_MAX = 1000
+
+def _standardize(source_name: str, entry, dt: datetime) -> Dict[str, Any]:
+    return {
+        "title": entry.get('title', 'No Title'),
+        "link": entry.get('link', ''),
+        "summary": entry.get('summary', '') or entry.get('description', ''),
+        "published": dt.isoformat(),
+        "source": source_name
+    }
+
+def _extract_items(source_name: str, feed, cutoff_time: float, max_items: int) -> List[Dict[str, Any]]:
+    """Standardize the fresh entries of a parsed feed"""
+    items = []
+    for entry in feed.entries:
+        if len(items) >= max_items: break
+
+        # Check Age
+        dt = parse_date_safely(entry)
+        if dt.timestamp() < cutoff_time:
+            logger.debug(f"Skipping old news: {entry.get('title')} ({dt})")
+            continue
+        
+        items.append(_standardize(source_name, entry, dt))
+    return items
+
 def fetch_rss_news() -> List[Dict[str, Any]]:
     """Fetch and aggregate news from defined RSS feeds, filtering out old news"""
     news_items = []
     # 48 Hour Cutoff
     cutoff_time = datetime.now().timestamp() - (48 * 3600)
     
-    for source_name, url in RSS_FEEDS.items():
+    # General feeds only, per-ticker feeds are left to the scheduler
+    for source in registry.feeds():
+        if source.ticker:
+            continue
         try:
-            logger.info(f"Fetching RSS feed: {source_name}")
-            feed = feedparser.parse(url)
-            
-            # Take top 10 from each to scan enough candidates
-            count = 0
-            for entry in feed.entries:
-                if count >= 5: break
-
-                # Check Age
-                dt = parse_date_safely(entry)
-                if dt.timestamp() < cutoff_time:
-                    logger.debug(f"Skipping old news: {entry.get('title')} ({dt})")
-                    continue
-                
-                # Standardize
-                item = {
-                    "title": entry.get('title', 'No Title'),
-                    "link": entry.get('link', ''),
-                    "summary": entry.get('summary', '') or entry.get('description', ''),
-                    "published": dt.isoformat(),
-                    "source": source_name
-                }
-                news_items.append(item)
-                count += 1
-                
+            logger.info(f"Fetching RSS feed: {source.name}")
+            feed = feedparser.parse(source.url)
+            news_items.extend(_extract_items(source.name, feed, cutoff_time, source.max_items))
         except Exception as e:
-            logger.error(f"Error fetching RSS {source_name}: {e}")
+            logger.error(f"Error fetching RSS {source.name}: {e}")
             
     # Sort by published date (newest first)
     news_items.sort(key=lambda x: x['published'], reverse=True)
     
     return news_items
+
+@dataclass
+class FeedState:
+    """What we know about a feed between polls"""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    # Standardized entries, newest first
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    seen_guids: "OrderedDict[str, None]" = field(default_factory=OrderedDict)
+    counters: Dict[str, int] = field(default_factory=lambda: {"not_modified": 0, "unchanged": 0, "parsed": 0, "errors": 0})
+
+_feed_states: Dict[str, FeedState] = {}
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_client() -> httpx.AsyncClient:
+    """Shared client so connections (and TLS sessions) are reused across polls"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=FEED_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            headers={"User-Agent": "FinMate/1.0 (+RSS reader)"}
+        )
+        _client_loop = loop
+    return _client
+
+async def close_client():
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client, _client_loop = None, None
+
+def feed_stats() -> Dict[str, Dict[str, int]]:
+    """Per-feed counts of 304s, unchanged bodies, parses and errors"""
+    return {url: dict(state.counters) for url, state in _feed_states.items()}
+
+def _merge_entries(state: FeedState, source_name: str, feed) -> int:
+    """Standardize entries with unseen GUIDs and add them to the feed cache"""
+    new_items = []
+    for entry in feed.entries:
+        guid = entry.get('id') or entry.get('link')
+        if not guid or guid in state.seen_guids:
+            continue
+        state.seen_guids[guid] = None
+        new_items.append(_standardize(source_name, entry, parse_date_safely(entry)))
+
+    while len(state.seen_guids) > SEEN_GUIDS_MAX:
+        state.seen_guids.popitem(last=False)
+    if new_items:
+        state.entries = sorted(new_items + state.entries, key=lambda x: x['published'], reverse=True)[:FEED_CACHE_MAX_ENTRIES]
+    return len(new_items)
+
+def _fresh_entries(state: FeedState, cutoff_time: float, max_items: int) -> List[Dict[str, Any]]:
+    cutoff = datetime.fromtimestamp(cutoff_time).isoformat()
+    return [item for item in state.entries if item['published'] >= cutoff][:max_items]
+
+async def _fetch_feed_async(client: httpx.AsyncClient, source: Feed, cutoff_time: float) -> List[Dict[str, Any]]:
+    """
+    Conditional GET of one feed. A 304, or a 200 with the same body as last
+    time, is served from the feed cache without parsing. The outcome is
+    reported to the registry for backoff and health.
+    """
+    source_name, url = source.name, source.url
+    state = _feed_states.setdefault(url, FeedState())
+    headers = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+
+    start = time.perf_counter()
+    try:
+        logger.info(f"Fetching RSS feed: {source_name}")
+        # Overall deadline for the feed, httpx timeouts only bound each phase
+        response = await asyncio.wait_for(client.get(url, headers=headers), timeout=FEED_TIMEOUT_SECONDS)
+
+        if response.status_code == 304:
+            state.counters["not_modified"] += 1
+            registry.record_success(source, time.perf_counter() - start)
+            return _fresh_entries(state, cutoff_time, source.max_items)
+        response.raise_for_status()
+
+        state.etag = response.headers.get("ETag")
+        state.last_modified = response.headers.get("Last-Modified")
+        content_hash = hashlib.sha1(response.content).hexdigest()
+        if content_hash == state.content_hash:
+            # Server ignores conditional requests but nothing changed
+            state.counters["unchanged"] += 1
+            registry.record_success(source, time.perf_counter() - start)
+            return _fresh_entries(state, cutoff_time, source.max_items)
+
+        # Parsing is CPU work, keep it off the event loop
+        feed = await run_blocking(feedparser.parse, response.content)
+        state.content_hash = content_hash
+        state.counters["parsed"] += 1
+        added = _merge_entries(state, source_name, feed)
+        logger.info(f"RSS feed {source_name}: {added} new entries")
+        registry.record_success(source, time.perf_counter() - start)
+        return _fresh_entries(state, cutoff_time, source.max_items)
+    except Exception as e:
+        state.counters["errors"] += 1
+        logger.error(f"Error fetching RSS {source_name}: {e!r}")
+        registry.record_failure(source, repr(e), time.perf_counter() - start)
+        # Serve what we had rather than nothing
+        return _fresh_entries(state, cutoff_time, source.max_items)
+
+async def fetch_rss_news_async(feeds: Optional[List[Feed]] = None) -> List[Dict[str, Any]]:
+    """
+    Async variant of fetch_rss_news: the given feeds (by default the ones the
+    registry says are due) are polled concurrently over a pooled client.
+    """
+    cutoff_time = datetime.now().timestamp() - (48 * 3600)
+    if feeds is None:
+        feeds = registry.due()
+    if not feeds:
+        return []
+
+    client = _get_client()
+    results = await asyncio.gather(*(
+        _fetch_feed_async(client, source, cutoff_time) for source in feeds
+    ))
+
+    news_items = [item for items in results for item in items]
+    news_items.sort(key=lambda x: x['published'], reverse=True)
+    return news_items
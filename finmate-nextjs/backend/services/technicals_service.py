@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import logging
+from typing import Dict, List, Optional
+from services import history_store
+
+logger = logging.getLogger(__name__)
+
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_STD = 2
+LOOKBACK_BARS = 126  # ~6 months of sessions
+
+def _pack(frame: pd.DataFrame, order: np.ndarray) -> pd.DataFrame:
+    """Reorder each column's rows by `order` (sessions indexed by position, not date)"""
+    return pd.DataFrame(np.take_along_axis(frame.to_numpy(dtype=float), order, axis=0), columns=frame.columns)
+
+def _unpack(packed: pd.DataFrame, order: np.ndarray, valid: np.ndarray, like: pd.DataFrame) -> pd.DataFrame:
+    values = np.empty(packed.shape)
+    np.put_along_axis(values, order, packed.to_numpy(dtype=float), axis=0)
+    values[~valid] = np.nan
+    return pd.DataFrame(values, index=like.index, columns=like.columns)
+
+def compute_indicators(close: pd.DataFrame, high: pd.DataFrame, low: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Compute indicators column-wise over wide frames (one column per ticker).
+    Every output frame has the same shape as the inputs.
+
+    The frames' index is the union of all tickers' dates, so a ticker has
+    gaps on days only others traded (crypto weekends, foreign holidays).
+    Each column's own sessions are packed together first so windows run
+    over that ticker's sessions only, then put back on their dates.
+    """
+    valid = close.notna().to_numpy()
+    # Stable sort puts missing rows first and keeps each column's sessions in date order
+    order = np.argsort(valid, axis=0, kind="stable")
+    valid_packed = np.take_along_axis(valid, order, axis=0)
+    packed = _compute_packed(_pack(close, order), _pack(high, order), _pack(low, order))
+    return {name: _unpack(frame.where(valid_packed), order, valid, close) for name, frame in packed.items()}
+
+def _compute_packed(close: pd.DataFrame, high: pd.DataFrame, low: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    indicators = {}
+
+    indicators["sma_20"] = close.rolling(window=20).mean()
+    indicators["sma_50"] = close.rolling(window=50).mean()
+    indicators["ema_12"] = close.ewm(span=12, adjust=False).mean()
+    indicators["ema_26"] = close.ewm(span=26, adjust=False).mean()
+
+    # Wilder's RSI: smoothed average gain/loss with alpha = 1/period
+    delta = close.diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / RSI_PERIOD, adjust=False, min_periods=RSI_PERIOD).mean()
+    avg_loss = (-delta.clip(upper=0)).ewm(alpha=1 / RSI_PERIOD, adjust=False, min_periods=RSI_PERIOD).mean()
+    rs = avg_gain / avg_loss.replace(0, np.nan)
+    indicators["rsi_14"] = (100 - 100 / (1 + rs)).where(avg_loss != 0, 100.0)
+
+    # MACD (12, 26, 9)
+    macd = indicators["ema_12"] - indicators["ema_26"]
+    indicators["macd"] = macd
+    indicators["macd_signal"] = macd.ewm(span=9, adjust=False).mean()
+    indicators["macd_hist"] = macd - indicators["macd_signal"]
+
+    # Bollinger Bands (20, 2)
+    mid = close.rolling(window=BOLLINGER_WINDOW).mean()
+    std = close.rolling(window=BOLLINGER_WINDOW).std()
+    indicators["bb_upper"] = mid + BOLLINGER_STD * std
+    indicators["bb_lower"] = mid - BOLLINGER_STD * std
+
+    # ATR with Wilder smoothing over the true range
+    prev_close = close.shift(1)
+    true_range = np.maximum(high - low, np.maximum((high - prev_close).abs(), (low - prev_close).abs()))
+    indicators["atr_14"] = true_range.ewm(alpha=1 / ATR_PERIOD, adjust=False, min_periods=ATR_PERIOD).mean()
+
+    return indicators
+
+def _clean(value) -> Optional[float]:
+    if value is None or pd.isna(value):
+        return None
+    return round(float(value), 2)
+
+def _signal(rsi: Optional[float]) -> str:
+    if rsi is None:
+        return "Neutral"
+    return "Overbought" if rsi > 70 else "Oversold" if rsi < 30 else "Neutral"
+
+def summarize(close: pd.DataFrame, indicators: Dict[str, pd.DataFrame], include_series: bool = False) -> Dict[str, dict]:
+    """Pick the latest values (and optionally full series) per ticker"""
+    results = {}
+    for ticker in close.columns:
+        last_idx = close[ticker].last_valid_index()
+        if last_idx is None:
+            continue
+
+        latest = {name: _clean(frame.at[last_idx, ticker]) for name, frame in indicators.items()}
+        entry = {
+            "ticker": ticker,
+            "as_of": last_idx.strftime("%Y-%m-%d"),
+            "current_price": _clean(close.at[last_idx, ticker]),
+            **latest,
+            "signal": _signal(latest["rsi_14"])
+        }
+
+        if include_series:
+            valid = close[ticker].notna()
+            entry["series"] = {
+                "dates": [d.strftime("%Y-%m-%d") for d in close.index[valid]],
+                "close": [_clean(v) for v in close[ticker][valid]],
+                **{name: [_clean(v) for v in frame[ticker][valid]] for name, frame in indicators.items()}
+            }
+
+        results[ticker] = entry
+    return results
+
+def get_technicals(tickers: List[str], include_series: bool = False) -> Dict[str, dict]:
+    """
+    Technical indicators for many tickers, read from the local history store
+    (which fetches at most one small delta upstream).
+    Returns a dict keyed by ticker; tickers without data are left out.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    if not tickers:
+        return {}
+
+    try:
+        frames = history_store.get_frames(tickers, lookback=LOOKBACK_BARS)
+        if frames["close"].empty:
+            return {}
+        indicators = compute_indicators(frames["close"], frames["high"], frames["low"])
+        return summarize(frames["close"], indicators, include_series)
+    except Exception as e:
+        logger.error(f"Error calculating technicals for {tickers}: {e}")
+        return {}
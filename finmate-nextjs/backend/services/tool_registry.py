@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Own pool: chat_with_data already runs on the I/O pool, waiting on that same
+# pool for its tools could deadlock it under load
+TOOL_POOL_SIZE = int(os.environ.get("TOOL_THREAD_POOL_SIZE", "16"))
+TOOLS_DEADLINE_SECONDS = float(os.environ.get("CHAT_TOOLS_DEADLINE_SECONDS", "25"))
+TOOL_CACHE_SIZE = int(os.environ.get("TOOL_CACHE_SIZE", "5000"))
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+class ToolError(Exception):
+    """Raised by a tool that couldn't produce a result; the message is shown to the agent and never cached"""
+
+def _normalize(name: str, value: Any) -> Any:
+    """Canonical form of an argument so equivalent calls share a cache entry"""
+    if isinstance(value, str):
+        value = re.sub(r"\s+", " ", value.strip())
+        return value.upper() if name in ("ticker", "tickers") else value.lower()
+    if isinstance(value, list):
+        items = [_normalize(name, v) for v in value]
+        # Ticker lists are sets as far as the result is concerned
+        return sorted(set(items)) if name == "tickers" else items
+    return value
+
+def cache_key(tool_name: str, args: Dict[str, Any]) -> str:
+    normalized = {k: _normalize(k, v) for k, v in args.items()}
+    return f"{tool_name}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+@dataclass
+class Tool:
+    """A function the chat agent can call, with its execution policy"""
+    name: str
+    description: str
+    parameters: Dict[str, Any]
+    fn: Callable[..., str]
+    max_concurrency: int = 4      # Simultaneous calls across all users
+    timeout: float = 15.0         # Seconds before the agent gets a timeout message instead
+    cache_ttl: Optional[float] = None  # Seconds to reuse a result for the same args (None = never)
+    _limit: threading.BoundedSemaphore = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._limit = threading.BoundedSemaphore(self.max_concurrency)
+
+    def schema(self) -> Dict[str, Any]:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters
+            }
+        }
+
+class ToolRegistry:
+    """
+    Tools by name, executed concurrently on a dedicated pool.
+    Results of tools with a cache_ttl are memoized on (tool name, normalized
+    args), shared across conversations and users.
+    """
+
+    def __init__(self, pool_size: int = TOOL_POOL_SIZE):
+        self._tools: Dict[str, Tool] = {}
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="finmate-tools")
+        self._results = TTLCache(maxsize=TOOL_CACHE_SIZE)
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._counters_lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def register(self, tool: Tool) -> Tool:
+        self._tools[tool.name] = tool
+        self._counters[tool.name] = {"hits": 0, "misses": 0}
+        return tool
+
+    def _count(self, name: str, outcome: str):
+        with self._counters_lock:
+            self._counters[name][outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tool cache hit/miss counters"""
+        with self._counters_lock:
+            per_tool = {name: dict(counts) for name, counts in self._counters.items()}
+        return {"tools": per_tool, "cache_size": len(self._results)}
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        """OpenAI `tools` payload"""
+        return [tool.schema() for tool in self._tools.values()]
+
+    def call(self, name: str, args: Dict[str, Any]) -> str:
+        """Run one tool in the calling thread, honouring its concurrency limit"""
+        tool = self._tools.get(name)
+        if not tool:
+            return "Unknown tool"
+
+        key = None
+        if tool.cache_ttl:
+            key = cache_key(name, args)
+            cached = self._results.get(key)
+            if cached is not None:
+                self._count(name, "hits")
+                return cached
+            self._count(name, "misses")
+
+        logger.info(f"Agent calling tool: {name} with {args}")
+        with tool._limit:
+            try:
+                result = tool.fn(**args)
+            except ToolError as e:
+                # Failures are not cached
+                logger.warning(f"Tool {name} returned no result: {e}")
+                return str(e)
+            except Exception as e:
+                logger.error(f"Tool {name} failed: {e}")
+                return f"Tool {name} failed: {str(e)}"
+
+        if key:
+            self._results.set(key, result, ttl=tool.cache_ttl)
+        return result
+
+    def _timeout_for(self, name: str, started: float, deadline: float) -> float:
+        tool = self._tools.get(name)
+        tool_deadline = started + (tool.timeout if tool else 0)
+        return max(0.0, min(tool_deadline, deadline) - time.monotonic())
+
+    def execute_many(self, calls: List[ToolCall], deadline_seconds: float = TOOLS_DEADLINE_SECONDS) -> List[str]:
+        """
+        Run the tool calls of one model turn concurrently.
+        Results come back in the order of `calls`; a call that exceeds its own
+        timeout or the global deadline yields a timeout message.
+        """
+        started = time.monotonic()
+        deadline = started + deadline_seconds
+        futures = [self._pool.submit(self.call, name, args) for name, args in calls]
+
+        results = []
+        for (name, _), future in zip(calls, futures):
+            try:
+                results.append(future.result(timeout=self._timeout_for(name, started, deadline)))
+            except FuturesTimeout:
+                logger.warning(f"Tool {name} timed out")
+                results.append(f"Tool {name} timed out")
+        return results
+
+    async def execute_many_async(self, calls: List[ToolCall], deadline_seconds: float = TOOLS_DEADLINE_SECONDS) -> List[str]:
+        """Async variant of execute_many"""
+        started = time.monotonic()
+        deadline = started + deadline_seconds
+
+        async def run(name: str, args: Dict[str, Any]) -> str:
+            future = asyncio.wrap_future(self._pool.submit(self.call, name, args))
+            try:
+                return await asyncio.wait_for(future, timeout=self._timeout_for(name, started, deadline))
+            except asyncio.TimeoutError:
+                logger.warning(f"Tool {name} timed out")
+                return f"Tool {name} timed out"
+
+        return list(await asyncio.gather(*(run(name, args) for name, args in calls)))
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# The backend imports its packages top-level (`from services import ...`)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# llm_service builds its client at import time; no requests are made in tests
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from services import llm_service
+from services.news_pipeline import AnalysisBatcher, StageTimer
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Batched analysis stand-in recording the links of each request"""
+    sent = []
+
+    async def analyze_news_batch_async(news_items, portfolio, search_contexts):
+        sent.append([item["link"] for item in news_items])
+        await asyncio.sleep(0.01)
+        if any(item["link"] == "boom" for item in news_items):
+            raise RuntimeError("LLM unavailable")
+        return [{"headline": item["link"], "context": ctx} for item, ctx in zip(news_items, search_contexts)]
+    monkeypatch.setattr(llm_service, "analyze_news_batch_async", analyze_news_batch_async)
+    return sent
+
+def make_batcher(size, expected):
+    return AnalysisBatcher([], size, expected, {"analyze": asyncio.Semaphore(4)}, StageTimer())
+
+def test_items_are_sent_in_full_batches_then_the_rest(batches):
+    async def run():
+        batcher = make_batcher(size=2, expected=5)
+        return await asyncio.gather(*(batcher.analyze({"link": str(n)}, f"ctx {n}") for n in range(5)))
+    results = asyncio.run(run())
+
+    assert batches == [["0", "1"], ["2", "3"], ["4"]]
+    # Each caller gets its own article's analysis
+    assert [r["headline"] for r in results] == ["0", "1", "2", "3", "4"]
+    assert [r["context"] for r in results] == [f"ctx {n}" for n in range(5)]
+
+def test_skipped_items_do_not_hold_back_a_partial_batch(batches):
+    async def run():
+        batcher = make_batcher(size=4, expected=3)
+        first = asyncio.ensure_future(batcher.analyze({"link": "a"}, ""))
+        second = asyncio.ensure_future(batcher.analyze({"link": "b"}, ""))
+        await asyncio.sleep(0.05)
+        assert batches == []  # Still waiting for the third item
+        batcher.skip()
+        return await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+    results = asyncio.run(run())
+
+    assert batches == [["a", "b"]]
+    assert [r["headline"] for r in results] == ["a", "b"]
+
+def test_failed_batch_fails_only_its_own_items(batches):
+    async def run():
+        batcher = make_batcher(size=2, expected=4)
+        return await asyncio.gather(
+            *(batcher.analyze({"link": link}, "") for link in ("ok-1", "ok-2", "boom", "ok-3")),
+            return_exceptions=True
+        )
+    results = asyncio.run(run())
+
+    assert [r["headline"] for r in results[:2]] == ["ok-1", "ok-2"]
+    assert all(isinstance(r, RuntimeError) for r in results[2:])
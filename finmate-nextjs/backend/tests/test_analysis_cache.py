@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from models import NewsItem
+from services import analysis_cache, llm_service, news_pipeline
+from services.cache import TTLCache
+
+def news_item(n):
+    return NewsItem(
+        id=str(n), headline=f"Story {n}", summary="", sentiment_score=50, category="General",
+        affected_tickers=[], impact="neutral", impact_reason="Shared analysis", risk_level="low",
+        link=f"https://example.com/{n}"
+    )
+
+@pytest.fixture
+def impact_calls(monkeypatch):
+    """Impact step stand-in; articles whose headline ends in 'fail' get the failure result"""
+    calls = []
+
+    async def assess_impact_async(news, portfolio):
+        calls.append((news["link"], tuple(portfolio)))
+        if news["headline"].endswith("fail"):
+            return {"affected_tickers": [], "impact": "neutral", "risk_level": "medium",
+                    "impact_reason": llm_service.ANALYSIS_FAILED_REASON}
+        return {"affected_tickers": list(portfolio), "impact": "positive", "risk_level": "low",
+                "impact_reason": f"Good for {','.join(portfolio)}"}
+    monkeypatch.setattr(llm_service, "assess_impact_async", assess_impact_async)
+    monkeypatch.setattr(analysis_cache, "supabase", None)
+    monkeypatch.setattr(analysis_cache, "_memory", TTLCache(maxsize=100, ttl=60))
+    return calls
+
+def personalize(items, portfolio):
+    return asyncio.run(news_pipeline.personalize(items, portfolio))
+
+def test_portfolio_key_ignores_order_case_and_duplicates():
+    assert analysis_cache.portfolio_key(["msft", "AAPL "]) == analysis_cache.portfolio_key(["AAPL", "MSFT", "aapl"])
+    assert analysis_cache.portfolio_key(["AAPL"]) != analysis_cache.portfolio_key(["AAPL", "MSFT"])
+    assert analysis_cache.portfolio_key(["", " "]) == analysis_cache.GLOBAL_KEY
+
+def test_impact_entries_are_kept_apart_from_full_analyses():
+    portfolio = ["AAPL"]
+    assert analysis_cache.impact_key(portfolio) != analysis_cache.portfolio_key(portfolio)
+
+def test_personalize_overlays_impact_only(impact_calls):
+    [item] = personalize([news_item(1)], ["AAPL"])
+
+    assert item.affected_tickers == ["AAPL"]
+    assert item.impact == "positive"
+    assert item.impact_reason == "Good for AAPL"
+    # The shared fields are untouched
+    assert item.headline == "Story 1"
+
+def test_impact_is_cached_per_article_and_portfolio(impact_calls):
+    items = [news_item(1), news_item(2)]
+    personalize(items, ["AAPL", "MSFT"])
+    personalize(items, ["msft", "aapl"])
+    personalize(items[:1], ["TSLA"])
+
+    assert len(impact_calls) == 3
+
+def test_failed_impact_is_not_cached(impact_calls):
+    item = news_item(1).model_copy(update={"headline": "Story fail"})
+    personalize([item], ["AAPL"])
+    personalize([item], ["AAPL"])
+
+    assert len(impact_calls) == 2
@@ -0,0 +1,66 @@
+import threading
+
+from services.cache import TTLCache
+
+def test_get_returns_value_until_it_expires():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("fresh", 1)
+    cache.set("expired", 2, ttl=0)
+
+    assert cache.get("fresh") == 1
+    assert cache.get("expired") is None
+    assert "expired" not in cache
+    # Expired entries are dropped when read
+    assert len(cache) == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+def test_set_replaces_value_and_ttl():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", 1)
+    cache.set("key", 2, ttl=0)
+
+    assert cache.get("key", "default") == "default"
+
+def test_pop_and_clear():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+    cache.clear()
+    assert len(cache) == 0
+
+def test_stats_count_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 1}
+
+def test_concurrent_writers_respect_maxsize():
+    cache = TTLCache(maxsize=50, ttl=60)
+
+    def write(offset):
+        for n in range(500):
+            cache.set(offset + n, n)
+            cache.get(offset + n // 2)
+    threads = [threading.Thread(target=write, args=(t * 1000,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache) == 50
@@ -0,0 +1,122 @@
+"""
+Conversation ownership through the chat endpoints, with chat_service's
+database calls replaced by an in-memory stand-in.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import chat
+from dependencies import get_current_user
+from services import chat_service, llm_service, portfolio_service
+from services.cache import TTLCache
+from services.conversation_memory import memory_store
+
+OWNER, OTHER = "owner", "intruder"
+CONVERSATION = "6f1c2b1e-0000-4000-8000-000000000001"
+EMPTY_CONVERSATION = "6f1c2b1e-0000-4000-8000-000000000002"
+
+class FakeChatDB:
+    def __init__(self):
+        self.owners = {CONVERSATION: OWNER, EMPTY_CONVERSATION: OWNER}
+        self.messages = {
+            CONVERSATION: [
+                {"id": "m1", "conversation_id": CONVERSATION, "role": "user", "content": "Hi"},
+                {"id": "m2", "conversation_id": CONVERSATION, "role": "assistant", "content": "Hello"},
+            ],
+            EMPTY_CONVERSATION: [],
+        }
+        self.message_reads = []
+        self.saved = []
+        self.conversation_pages = []
+
+    def get_messages(self, conversation_id, user_id=None, limit=100, before=None, before_id=None):
+        self.message_reads.append((conversation_id, user_id))
+        if user_id and self.owners.get(conversation_id) != user_id:
+            return []
+        return self.messages.get(conversation_id, [])[-limit:]
+
+    def owns_conversation(self, user_id, conversation_id):
+        return self.owners.get(conversation_id) == user_id
+
+    def save_turn(self, conversation_id, user_id, messages, title=None):
+        if title is not None:
+            self.owners[conversation_id] = user_id
+        elif self.owners.get(conversation_id) != user_id:
+            return False
+        self.saved.append((conversation_id, user_id, [m["content"] for m in messages], title))
+        return True
+
+    def get_conversations(self, user_id, limit=50, before=None, before_id=None):
+        self.conversation_pages.append((user_id, limit, before, before_id))
+        return []
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeChatDB()
+    for name in ("get_messages", "owns_conversation", "save_turn", "get_conversations"):
+        monkeypatch.setattr(chat_service.chat_service, name, getattr(fake, name))
+    monkeypatch.setattr(memory_store, "_memories", TTLCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(portfolio_service, "load_portfolio", lambda user_id: [])
+    monkeypatch.setattr(llm_service, "chat_with_data", lambda query, context, history: f"answer to {query}")
+    return fake
+
+@pytest.fixture
+def user():
+    return {"id": OWNER}
+
+@pytest.fixture
+def client(db, user):
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_current_user] = lambda: user["id"]
+    return TestClient(app)
+
+def test_owner_reads_messages(client):
+    response = client.get(f"/api/chat/{CONVERSATION}/messages")
+
+    assert response.status_code == 200
+    assert [m["content"] for m in response.json()] == ["Hi", "Hello"]
+
+def test_owner_reads_empty_conversation(client):
+    response = client.get(f"/api/chat/{EMPTY_CONVERSATION}/messages")
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_other_user_cannot_read_messages(client, user):
+    user["id"] = OTHER
+    assert client.get(f"/api/chat/{CONVERSATION}/messages").status_code == 404
+
+def test_other_user_cannot_continue_conversation(client, db, user):
+    user["id"] = OTHER
+    response = client.post("/api/chat", json={"query": "What did they ask?", "conversation_id": CONVERSATION})
+
+    assert response.status_code == 404
+    assert db.saved == []
+
+def test_owner_memory_is_not_shared_with_other_user(client, db, user):
+    assert client.post("/api/chat", json={"query": "Next", "conversation_id": CONVERSATION}).status_code == 200
+
+    # The owner's conversation is in memory now; another user still can't reach it
+    user["id"] = OTHER
+    assert client.post("/api/chat", json={"query": "Leak?", "conversation_id": CONVERSATION}).status_code == 404
+    assert db.saved == [(CONVERSATION, OWNER, ["Next", "answer to Next"], None)]
+
+def test_history_is_loaded_once_per_conversation(client, db):
+    for query in ("First", "Second"):
+        assert client.post("/api/chat", json={"query": query, "conversation_id": CONVERSATION}).status_code == 200
+
+    assert db.message_reads == [(CONVERSATION, OWNER)]
+    memory = memory_store.get(CONVERSATION, OWNER, load=False)
+    assert [turn["content"] for turn in memory.window()] == [
+        "Hi", "Hello", "First", "answer to First", "Second", "answer to Second"
+    ]
+
+def test_new_conversation_is_created_with_the_turn(client, db):
+    response = client.post("/api/chat", json={"query": "Start a new chat"})
+
+    conversation_id = response.json()["conversation_id"]
+    assert db.saved == [(conversation_id, OWNER, ["Start a new chat", "answer to Start a new chat"], "Start a new chat...")]
+    # Nothing was read: a new conversation has no history
+    assert db.message_reads == []
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from services import conversation_memory, llm_service
+from services.cache import TTLCache
+from services.conversation_memory import ConversationMemory, memory_store
+
+def turns(count, words=20):
+    return [
+        {"role": "user" if n % 2 == 0 else "assistant", "content": f"turn {n} " + "word " * words}
+        for n in range(count)
+    ]
+
+@pytest.fixture
+def summaries(monkeypatch):
+    """Summarizer stand-in recording how many turns it was given each time"""
+    calls = []
+
+    async def summarize_conversation_async(summary, overflow, max_words):
+        calls.append(len(overflow))
+        return f"{summary}+{len(overflow)}"
+    monkeypatch.setattr(llm_service, "summarize_conversation_async", summarize_conversation_async)
+    monkeypatch.setattr(memory_store, "_memories", TTLCache(maxsize=10, ttl=60))
+    return calls
+
+def test_window_keeps_newest_turns_within_budget():
+    memory = ConversationMemory(turns(10))
+    budget = 3 * conversation_memory.count_tokens(turns(1)[0]["content"])
+
+    window = memory.window(budget)
+
+    assert [m["content"].split()[1] for m in window] == ["7", "8", "9"]
+    assert len(memory.overflow(budget)) == 7
+
+def test_summary_leads_the_window():
+    memory = ConversationMemory(turns(2))
+    memory.summary = "Earlier: asked about AAPL"
+
+    window = memory.window()
+
+    assert window[0]["role"] == "system"
+    assert "Earlier: asked about AAPL" in window[0]["content"]
+    assert len(window) == 3
+
+def test_compaction_only_summarizes_new_overflow(summaries):
+    memory = memory_store.get("conversation", "user", load=False)
+    for turn in turns(6):
+        memory.append(turn["role"], turn["content"])
+    budget = 2 * conversation_memory.count_tokens(turns(1)[0]["content"])
+
+    asyncio.run(memory_store.compact("conversation", "user", budget))
+    asyncio.run(memory_store.compact("conversation", "user", budget))
+    memory.append("user", turns(1)[0]["content"])
+    asyncio.run(memory_store.compact("conversation", "user", budget))
+
+    assert summaries == [4, 1]
+    assert memory.summary == "+4+1"
+    assert memory.window(budget)[0]["content"].endswith("+4+1")
+
+def test_failed_summary_leaves_the_overflow_for_later(summaries, monkeypatch):
+    async def unavailable(summary, overflow, max_words):
+        return None
+    monkeypatch.setattr(llm_service, "summarize_conversation_async", unavailable)
+    memory = memory_store.get("conversation", "user", load=False)
+    for turn in turns(4):
+        memory.append(turn["role"], turn["content"])
+    budget = conversation_memory.count_tokens(turns(1)[0]["content"])
+
+    asyncio.run(memory_store.compact("conversation", "user", budget))
+
+    assert memory.summary == ""
+    assert len(memory.overflow(budget)) == 3
+
+def test_memories_are_kept_per_user(summaries):
+    memory_store.get("conversation", "alice", load=False).append("user", "alice's question")
+
+    assert memory_store.get("conversation", "bob", load=False).window() == []
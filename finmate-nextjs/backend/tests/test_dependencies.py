@@ -0,0 +1,101 @@
+import hashlib
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import dependencies
+
+SECRET = "test-secret-of-at-least-32-bytes!!"
+
+def make_token(sub="user-1", exp_in=3600, aud="authenticated", key=SECRET, **claims):
+    payload = {"sub": sub, "aud": aud, "exp": int(time.time()) + exp_in, **claims}
+    if sub is None:
+        del payload["sub"]
+    return jwt.encode(payload, key, algorithm="HS256")
+
+def authenticate(token: str) -> str:
+    return dependencies.get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+def cached_ttl(token: str) -> float:
+    expires_at, _ = dependencies._token_cache._data[hashlib.sha256(token.encode()).hexdigest()]
+    return expires_at - time.monotonic()
+
+@pytest.fixture(autouse=True)
+def local_secret(monkeypatch):
+    monkeypatch.setattr(dependencies, "JWT_SECRET", SECRET)
+    monkeypatch.setattr(dependencies, "_jwks_client", None)
+    dependencies._token_cache.clear()
+    yield
+    dependencies._token_cache.clear()
+
+@pytest.fixture
+def remote(monkeypatch):
+    """Supabase Auth stand-in that records the tokens it is asked about"""
+    calls = []
+
+    def verify_remotely(token):
+        calls.append(token)
+        return "remote-user"
+    monkeypatch.setattr(dependencies, "_verify_remotely", verify_remotely)
+    return calls
+
+def test_valid_token_is_verified_locally(remote):
+    assert authenticate(make_token()) == "user-1"
+    assert remote == []
+
+@pytest.mark.parametrize("token", [
+    make_token(exp_in=-60),
+    make_token(aud="anon"),
+    make_token(key="another-secret-of-at-least-32-bytes"),
+    make_token(sub=None),
+    "not-a-jwt",
+], ids=["expired", "wrong-audience", "wrong-signature", "no-subject", "malformed"])
+def test_invalid_token_is_rejected_without_remote_call(token, remote):
+    with pytest.raises(HTTPException) as excinfo:
+        authenticate(token)
+    assert excinfo.value.status_code == 401
+    assert remote == []
+
+def test_rejected_token_is_not_cached(monkeypatch):
+    token = make_token(key="another-secret-of-at-least-32-bytes")
+    with pytest.raises(HTTPException):
+        authenticate(token)
+    # Configured with the right secret now, the same token passes: nothing was cached
+    monkeypatch.setattr(dependencies, "JWT_SECRET", "another-secret-of-at-least-32-bytes")
+    assert authenticate(token) == "user-1"
+
+def test_verified_token_is_served_from_cache(monkeypatch):
+    token = make_token()
+    authenticate(token)
+
+    def fail(token):
+        raise AssertionError("token verified again")
+    monkeypatch.setattr(dependencies, "_verify_locally", fail)
+    assert authenticate(token) == "user-1"
+
+def test_cache_entry_never_outlives_token():
+    long_lived, short_lived = make_token(exp_in=3600), make_token(exp_in=30)
+    authenticate(long_lived)
+    authenticate(short_lived)
+
+    assert cached_ttl(long_lived) <= dependencies.TOKEN_CACHE_TTL_SECONDS
+    assert cached_ttl(short_lived) <= 30
+
+def test_without_local_key_falls_back_to_supabase(monkeypatch, remote):
+    monkeypatch.setattr(dependencies, "JWT_SECRET", None)
+    token = make_token()
+
+    assert authenticate(token) == "remote-user"
+    assert authenticate(token) == "remote-user"
+    assert remote == [token]
+
+def test_asymmetric_token_without_jwks_falls_back_to_supabase(remote):
+    header_only = jwt.api_jws.base64url_encode(b'{"alg":"ES256","typ":"JWT"}').decode()
+    payload = jwt.api_jws.base64url_encode(f'{{"sub":"user-1","exp":{int(time.time()) + 60}}}'.encode()).decode()
+    token = f"{header_only}.{payload}.c2ln"
+
+    assert authenticate(token) == "remote-user"
+    assert remote == [token]
@@ -0,0 +1,102 @@
+import os
+import time
+import uuid
+
+import pytest
+
+from services import document_index
+from services.document_index import DocumentIndex, DocumentStore, chunk_pages
+
+ALICE, BOB = str(uuid.uuid4()), str(uuid.uuid4())
+
+def report_pages():
+    filler = "Revenue grew steadily across every region during the year. " * 40
+    return [
+        (1, filler),
+        (2, "The company repurchased shares worth four billion dollars in the buyback program. " + filler),
+        (3, "Litigation risk remains from the pending antitrust lawsuit in Europe. " + filler),
+    ]
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(tmp_path)
+
+def age(store: DocumentStore, user_id: str, document_id: str, seconds: float):
+    path = store._path(user_id, document_id)
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+def test_chunks_are_cut_at_whitespace_and_keep_their_page():
+    chunks = chunk_pages(report_pages())
+
+    assert {chunk["page"] for chunk in chunks} == {1, 2, 3}
+    assert all(len(chunk["text"]) <= document_index.CHUNK_CHARS for chunk in chunks)
+    # No chunk starts or ends mid-word
+    words = set(" ".join(text for _, text in report_pages()).split())
+    assert all(chunk["text"].split()[0] in words and chunk["text"].split()[-1] in words for chunk in chunks)
+
+def test_bm25_ranks_the_chunk_with_the_rare_terms_first():
+    index = DocumentIndex("doc", "report.pdf", chunk_pages(report_pages()))
+
+    assert index.search("share buyback", k=1)[0]["page"] == 2
+    assert index.search("antitrust lawsuit", k=1)[0]["page"] == 3
+    assert index.search("unrelated query words") == []
+
+def test_document_is_only_visible_to_its_owner(store):
+    document_id = store.add(ALICE, "report.pdf", report_pages()).document_id
+
+    assert store.search(ALICE, document_id, "buyback")[0] == "report.pdf"
+    assert store.get(BOB, document_id) is None
+    assert store.search(BOB, document_id, "buyback") is None
+    assert store.delete(BOB, document_id) is False
+    assert store.get(ALICE, document_id) is not None
+
+def test_only_uuids_become_path_parts(store):
+    with pytest.raises(ValueError):
+        store.add("../other-user", "report.pdf", report_pages())
+    assert store.get(ALICE, "../../etc/passwd") is None
+    assert store.delete("../other-user", str(uuid.uuid4())) is False
+
+def test_document_is_reloaded_from_disk(store, tmp_path):
+    document_id = store.add(ALICE, "report.pdf", report_pages()).document_id
+
+    reloaded = DocumentStore(tmp_path).search(ALICE, document_id, "antitrust lawsuit", k=1)
+    assert reloaded[0] == "report.pdf"
+    assert reloaded[1][0]["page"] == 3
+
+def test_delete_removes_cached_index_and_file(store, tmp_path):
+    document_id = store.add(ALICE, "report.pdf", report_pages()).document_id
+
+    assert store.delete(ALICE, document_id) is True
+    assert store.get(ALICE, document_id) is None
+    assert DocumentStore(tmp_path).get(ALICE, document_id) is None
+    assert store.delete(ALICE, document_id) is False
+
+def test_upload_drops_users_oldest_documents_beyond_the_cap(store):
+    store.max_per_user = 2
+    oldest = store.add(ALICE, "a.pdf", report_pages()).document_id
+    age(store, ALICE, oldest, 300)
+    older = store.add(ALICE, "b.pdf", report_pages()).document_id
+    age(store, ALICE, older, 200)
+    bobs = store.add(BOB, "bob.pdf", report_pages()).document_id
+    age(store, BOB, bobs, 400)
+
+    newest = store.add(ALICE, "c.pdf", report_pages()).document_id
+
+    assert store.get(ALICE, oldest) is None
+    assert store.get(ALICE, older) is not None
+    assert store.get(ALICE, newest) is not None
+    # Other users' documents don't count towards the cap
+    assert store.get(BOB, bobs) is not None
+
+def test_expired_documents_are_not_served_and_are_pruned(store, tmp_path):
+    expired = store.add(ALICE, "old.pdf", report_pages()).document_id
+    kept = store.add(BOB, "new.pdf", report_pages()).document_id
+    age(store, ALICE, expired, store.ttl + 60)
+
+    fresh_store = DocumentStore(tmp_path)
+    assert fresh_store.get(ALICE, expired) is None
+
+    assert fresh_store.prune() == 1
+    assert not store._path(ALICE, expired).exists()
+    assert fresh_store.get(BOB, kept) is not None
@@ -0,0 +1,66 @@
+import uuid
+from io import BytesIO
+
+import pytest
+from PyPDF2 import PageObject
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from services import document_index, document_service
+
+PAGES = 20
+
+def make_pdf(pages: int = PAGES) -> BytesIO:
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(1, pages + 1):
+        text = pdf.beginText(40, 750)
+        for line in range(40):
+            text.textLine(f"Page {page} line {line} revenue margin guidance liquidity")
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+    buffer.seek(0)
+    return buffer
+
+@pytest.fixture
+def parsed_pages(monkeypatch):
+    """Counts page text extractions"""
+    calls = []
+    extract_text = PageObject.extract_text
+
+    def counting(page, *args, **kwargs):
+        calls.append(page)
+        return extract_text(page, *args, **kwargs)
+    monkeypatch.setattr(PageObject, "extract_text", counting)
+    return calls
+
+def test_budgeted_text_stops_pulling_pages_at_the_budget(parsed_pages):
+    reader = document_service.open_pdf(make_pdf())
+    text = document_service.budgeted_text(document_service.iter_pages(reader), char_budget=3000)
+
+    assert len(text) == 3000
+    assert 0 < len(parsed_pages) < PAGES
+
+def test_ingest_parses_each_page_once(parsed_pages, monkeypatch, tmp_path):
+    monkeypatch.setattr(document_index, "store", document_index.DocumentStore(tmp_path))
+    user_id = str(uuid.uuid4())
+
+    result = document_service.ingest_pdf(user_id, "report.pdf", make_pdf())
+
+    assert len(parsed_pages) == PAGES
+    assert result["pages"] == PAGES
+    assert result["text"].startswith("Page 1 line 0")
+    # Every page made it into the index, not just the preview's
+    index = document_index.store.get(user_id, result["document_id"])
+    assert {chunk["page"] for chunk in index.chunks} == set(range(1, PAGES + 1))
+    assert result["chunks"] == len(index.chunks)
+
+def test_limits_are_checked_before_extraction(parsed_pages, monkeypatch):
+    with pytest.raises(document_service.DocumentLimitError):
+        document_service.open_pdf(make_pdf(), max_pages=PAGES - 1)
+
+    monkeypatch.setattr(document_service, "DOCUMENT_MAX_BYTES", 100)
+    with pytest.raises(document_service.DocumentLimitError):
+        document_service.open_pdf(make_pdf())
+    assert parsed_pages == []
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from services import fundamentals_cache
+from services.cache import TTLCache
+
+class FakeYFinance:
+    """yf.Ticker(...).info from a dict of responses, counting fetches"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.fetches = []
+        self.fetched = threading.Event()
+
+    def Ticker(self, ticker):
+        self.fetches.append(ticker)
+        self.fetched.set()
+        return type("Ticker", (), {"info": dict(self.responses.get(ticker, {}))})()
+
+@pytest.fixture
+def yf(monkeypatch):
+    fake = FakeYFinance({
+        "AAPL": {"longName": "Apple Inc.", "marketCap": 3_000_000_000_000, "trailingPE": 30.1,
+                 "sector": "Technology", "dividendYield": None, "unrelatedField": "ignored"},
+    })
+    monkeypatch.setattr(fundamentals_cache, "yf", fake)
+    monkeypatch.setattr(fundamentals_cache, "_entries", TTLCache(maxsize=10, ttl=3600))
+    return fake
+
+def test_only_returned_fields_are_stored(yf):
+    info = fundamentals_cache.get_info("aapl")
+
+    assert info == {"longName": "Apple Inc.", "marketCap": 3_000_000_000_000, "trailingPE": 30.1, "sector": "Technology"}
+    # Callers' defaults apply to the fields yfinance didn't return
+    assert info.get("currency", "USD") == "USD"
+
+def test_fresh_info_is_served_from_cache(yf):
+    fundamentals_cache.get_info("AAPL")
+    fundamentals_cache.get_info("aapl", groups=("profile",))
+
+    assert yf.fetches == ["AAPL"]
+
+def test_unknown_ticker_is_not_cached(yf):
+    assert fundamentals_cache.get_info("NOPE") is None
+    assert fundamentals_cache.get_info("NOPE") is None
+
+    assert yf.fetches == ["NOPE", "NOPE"]
+
+def test_stale_group_is_served_while_revalidating(yf, monkeypatch):
+    fundamentals_cache.get_info("AAPL")
+    yf.responses["AAPL"]["trailingPE"] = 31.5
+    yf.fetched.clear()
+    monkeypatch.setitem(fundamentals_cache.GROUP_TTLS, "valuation", 0)
+    time.sleep(0.01)
+
+    assert fundamentals_cache.get_info("AAPL")["trailingPE"] == 30.1
+    assert yf.fetched.wait(timeout=2)
+    deadline = time.monotonic() + 2
+    while fundamentals_cache._revalidating and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fundamentals_cache.get_info("AAPL", groups=("profile",))["trailingPE"] == 31.5
+
+def test_seed_primes_a_group_without_a_fetch(yf):
+    fundamentals_cache.seed("msft", "profile", {"longName": "Microsoft", "sector": "Technology", "currency": None}, time.time())
+
+    info = fundamentals_cache.get_info("MSFT", groups=("profile",))
+    assert info == {"longName": "Microsoft", "sector": "Technology"}
+    assert yf.fetches == []
+
+def test_seed_replaces_the_group_and_keeps_newer_data(yf):
+    fundamentals_cache.get_info("AAPL")
+    now = time.time()
+
+    # Older than the fetch: ignored
+    fundamentals_cache.seed("AAPL", "profile", {"longName": "Old name"}, now - 3600)
+    assert fundamentals_cache.get_info("AAPL")["longName"] == "Apple Inc."
+
+    # Newer: the profile fields are replaced as a whole, valuation fields are kept
+    fundamentals_cache.seed("AAPL", "profile", {"longName": "Apple"}, now + 1)
+    info = fundamentals_cache.get_info("AAPL")
+    assert info["longName"] == "Apple"
+    assert "sector" not in info
+    assert info["marketCap"] == 3_000_000_000_000
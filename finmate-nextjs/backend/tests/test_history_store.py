@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from services import history_store
+
+FIRST_DAY = 20000  # Days since epoch
+
+def bars(closes, first_day=FIRST_DAY):
+    """Daily bars with OHLC all at the close"""
+    return np.array([[first_day + i, c, c, c, c, 1000.0] for i, c in enumerate(closes)], dtype=np.float64)
+
+class FakeUpstream:
+    """Adjusted daily history per ticker, served like _download"""
+
+    def __init__(self):
+        self.history = {}
+        self.requests = []
+
+    def download(self, tickers, start=None):
+        self.requests.append((tuple(tickers), start))
+        first = None if start is None else int(np.datetime64(start, "D").astype(np.int64))
+        return {
+            t: self.history[t] if first is None else self.history[t][self.history[t][:, 0] >= first]
+            for t in tickers if t in self.history
+        }
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    fake = FakeUpstream()
+    monkeypatch.setattr(history_store, "HISTORY_DIR", tmp_path)
+    monkeypatch.setattr(history_store, "_last_sync", {})
+    monkeypatch.setattr(history_store, "SYNC_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(history_store, "_download", fake.download)
+    return fake
+
+def closes(ticker):
+    return history_store.read_bars(ticker)[:, 4].tolist()
+
+def test_cold_ticker_is_backfilled(upstream):
+    upstream.history["AAPL"] = bars([10, 11, 12])
+
+    history_store.sync(["aapl"])
+
+    assert closes("AAPL") == [10, 11, 12]
+    assert upstream.requests == [(("AAPL",), None)]
+
+def test_warm_ticker_fetches_only_the_delta(upstream):
+    upstream.history["AAPL"] = bars([10, 11, 12])
+    history_store.sync(["AAPL"])
+
+    # The last session closed higher than its live bar, and a new session began
+    upstream.history["AAPL"] = bars([10, 11, 12.5, 13])
+    history_store.sync(["AAPL"])
+
+    assert closes("AAPL") == [10, 11, 12.5, 13]
+    # The delta starts one completed session before the last stored bar
+    assert upstream.requests[-1] == (("AAPL",), str(np.datetime64(FIRST_DAY + 1, "D")))
+
+def test_tickers_with_the_same_start_share_a_request(upstream):
+    upstream.history = {"AAPL": bars([10, 11]), "MSFT": bars([20, 21])}
+    history_store.sync(["AAPL", "MSFT"])
+    history_store.sync(["AAPL", "MSFT"])
+
+    assert [tickers for tickers, _ in upstream.requests] == [("AAPL", "MSFT"), ("AAPL", "MSFT")]
+
+def test_changed_adjustment_triggers_a_backfill(upstream):
+    upstream.history["AAPL"] = bars([10, 11, 12])
+    history_store.sync(["AAPL"])
+    # A 2:1 split re-adjusts the whole past
+    upstream.history["AAPL"] = bars([5, 5.5, 6, 6.5])
+
+    history_store.sync(["AAPL"])
+
+    assert closes("AAPL") == [5, 5.5, 6, 6.5]
+    assert upstream.requests[-1] == (("AAPL",), None)
+
+def test_failed_backfill_is_retried_on_the_next_sync(upstream, monkeypatch):
+    monkeypatch.setattr(history_store, "SYNC_INTERVAL_SECONDS", 3600)
+    upstream.history["AAPL"] = bars([10, 11, 12])
+    history_store.sync(["AAPL"])
+    history_store._last_sync.clear()  # The interval has passed
+
+    upstream.history["AAPL"] = bars([5, 5.5, 6, 6.5])
+    download = upstream.download
+
+    def fail_backfill(tickers, start=None):
+        if start is None:
+            raise ConnectionError("upstream down")
+        return download(tickers, start)
+    monkeypatch.setattr(history_store, "_download", fail_backfill)
+    history_store.sync(["AAPL"])
+    assert closes("AAPL") == [10, 11, 12]
+
+    # Not throttled by the sync interval: the stale history is fixed on the next call
+    monkeypatch.setattr(history_store, "_download", download)
+    history_store.sync(["AAPL"])
+    assert closes("AAPL") == [5, 5.5, 6, 6.5]
+
+def test_sync_is_throttled_per_ticker(upstream, monkeypatch):
+    monkeypatch.setattr(history_store, "SYNC_INTERVAL_SECONDS", 3600)
+    upstream.history["AAPL"] = bars([10, 11])
+
+    history_store.sync(["AAPL"])
+    history_store.sync(["AAPL"])
+
+    assert len(upstream.requests) == 1
+
+def test_get_bars_is_a_view_of_the_latest_bars(upstream):
+    upstream.history["AAPL"] = bars(range(10))
+    history_store.sync(["AAPL"])
+
+    latest = history_store.get_bars("aapl", lookback=3)
+    assert latest[:, 4].tolist() == [7, 8, 9]
+    assert isinstance(latest.base, np.memmap) or isinstance(latest, np.memmap)
@@ -0,0 +1,59 @@
+import json
+from itertools import combinations
+from pathlib import Path
+
+import pytest
+
+from services import news_dedup
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "news_dedup_corpus.json"
+
+def story(link, title, summary=""):
+    return {"link": link, "title": title, "summary": summary}
+
+@pytest.fixture(scope="module")
+def corpus():
+    with open(CORPUS_PATH) as f:
+        return json.load(f)["items"]
+
+def pairs(clusters):
+    return {pair for members in clusters for pair in combinations(sorted(members), 2)}
+
+def test_clusters_match_the_labeled_corpus(corpus):
+    labels = [item["cluster"] for item in corpus]
+    same_story = {(i, j) for i, j in combinations(range(len(corpus)), 2) if labels[i] == labels[j]}
+
+    assert pairs(news_dedup.cluster(corpus)) == same_story
+
+def test_lsh_finds_every_pair_above_the_threshold(corpus):
+    shingle_sets = [news_dedup.shingles(item) for item in corpus]
+    similar = {
+        (i, j) for i, j in combinations(range(len(corpus)), 2)
+        if news_dedup.jaccard(shingle_sets[i], shingle_sets[j]) >= news_dedup.SIMILARITY_THRESHOLD
+    }
+
+    assert similar <= pairs(news_dedup.cluster(corpus))
+
+def test_collapse_keeps_first_copy_with_the_others_links():
+    items = [
+        story("a", "Nvidia shares rise after record data center revenue", "Nvidia beat estimates on AI chip demand."),
+        story("b", "Fed holds rates steady, signals two cuts this year"),
+        story("c", "Nvidia shares rising after record data-center revenue", "Nvidia beats estimates on AI chip demand."),
+    ]
+
+    collapsed = news_dedup.collapse(items)
+
+    assert [item["link"] for item in collapsed] == ["a", "b"]
+    assert collapsed[0]["duplicate_links"] == ["c"]
+    assert "duplicate_links" not in collapsed[1]
+    # The input items are left untouched
+    assert "duplicate_links" not in items[0]
+
+def test_collapse_can_be_disabled(monkeypatch):
+    items = [story("a", "Same headline"), story("b", "Same headline")]
+    monkeypatch.setattr(news_dedup, "DEDUP_ENABLED", False)
+
+    assert news_dedup.collapse(items) == items
+
+def test_markup_and_case_are_ignored():
+    assert news_dedup.shingles(story("a", "<b>Apple</b> &amp; Google")) == news_dedup.shingles(story("b", "apple & google"))
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import NewsItem
+from services.news_index import NewsIndex
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+
+def article(news_id, tickers, hours_ago=0):
+    return NewsItem(
+        id=news_id, headline=str(news_id), summary="", sentiment_score=50, category="General",
+        affected_tickers=tickers, impact="neutral", impact_reason="", risk_level="low",
+        link=f"https://example.com/{news_id}", published=(NOW - timedelta(hours=hours_ago)).isoformat()
+    )
+
+def ranked_ids(index, portfolio, limit=10):
+    return [item.id for item in index.rank(portfolio, limit, now=NOW.timestamp())]
+
+@pytest.fixture
+def index():
+    index = NewsIndex(max_articles=100)
+    index.set_profiles({
+        "NVDA": {"sector": "Technology", "industry": "Semiconductors"},
+        "AMD": {"sector": "Technology", "industry": "Semiconductors"},
+        "MSFT": {"sector": "Technology", "industry": "Software"},
+        "XOM": {"sector": "Energy", "industry": "Oil & Gas"},
+    })
+    return index
+
+def test_held_ticker_outranks_industry_then_sector(index):
+    index.add([
+        article("sector", ["MSFT"]),
+        article("industry", ["AMD"]),
+        article("ticker", ["NVDA"]),
+        article("unrelated", ["XOM"]),
+    ])
+
+    assert ranked_ids(index, ["nvda"], limit=3) == ["ticker", "industry", "sector"]
+
+def test_recency_decays_relevance(index):
+    index.add([article("old-ticker", ["NVDA"], hours_ago=24 * 7), article("fresh-industry", ["AMD"])])
+
+    assert ranked_ids(index, ["NVDA"], limit=2) == ["fresh-industry", "old-ticker"]
+
+def test_remaining_slots_are_filled_with_newest(index):
+    index.add([article("match", ["NVDA"], hours_ago=5), article("newest", ["XOM"]), article("older", ["XOM"], hours_ago=1)])
+
+    assert ranked_ids(index, ["NVDA"], limit=3) == ["match", "newest", "older"]
+
+def test_reindexing_an_article_replaces_its_keys(index):
+    index.add([article("story", ["NVDA"]), article("older", ["NVDA"], hours_ago=48)])
+    index.add([article("story", ["XOM"])])
+
+    assert ranked_ids(index, ["NVDA"], limit=1) == ["older"]
+    assert ranked_ids(index, ["XOM"], limit=1) == ["story"]
+    assert len(index) == 2
+
+def test_oldest_articles_are_evicted(index):
+    index.max_articles = 2
+    index.add([article("oldest", ["NVDA"], hours_ago=3), article("middle", ["NVDA"], hours_ago=2)])
+    index.add([article("newest", ["NVDA"], hours_ago=1)])
+
+    assert ranked_ids(index, ["NVDA"]) == ["newest", "middle"]
+
+def test_learning_a_profile_rekeys_existing_articles():
+    index = NewsIndex()
+    index.add([article("peer", ["AMD"], hours_ago=1), article("newer", ["XOM"])])
+    assert index.missing_profiles(["amd", "nvda"]) == ["AMD", "NVDA"]
+    # Nothing matches NVDA yet, so the newest article fills the slot
+    assert ranked_ids(index, ["NVDA"], limit=1) == ["newer"]
+
+    index.set_profiles({
+        "AMD": {"sector": "Technology", "industry": "Semiconductors"},
+        "NVDA": {"sector": "Technology", "industry": "Semiconductors"},
+    })
+
+    assert ranked_ids(index, ["NVDA"], limit=1) == ["peer"]
+    assert index.missing_profiles(["amd", "nvda"]) == []
+
+def test_unsaved_articles_are_not_indexed(index):
+    index.add([article(None, ["NVDA"])])
+
+    assert len(index) == 0
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from models import NewsItem
+from services import news_pipeline, news_service
+from services.news_scheduler import NewsIngestionScheduler, NewsStore
+
+def news_item(n, published=None, created_at=None, id=None):
+    return NewsItem(
+        id=id, headline=f"Story {n}", summary="", sentiment_score=50, category="General",
+        affected_tickers=[], impact="neutral", impact_reason="", risk_level="low",
+        link=f"https://example.com/{n}", published=published, created_at=created_at
+    )
+
+def test_store_keeps_newest_publications_up_to_its_size():
+    store = NewsStore(max_items=3)
+    store.add([news_item(n, published=f"2026-01-0{n}T00:00:00") for n in range(1, 6)])
+    store.add([news_item(5, published="2026-01-05T00:00:00")])
+
+    assert len(store) == 3
+    assert [item.headline for item in store.latest()] == ["Story 5", "Story 4", "Story 3"]
+    assert "https://example.com/1" not in store
+
+def test_latest_saved_follows_db_feed_order():
+    store = NewsStore()
+    store.add([
+        news_item(1, created_at="2026-01-01T00:00:00+00:00", id="a"),
+        news_item(2, created_at="2026-01-02T00:00:00+00:00", id="b"),
+        news_item(3, created_at="2026-01-02T00:00:00+00:00", id="c"),
+        news_item(4),  # Not saved yet: no cursor to continue from
+    ])
+
+    assert [item.id for item in store.latest_saved()] == ["c", "b", "a"]
+    assert [item.id for item in store.latest_saved(limit=1)] == ["c"]
+
+class FakeSources:
+    """Feed fetches and analysis with a delay, recording what was analyzed"""
+
+    def __init__(self, urls):
+        self.raw = [{"link": url, "title": url} for url in urls]
+        self.fetches = 0
+        self.analyzed = []
+
+    async def fetch_news_async(self):
+        self.fetches += 1
+        await asyncio.sleep(0.05)
+        return list(self.raw)
+
+    async def run_refresh_pipeline(self, portfolio, raw_news=None):
+        self.analyzed.extend(item["link"] for item in raw_news)
+        await asyncio.sleep(0.05)
+        return [news_item(item["link"].rsplit("/", 1)[-1], published="2026-01-01T00:00:00") for item in raw_news]
+
+@pytest.fixture
+def sources(monkeypatch):
+    fake = FakeSources([f"https://example.com/{n}" for n in range(3)])
+    monkeypatch.setattr(news_service, "fetch_news_async", fake.fetch_news_async)
+    monkeypatch.setattr(news_pipeline, "run_refresh_pipeline", fake.run_refresh_pipeline)
+    return fake
+
+@pytest.fixture
+def scheduler():
+    return NewsIngestionScheduler(NewsStore(), interval=600)
+
+def test_concurrent_refreshes_share_one_tick(sources, scheduler):
+    async def run():
+        return await asyncio.gather(*(scheduler.refresh() for _ in range(5)))
+    results = asyncio.run(run())
+
+    assert sources.fetches == 1
+    assert sorted(sources.analyzed) == sorted(item["link"] for item in sources.raw)
+    assert all(len(items) == 3 for items in results)
+
+def test_seen_articles_are_not_analyzed_again(sources, scheduler):
+    async def run():
+        await scheduler.tick()
+        sources.raw.append({"link": "https://example.com/new", "title": "new"})
+        return await scheduler.tick()
+    analyzed_in_second_tick = asyncio.run(run())
+
+    assert analyzed_in_second_tick == 1
+    assert sources.analyzed.count("https://example.com/0") == 1
+
+def test_fresh_store_is_served_without_ticking(sources, scheduler):
+    async def run():
+        await scheduler.refresh()
+        await scheduler.refresh()
+    asyncio.run(run())
+
+    assert sources.fetches == 1
+
+def test_cancelled_caller_does_not_cancel_the_tick(sources, scheduler):
+    async def run():
+        caller = asyncio.ensure_future(scheduler.tick())
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.2)
+    asyncio.run(run())
+
+    assert len(scheduler.store) == 3
+    assert scheduler.last_tick_at is not None
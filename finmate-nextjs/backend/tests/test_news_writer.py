@@ -0,0 +1,91 @@
+import asyncio
+import uuid
+
+import pytest
+
+from models import NewsItem
+from services import news_index, news_service, news_writer
+from services.news_writer import NewsWriter
+
+def news_item(name):
+    return NewsItem(
+        id=f"tmp-{name}", headline=name, summary="", sentiment_score=50, category="General",
+        affected_tickers=[], impact="neutral", impact_reason="", risk_level="low",
+        link=f"https://example.com/{name}"
+    )
+
+class FakeDB:
+    def __init__(self):
+        self.batches = []
+        self.rejected = set()
+        self.cached = []
+        self.indexed = []
+
+    def save_analyzed_news_batch(self, items):
+        self.batches.append([item.headline for item in items])
+        return {
+            item.link: {"id": str(uuid.uuid4()), "created_at": "2026-01-01T00:00:00+00:00"}
+            for item in items if item.headline not in self.rejected
+        }
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(news_service, "save_analyzed_news_batch", fake.save_analyzed_news_batch)
+    monkeypatch.setattr(news_service, "cache_news_items", lambda items: fake.cached.append([i.id for i in items]))
+    monkeypatch.setattr(news_index.index, "add", lambda items: fake.indexed.extend(i.headline for i in items))
+    return fake
+
+def test_full_batch_is_flushed_right_away(db):
+    async def run():
+        writer = NewsWriter(batch_size=2, flush_seconds=60)
+        items = [news_item("a"), news_item("b")]
+        writer.enqueue(items)
+        # Queued items are visible under their temporary ids until saved
+        assert db.cached == [["tmp-a", "tmp-b"]]
+        await asyncio.sleep(0.05)
+        await writer.stop()
+        return items
+    items = asyncio.run(run())
+
+    assert db.batches == [["a", "b"]]
+    assert all(not item.id.startswith("tmp-") and item.created_at for item in items)
+    assert db.indexed == ["a", "b"]
+
+def test_partial_batch_is_flushed_on_the_timer(db):
+    async def run():
+        writer = NewsWriter(batch_size=10, flush_seconds=0.05)
+        writer.enqueue([news_item("a")])
+        await asyncio.sleep(0.01)
+        assert db.batches == []
+        await asyncio.sleep(0.1)
+        assert db.batches == [["a"]]
+        await writer.stop()
+    asyncio.run(run())
+
+def test_failed_items_are_retried_then_dropped(db):
+    db.rejected.add("bad")
+
+    async def run():
+        writer = NewsWriter(batch_size=10, flush_seconds=60)
+        writer.enqueue([news_item("good"), news_item("bad")])
+        for _ in range(news_writer.WRITE_MAX_ATTEMPTS):
+            await writer.flush()
+        remaining = len(writer)
+        await writer.stop()
+        return remaining
+    remaining = asyncio.run(run())
+
+    assert db.batches == [["good", "bad"]] + [["bad"]] * (news_writer.WRITE_MAX_ATTEMPTS - 1)
+    assert remaining == 0
+    assert db.indexed == ["good"]
+
+def test_stop_flushes_what_is_queued(db):
+    async def run():
+        writer = NewsWriter(batch_size=10, flush_seconds=60)
+        writer.enqueue([news_item("a"), news_item("b"), news_item("c")])
+        await writer.stop()
+        return len(writer)
+
+    assert asyncio.run(run()) == 0
+    assert db.batches == [["a", "b", "c"]]
@@ -0,0 +1,177 @@
+"""
+Keyset pagination of the news feed and the conversation list, against an
+in-memory stand-in for the PostgREST query builder.
+"""
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import chat, news
+from dependencies import get_current_user
+from services import chat_service, news_service
+from services.pagination import keyset_filter, parse_cursor
+
+KEYSET = re.compile(r'^(\w+)\.lt\."([^"]+)",and\(\1\.eq\."([^"]+)",id\.lt\.([0-9a-f-]+)\)$')
+
+class FakeQuery:
+    """Just enough of the PostgREST builder for the listing queries"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.ordering = []
+        self.count = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        if "." not in column:
+            self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: parse_cursor(row[column])[0] < parse_cursor(value)[0])
+        return self
+
+    def or_(self, expression):
+        column, ts, ts_again, before_id = KEYSET.match(expression).groups()
+        assert ts == ts_again
+        before = datetime.fromisoformat(ts)
+
+        def after_cursor(row):
+            created = datetime.fromisoformat(row[column])
+            return created < before or (created == before and uuid.UUID(row["id"]) < uuid.UUID(before_id))
+        self.filters.append(after_cursor)
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        rows = [row for row in self.rows if all(f(row) for f in self.filters)]
+        for column, desc in reversed(self.ordering):
+            key = (lambda row: uuid.UUID(row["id"])) if column == "id" else (lambda row, c=column: datetime.fromisoformat(row[c]))
+            rows.sort(key=key, reverse=desc)
+        return type("Response", (), {"data": [dict(row) for row in rows[:self.count]]})()
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def table(self, name):
+        return FakeQuery(self.tables[name])
+
+def timestamps(count, same_every=3):
+    """Descending timestamps where every `same_every` consecutive rows share one"""
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [(start - timedelta(seconds=n // same_every)).isoformat() for n in range(count)]
+
+@pytest.fixture
+def articles(monkeypatch):
+    rows = [
+        {"id": str(uuid.uuid4()), "url": f"https://example.com/{n}", "headline": f"Story {n}", "summary": "",
+         "source": "Test", "published_at": None, "sentiment_score": 50, "risk_level": "low",
+         "impact_level": "neutral", "impact_reason": "", "related_sources": [], "created_at": created_at}
+        for n, created_at in enumerate(timestamps(25))
+    ]
+    monkeypatch.setattr(news_service, "supabase", FakeSupabase({"news_articles": rows}))
+    return rows
+
+@pytest.fixture
+def conversations(monkeypatch):
+    rows = [
+        {"id": str(uuid.uuid4()), "user_id": "user-1", "title": f"Chat {n}", "updated_at": updated_at}
+        for n, updated_at in enumerate(timestamps(25))
+    ]
+    rows.append({"id": str(uuid.uuid4()), "user_id": "user-2", "title": "Not mine", "updated_at": rows[0]["updated_at"]})
+    monkeypatch.setattr(chat_service, "supabase", FakeSupabase({"conversations": rows}))
+    monkeypatch.setattr(chat_service.chat_service, "_conversations", chat_service.TTLCache(maxsize=10, ttl=60))
+    return rows
+
+def test_parse_cursor_rejects_anything_but_timestamp_and_uuid():
+    before, before_id = parse_cursor("2026-01-01T00:00:00.5+00:00", "6f1c2b1e-0000-4000-8000-000000000001")
+    assert before == datetime(2026, 1, 1, 0, 0, 0, 500000, tzinfo=timezone.utc)
+    assert before_id == uuid.UUID("6f1c2b1e-0000-4000-8000-000000000001")
+
+    for bad in [("yesterday", None),
+                ('2026-01-01T00:00:00",id.gt.0', None),
+                ("2026-01-01T00:00:00", "1),or(id.gt.0"),
+                (None, "6f1c2b1e-0000-4000-8000-000000000001")]:
+        with pytest.raises(ValueError):
+            parse_cursor(*bad)
+
+def test_keyset_filter_is_built_from_parsed_values():
+    cursor = parse_cursor("2026-01-01T00:00:00Z", "6f1c2b1e-0000-4000-8000-000000000001")
+    assert keyset_filter("created_at", *cursor) == (
+        'created_at.lt."2026-01-01T00:00:00+00:00",'
+        'and(created_at.eq."2026-01-01T00:00:00+00:00",id.lt.6f1c2b1e-0000-4000-8000-000000000001)'
+    )
+
+def test_news_pages_cover_every_article_once(articles):
+    seen = []
+    before = before_id = None
+    while True:
+        page = news_service.get_latest_news(limit=4, before=before, before_id=before_id)
+        seen.extend(item.id for item in page)
+        if len(page) < 4:
+            break
+        before, before_id = parse_cursor(page[-1].created_at, page[-1].id)
+
+    # Page boundaries fall among articles sharing a created_at; none are skipped or repeated
+    assert sorted(seen) == sorted(row["id"] for row in articles)
+    assert len(seen) == len(set(seen))
+
+def test_conversation_pages_cover_every_conversation_once(conversations):
+    seen = []
+    before = before_id = None
+    while True:
+        page = chat_service.chat_service.get_conversations("user-1", limit=4, before=before, before_id=before_id)
+        seen.extend(row["id"] for row in page)
+        if len(page) < 4:
+            break
+        before, before_id = parse_cursor(page[-1]["updated_at"], page[-1]["id"])
+
+    assert sorted(seen) == sorted(row["id"] for row in conversations if row["user_id"] == "user-1")
+    assert len(seen) == len(set(seen))
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+    monkeypatch.setattr(news_service, "get_latest_news", lambda **kwargs: calls.append(kwargs) or [])
+    monkeypatch.setattr(chat_service.chat_service, "get_conversations", lambda *args: calls.append(args) or [])
+    app = FastAPI()
+    app.include_router(news.router)
+    app.include_router(chat.router)
+    app.dependency_overrides[get_current_user] = lambda: "user-1"
+    return TestClient(app), calls
+
+@pytest.mark.parametrize("path", ["/api/news", "/api/chat/history"])
+@pytest.mark.parametrize("params", [
+    {"before": "not-a-date"},
+    {"before": "2026-01-01T00:00:00", "before_id": "1,id.gt.0"},
+    {"before_id": "6f1c2b1e-0000-4000-8000-000000000001"},
+], ids=["bad-timestamp", "bad-id", "id-without-timestamp"])
+def test_invalid_cursor_is_rejected(client, path, params):
+    test_client, calls = client
+    assert test_client.get(path, params=params).status_code == 400
+    assert calls == []
+
+def test_endpoints_pass_parsed_cursor(client):
+    test_client, calls = client
+    params = {"before": "2026-01-01T00:00:00Z", "before_id": "6f1c2b1e-0000-4000-8000-000000000001"}
+    cursor = parse_cursor(params["before"], params["before_id"])
+
+    assert test_client.get("/api/news", params=params).status_code == 200
+    assert test_client.get("/api/chat/history", params=params).status_code == 200
+    assert (calls[0]["before"], calls[0]["before_id"]) == cursor
+    assert calls[1][2:] == cursor
@@ -0,0 +1,151 @@
+"""
+RSS polling against a local fixture server: one feed answering conditional
+requests by ETag, one by Last-Modified, one ignoring them (always 200, same
+body), and one that never answers in time.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services import rss_service
+from services.feed_registry import Feed, FeedRegistry
+
+FEED_TIMEOUT = 0.3
+SLOW_FEED_DELAY = 1.0
+MAX_ITEMS = 5
+PATHS = ("/etag", "/last-modified", "/no-conditional", "/slow")
+
+feeds = {}  # path -> list of (guid, title, published)
+responses = {"200": 0, "304": 0}
+responses_lock = threading.Lock()
+
+def add_entry(path: str, guid: str, title: str, minutes_ago: int = 0):
+    published = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    feeds[path].insert(0, (guid, title, published))
+
+def render(base_url: str, path: str) -> bytes:
+    items = "".join(
+        f"<item><guid>{guid}</guid><title>{title}</title><link>{base_url}{path}/{guid}</link>"
+        f"<description>{title} summary.</description><pubDate>{format_datetime(published)}</pubDate></item>"
+        for guid, title, published in feeds[path]
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{path}</title>{items}</channel></rss>'.encode()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(SLOW_FEED_DELAY)
+        host, port = self.server.server_address
+        body = render(f"http://{host}:{port}", self.path)
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        last_modified = format_datetime(max(p for _, _, p in feeds[self.path]), usegmt=True)
+
+        not_modified = (
+            (self.path == "/etag" and self.headers.get("If-None-Match") == etag)
+            or (self.path == "/last-modified" and self.headers.get("If-Modified-Since") == last_modified)
+        )
+        with responses_lock:
+            responses["304" if not_modified else "200"] += 1
+        if not_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/etag":
+            self.send_header("ETag", etag)
+        if self.path == "/last-modified":
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+@pytest.fixture
+def fixture_feeds(base_url, monkeypatch):
+    """Fresh fixture feeds and an empty per-feed cache for each test"""
+    monkeypatch.setattr(rss_service, "FEED_TIMEOUT_SECONDS", FEED_TIMEOUT)
+    monkeypatch.setattr(rss_service, "_feed_states", {})
+    for path in PATHS:
+        feeds[path] = []
+        for n in range(8):
+            add_entry(path, f"{path.strip('/')}-{n}", f"Story {n} from {path}", minutes_ago=60 - n)
+    return {path: Feed(name=path.strip("/"), url=f"{base_url}{path}", max_items=MAX_ITEMS) for path in PATHS}
+
+def poll(fixture_feeds: dict) -> list:
+    for key in responses:
+        responses[key] = 0
+
+    async def run():
+        try:
+            return await rss_service.fetch_rss_news_async(list(fixture_feeds.values()))
+        finally:
+            await rss_service.close_client()
+    return asyncio.run(run())
+
+def counters(feed: Feed) -> dict:
+    return rss_service.feed_stats()[feed.url]
+
+def test_cold_poll_serves_responsive_feeds_and_skips_slow_one(fixture_feeds):
+    items = poll(fixture_feeds)
+
+    assert len(items) == 3 * MAX_ITEMS
+    assert all(counters(fixture_feeds[path])["parsed"] == 1 for path in PATHS if path != "/slow")
+    assert counters(fixture_feeds["/slow"])["errors"] == 1
+
+def test_repeat_poll_uses_conditional_requests(fixture_feeds):
+    poll(fixture_feeds)
+    items = poll(fixture_feeds)
+
+    assert responses["304"] == 2
+    assert counters(fixture_feeds["/etag"])["not_modified"] == 1
+    assert counters(fixture_feeds["/last-modified"])["not_modified"] == 1
+    assert counters(fixture_feeds["/no-conditional"])["unchanged"] == 1
+    # Nothing was parsed again, and the cached entries are still served
+    assert all(counters(fixture_feeds[path])["parsed"] == 1 for path in PATHS if path != "/slow")
+    assert len(items) == 3 * MAX_ITEMS
+
+def test_new_entry_parses_only_the_changed_feed(fixture_feeds):
+    poll(fixture_feeds)
+    add_entry("/etag", "etag-new", "Breaking story")
+    items = poll(fixture_feeds)
+
+    assert any(item["title"] == "Breaking story" for item in items)
+    assert counters(fixture_feeds["/etag"])["parsed"] == 2
+    assert counters(fixture_feeds["/last-modified"])["parsed"] == 1
+    assert counters(fixture_feeds["/no-conditional"])["parsed"] == 1
+
+def test_slow_feed_backs_off(fixture_feeds):
+    registry = FeedRegistry()
+    for feed in fixture_feeds.values():
+        registry.register(feed)
+    slow = fixture_feeds["/slow"]
+
+    poll(fixture_feeds)
+
+    assert slow.health()["status"] == "backing_off"
+    assert slow.next_due > time.time() + slow.poll_interval
+    due = {feed.url for feed in registry.due()}
+    assert due == {fixture_feeds[path].url for path in PATHS if path != "/slow"}
+
+    # Each further failure doubles the delay
+    first_delay = slow.next_due - time.time()
+    poll({"/slow": slow})
+    assert slow.consecutive_failures == 2
+    assert slow.next_due - time.time() > 1.5 * first_delay
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.tool_registry import Tool, ToolError, ToolRegistry, cache_key
+
+PARAMETERS = {"type": "object", "properties": {}}
+
+def make_tool(name, fn, **policy):
+    return Tool(name=name, description=name, parameters=PARAMETERS, fn=fn, **policy)
+
+def sleeper(seconds):
+    def fn(label="x"):
+        time.sleep(seconds)
+        return f"{label} done"
+    return fn
+
+@pytest.fixture
+def registry():
+    return ToolRegistry(pool_size=8)
+
+def test_calls_run_concurrently_and_keep_their_order(registry):
+    registry.register(make_tool("slow", sleeper(0.2)))
+    calls = [("slow", {"label": str(n)}) for n in range(4)]
+
+    started = time.monotonic()
+    results = registry.execute_many(calls)
+
+    assert results == ["0 done", "1 done", "2 done", "3 done"]
+    assert time.monotonic() - started < 0.6
+
+def test_tool_timeout_yields_a_message_without_holding_up_the_others(registry):
+    registry.register(make_tool("hung", sleeper(1.0), timeout=0.1))
+    registry.register(make_tool("quick", sleeper(0.0)))
+
+    started = time.monotonic()
+    results = registry.execute_many([("hung", {}), ("quick", {"label": "q"})])
+
+    assert results == ["Tool hung timed out", "q done"]
+    assert time.monotonic() - started < 0.5
+
+def test_global_deadline_caps_every_call(registry):
+    registry.register(make_tool("slow", sleeper(1.0), timeout=10))
+
+    started = time.monotonic()
+    results = asyncio.run(registry.execute_many_async([("slow", {}), ("slow", {})], deadline_seconds=0.1))
+
+    assert results == ["Tool slow timed out", "Tool slow timed out"]
+    assert time.monotonic() - started < 0.5
+
+def test_concurrency_limit_is_shared_across_calls(registry):
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def tracked():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return "ok"
+    registry.register(make_tool("limited", tracked, max_concurrency=2))
+
+    assert registry.execute_many([("limited", {})] * 6) == ["ok"] * 6
+    assert peak == 2
+
+def test_unknown_tool_and_failing_tool_return_messages(registry):
+    def broken():
+        raise RuntimeError("upstream down")
+    registry.register(make_tool("broken", broken))
+
+    assert registry.execute_many([("missing", {}), ("broken", {})]) == [
+        "Unknown tool", "Tool broken failed: upstream down"
+    ]
+
+def test_results_are_cached_on_normalized_args(registry):
+    calls = []
+
+    def quote(ticker, period="1d"):
+        calls.append(ticker)
+        return f"{ticker} quote"
+    registry.register(make_tool("quote", quote, cache_ttl=60))
+
+    assert registry.call("quote", {"ticker": "aapl"}) == "aapl quote"
+    # Same call once normalized: served from the cache
+    assert registry.call("quote", {"ticker": " AAPL "}) == "aapl quote"
+    assert calls == ["aapl"]
+    assert registry.stats()["tools"]["quote"] == {"hits": 1, "misses": 1}
+
+def test_ticker_lists_are_cached_as_sets():
+    assert cache_key("compare", {"tickers": ["msft", "AAPL", "MSFT"]}) == cache_key("compare", {"tickers": ["aapl", "msft"]})
+    assert cache_key("search", {"query": "Apple  earnings"}) == cache_key("search", {"query": "apple earnings"})
+    assert cache_key("search", {"query": "apple"}) != cache_key("search", {"query": "apple earnings"})
+
+def test_uncached_tool_always_runs(registry):
+    calls = []
+    registry.register(make_tool("live", lambda: calls.append(1) or "ok"))
+
+    registry.call("live", {})
+    registry.call("live", {})
+    assert len(calls) == 2
+
+def test_tool_errors_and_failures_are_not_cached(registry):
+    outcomes = iter([ToolError("No data for XYZ"), RuntimeError("timeout upstream"), "XYZ quote"])
+
+    def flaky(ticker):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    registry.register(make_tool("flaky", flaky, cache_ttl=60))
+
+    assert registry.call("flaky", {"ticker": "XYZ"}) == "No data for XYZ"
+    assert registry.call("flaky", {"ticker": "XYZ"}) == "Tool flaky failed: timeout upstream"
+    assert registry.call("flaky", {"ticker": "XYZ"}) == "XYZ quote"
+    assert registry.call("flaky", {"ticker": "XYZ"}) == "XYZ quote"
+    assert registry.stats()["tools"]["flaky"] == {"hits": 1, "misses": 3}
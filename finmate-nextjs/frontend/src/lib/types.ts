@@ -45,10 +45,12 @@ export interface ChatRequest {
     portfolio?: string[];
     news_context?: NewsItem[];
     document_context?: string;
+    document_id?: string;
 }
 
 export interface DocumentUploadResponse {
     filename: string;
+    document_id: string;
     text: string;
     message: string;
 }
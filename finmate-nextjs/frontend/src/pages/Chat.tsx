@@ -18,7 +18,7 @@ export default function Chat() {
     const [conversationId, setConversationId] = useState<string | null>(null);
     const [messages, setMessages] = useState<ChatMessage[]>([]);
     const [input, setInput] = useState("");
-    const [documentContext, setDocumentContext] = useState<string>("");
+    const [documentId, setDocumentId] = useState<string>("");
     const [uploadedFile, setUploadedFile] = useState<string>("");
     const [sidebarView, setSidebarView] = useState<"history" | "context">("history");
 
@@ -77,7 +77,7 @@ export default function Chat() {
             query: textToSend,
             portfolio: portfolio?.tickers,
             news_context: news,
-            document_context: documentContext
+            document_id: documentId || undefined
         }, {
             onSuccess: (response: any) => {
                 // Determine Conversation ID from response if it was new
@@ -98,7 +98,7 @@ export default function Chat() {
 
         uploadDocument.mutate(file, {
             onSuccess: (response) => {
-                setDocumentContext(response.text);
+                setDocumentId(response.document_id);
                 setUploadedFile(response.filename);
             }
         });
@@ -228,7 +228,7 @@ export default function Chat() {
                                                 <FileText className="h-4 w-4 text-primary shrink-0" />
                                                 <span className="text-xs text-foreground truncate">{uploadedFile}</span>
                                             </div>
-                                            <button onClick={() => { setUploadedFile(""); setDocumentContext(""); }} className="text-muted-foreground hover:text-foreground">
+                                            <button onClick={() => { setUploadedFile(""); setDocumentId(""); }} className="text-muted-foreground hover:text-foreground">
                                                 <X className="h-3 w-3" />
                                             </button>
                                         </div>